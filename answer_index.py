@@ -0,0 +1,287 @@
+"""
+MinHash-LSH index of theory answers, for spotting answers reused across candidates
+or pasted from the same source.
+
+Each answer is reduced to word SHINGLE_SIZE-shingles and a NUM_PERM-value MinHash
+signature, computed in one vectorized NumPy pass (multiply-shift hashing of the
+64-bit shingle hashes). The signature is cut into BANDS bands of ROWS values; answers
+to the same question that share any band are candidates, and the share of equal
+signature values estimates their Jaccard similarity.
+
+Everything lives in a directory of flat files:
+
+- signatures.u32  one row of NUM_PERM uint32 per answer (append-only)
+- owners.u64      question and session hashes per answer (append-only)
+- band_keys.u64 / band_rows.u32  band table: (band key, answer row) sorted by key,
+  memory-mapped and searched with np.searchsorted
+- meta.json       parameters and how many answers the band table covers
+
+Answers added since the band table was last rebuilt are kept in an in-memory delta
+(rebuilt from signatures.u32 on open) and merged in every COMPACT_AFTER answers.
+
+    index = AnswerIndex("sessions/answer_index")
+    index.match("py_m_2", answer, exclude_session=session_id)   # {"answer", "jaccard"} or None
+    index.add("py_m_2", answer, session_id=session_id)
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+
+import lazy_loader
+
+ANSWER_INDEX_PATH = os.path.join("sessions", "answer_index")
+
+# Words per shingle, and MinHash signature layout (BANDS * ROWS == NUM_PERM). With 16
+# bands of 4, pairs above Jaccard ~0.5 become candidates; estimates are within ~0.05
+SHINGLE_SIZE = 3
+NUM_PERM = 64
+BANDS = 16
+ROWS = 4
+
+# Estimated Jaccard similarity from which an answer is reported as a near-duplicate
+NEAR_DUPLICATE_JACCARD = 0.8
+
+# Distinct shingles (about as many words) an answer needs before it is matched at all:
+# one-line answers such as "Tuples are immutable, lists are not." are phrased the same
+# way by many candidates
+MIN_SHINGLES = 12
+
+# Candidates verified per band key (newest first), so a very common answer stays cheap
+MAX_CANDIDATES = 64
+
+# Answers kept in the in-memory delta before the band table is rebuilt
+COMPACT_AFTER = 20000
+
+# Fixed so signatures stay comparable across runs (stored in meta.json)
+HASH_SEED = 1729
+
+_WORD = re.compile(r"[a-z0-9']+")
+_MIX = 0x9E3779B97F4A7C15
+
+
+def _hash64(text):
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "little")
+
+
+def shingles(text):
+    """64-bit hashes of the answer's word shingles (lower-cased, punctuation dropped)."""
+    np = lazy_loader.load("numpy")
+    words = _WORD.findall(text.lower())
+    if not words:
+        return np.zeros(0, dtype=np.uint64)
+    ids = np.array([_hash64(w) for w in words], dtype=np.uint64)
+    if len(ids) < SHINGLE_SIZE:
+        ids = np.concatenate([ids, np.zeros(SHINGLE_SIZE - len(ids), dtype=np.uint64)])
+    # Combine consecutive word hashes: rotate-and-xor is position sensitive and vectorizes
+    result = np.zeros(len(ids) - SHINGLE_SIZE + 1, dtype=np.uint64)
+    for offset in range(SHINGLE_SIZE):
+        part = ids[offset:len(ids) - SHINGLE_SIZE + 1 + offset]
+        shift = np.uint64(offset * 21)
+        result ^= (part << shift) | (part >> (np.uint64(64) - shift)) if offset else part
+    return np.unique(result)
+
+
+class MinHasher:
+    def __init__(self, num_perm=NUM_PERM, seed=HASH_SEED):
+        np = lazy_loader.load("numpy")
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hashing: odd multipliers, top 32 bits of a*x + b (mod 2**64)
+        self.a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingle_hashes):
+        """uint32[num_perm]; all values 2**32 - 1 for an empty answer."""
+        np = lazy_loader.load("numpy")
+        if len(shingle_hashes) == 0:
+            return np.full(len(self.a), 0xFFFFFFFF, dtype=np.uint32)
+        values = (shingle_hashes[:, None] * self.a[None, :] + self.b[None, :]) >> np.uint64(32)
+        return values.min(axis=0).astype(np.uint32)
+
+
+def band_keys(signature, question_hash):
+    """One uint64 key per band, salted with the question so questions never collide."""
+    np = lazy_loader.load("numpy")
+    mix = np.uint64(_MIX)
+    bands = signature.reshape(BANDS, ROWS).astype(np.uint64)
+    keys = (np.arange(BANDS, dtype=np.uint64) + np.uint64(1)) * mix ^ np.uint64(question_hash)
+    for row in range(ROWS):
+        keys = (keys ^ bands[:, row]) * mix
+        keys ^= keys >> np.uint64(29)
+    return keys
+
+
+class AnswerIndex:
+    def __init__(self, path=ANSWER_INDEX_PATH):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._lock = threading.Lock()
+        self._meta = self._read_meta()
+        self.base_count = self._meta["base_count"]
+        self._row_bytes = NUM_PERM * 4
+        self.count = min(self._size("signatures.u32") // self._row_bytes, self._size("owners.u64") // 16)
+        # A crash during add() can leave one file ahead of the other (or a partial row);
+        # cut both back to the rows they share, so later rows stay aligned
+        for name, row_bytes in (("signatures.u32", self._row_bytes), ("owners.u64", 16)):
+            if self._size(name) > self.count * row_bytes:
+                os.truncate(self._file(name), self.count * row_bytes)
+        # The hasher, maps and delta need NumPy; they are built on first use (_load), so
+        # opening the index at startup stays cheap
+        self.hasher = None
+
+    def _load(self):
+        with self._lock:
+            if self.hasher is None:
+                self._open_maps()
+                self.hasher = MinHasher(self._meta["num_perm"], self._meta["seed"])
+
+    def _open_maps(self):
+        np = lazy_loader.load("numpy")
+        self._signatures = self._map_signatures()
+        self._owners = self._map("owners.u64", np.uint64, (self.count, 2))
+        self._recent = {}  # row -> (signature, question hash, session hash), rows not yet mapped
+        self._base_keys = self._map("band_keys.u64", np.uint64, None)
+        self._base_rows = self._map("band_rows.u32", np.uint32, None)
+        self._delta = {}   # band key -> [rows], for rows >= base_count
+        for row in range(self.base_count, self.count):
+            for key in band_keys(self._signatures[row], int(self._owners[row, 0])).tolist():
+                self._delta.setdefault(key, []).append(row)
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _size(self, name):
+        return os.path.getsize(self._file(name)) if os.path.exists(self._file(name)) else 0
+
+    def _read_meta(self):
+        meta = {"num_perm": NUM_PERM, "bands": BANDS, "rows": ROWS, "seed": HASH_SEED, "base_count": 0}
+        if os.path.exists(self._file("meta.json")):
+            with open(self._file("meta.json"), encoding="utf-8") as f:
+                meta.update(json.load(f))
+        if (meta["num_perm"], meta["bands"], meta["rows"]) != (NUM_PERM, BANDS, ROWS):
+            raise ValueError(f"{self.path} was built with a different signature layout")
+        return meta
+
+    def _write_meta(self):
+        temp = self._file("meta.json.tmp")
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump({"num_perm": NUM_PERM, "bands": BANDS, "rows": ROWS, "seed": HASH_SEED,
+                       "base_count": self.base_count}, f)
+        os.replace(temp, self._file("meta.json"))
+
+    def _map(self, name, dtype, shape):
+        """Read-only memory map of a data file (an empty array if there is no data)."""
+        np = lazy_loader.load("numpy")
+        if shape is None:
+            shape = (self._size(name) // np.dtype(dtype).itemsize,)
+        if not shape[0]:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(self._file(name), dtype=dtype, mode="r", shape=shape)
+
+    def _map_signatures(self):
+        np = lazy_loader.load("numpy")
+        return self._map("signatures.u32", np.uint32, (self.count, NUM_PERM))
+
+    def _row(self, row):
+        """(signature, question hash, session hash) of a stored answer."""
+        if row in self._recent:
+            return self._recent[row]
+        return self._signatures[row], int(self._owners[row, 0]), int(self._owners[row, 1])
+
+    def _candidates(self, keys):
+        np = lazy_loader.load("numpy")
+        rows = []
+        if len(self._base_keys):
+            starts = np.searchsorted(self._base_keys, keys, "left")
+            ends = np.searchsorted(self._base_keys, keys, "right")
+            for start, end in zip(starts.tolist(), ends.tolist()):
+                # Rows are sorted within a key, so the slice end holds the newest answers
+                rows.extend(self._base_rows[max(start, end - MAX_CANDIDATES):end].tolist())
+        for key in keys.tolist():
+            rows.extend(self._delta.get(key, ())[-MAX_CANDIDATES:])
+        return sorted(set(rows), reverse=True)  # newest first, so it wins ties
+
+    def match(self, question_id, text, exclude_session=None, threshold=NEAR_DUPLICATE_JACCARD):
+        """
+        The most similar earlier answer to the same question, as {"answer": row,
+        "jaccard": estimate}, or None if none reaches `threshold`. Answers from
+        `exclude_session` are ignored. Answers with fewer than MIN_SHINGLES shingles
+        are never matched.
+        """
+        shingle_hashes = shingles(text)
+        if len(shingle_hashes) < MIN_SHINGLES:
+            return None
+        self._load()
+        np = lazy_loader.load("numpy")
+        signature = self.hasher.signature(shingle_hashes)
+        question = _hash64(str(question_id))
+        excluded = _hash64(exclude_session) if exclude_session else None
+        best = None
+        with self._lock:
+            for row in self._candidates(band_keys(signature, question)):
+                other, other_question, session = self._row(row)
+                if other_question != question or session == excluded:
+                    continue
+                jaccard = float(np.count_nonzero(other == signature)) / NUM_PERM
+                if jaccard >= threshold and (best is None or jaccard > best["jaccard"]):
+                    best = {"answer": row, "jaccard": round(jaccard, 3)}
+        return best
+
+    def add(self, question_id, text, session_id=None):
+        """Stores an answer. Returns its row number."""
+        self._load()
+        np = lazy_loader.load("numpy")
+        signature = self.hasher.signature(shingles(text))
+        question = _hash64(str(question_id))
+        session = _hash64(session_id) if session_id else 0
+        with self._lock:
+            row = self.count
+            with open(self._file("signatures.u32"), "ab") as f:
+                f.write(signature.tobytes())
+            with open(self._file("owners.u64"), "ab") as f:
+                f.write(np.array([question, session], dtype=np.uint64).tobytes())
+            self.count += 1
+            self._recent[row] = (signature, question, session)
+            for key in band_keys(signature, question).tolist():
+                self._delta.setdefault(key, []).append(row)
+            if self.count - self.base_count >= COMPACT_AFTER:
+                self._compact()
+        return row
+
+    def compact(self):
+        """Merges the in-memory delta into the memory-mapped band table."""
+        if self.count == self.base_count:
+            return
+        self._load()
+        with self._lock:
+            self._compact()
+
+    def _compact(self):
+        if self.count == self.base_count:
+            return
+        np = lazy_loader.load("numpy")
+        keys = [np.asarray(self._base_keys)]
+        rows = [np.asarray(self._base_rows)]
+        for key, key_rows in self._delta.items():
+            keys.append(np.full(len(key_rows), key, dtype=np.uint64))
+            rows.append(np.array(key_rows, dtype=np.uint32))
+        keys, rows = np.concatenate(keys), np.concatenate(rows)
+        order = np.lexsort((rows, keys))
+        # Drop the maps before replacing the files under them
+        self._base_keys = self._base_rows = self._signatures = self._owners = None
+        for name, data in (("band_keys.u64", keys[order]), ("band_rows.u32", rows[order])):
+            data.tofile(self._file(name + ".tmp"))
+            os.replace(self._file(name + ".tmp"), self._file(name))
+        self.base_count = self.count
+        self._write_meta()
+        self._base_keys = self._map("band_keys.u64", np.uint64, None)
+        self._base_rows = self._map("band_rows.u32", np.uint32, None)
+        self._signatures = self._map_signatures()
+        self._owners = self._map("owners.u64", np.uint64, (self.count, 2))
+        self._recent.clear()
+        self._delta.clear()
+
+    def close(self):
+        """Merges pending answers so the next open does not have to rebuild the delta."""
+        self.compact()
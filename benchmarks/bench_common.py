@@ -0,0 +1,87 @@
+"""Helpers shared by the benchmark scripts: timing, percentiles, JSON results and regression checks."""
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+
+def percentile(samples, pct):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples):
+    """Latency summary in milliseconds for a list of durations in seconds."""
+    ms = [s * 1000.0 for s in samples]
+    return {
+        "count": len(ms),
+        "p50_ms": round(percentile(ms, 50), 3) if ms else None,
+        "p90_ms": round(percentile(ms, 90), 3) if ms else None,
+        "p99_ms": round(percentile(ms, 99), 3) if ms else None,
+        "max_ms": round(max(ms), 3) if ms else None,
+    }
+
+
+class StageTimer:
+    """Collects durations per named stage."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+
+    def wrap(self, stage, fn):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.samples[stage].append(time.perf_counter() - start)
+        return timed
+
+    def record(self, stage, seconds):
+        self.samples[stage].append(seconds)
+
+    def summary(self):
+        return {stage: summarize(samples) for stage, samples in sorted(self.samples.items())}
+
+
+def save_results(name, results, output=None):
+    path = output or os.path.join(RESULTS_DIR, f"{name}.json")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {path}")
+    return path
+
+
+def compare_results(current, baseline, threshold, metric="p50_ms"):
+    """
+    Compares {name: {metric: value}} maps. Returns human readable regressions
+    where `metric` grew by more than `threshold` (relative).
+    """
+    regressions = []
+    for name, stats in current.items():
+        old = baseline.get(name, {}).get(metric)
+        new = stats.get(metric)
+        if old and new is not None and new > old * (1 + threshold):
+            regressions.append(f"{name}.{metric}: {old} -> {new} (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def check_baseline(current, baseline_path, threshold, metric="p50_ms"):
+    """Prints regressions against a baseline file and exits non-zero if there are any."""
+    with open(baseline_path) as f:
+        regressions = compare_results(current, json.load(f).get("stages", {}), threshold, metric)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if regressions:
+        sys.exit(1)
@@ -0,0 +1,231 @@
+"""
+Micro-benchmarks for the engine's hot components, on fixed input corpora.
+
+Benchmarks:
+    evaluator          Evaluator.evaluate_answer        small / large answers
+    code_analyzer      CodeAnalyzer.analyze_code        10 .. 5,000 line submissions
+    question_generator QuestionGenerator.get_question   every domain/difficulty
+    resume_parser      ResumeParser.extract_text        1, 5 and 20 page PDFs
+    sentiment          InterviewEngine.analyze_sentiment  small / large answers
+    code_executor      CodeExecutor.run_code            10 .. 5,000 line submissions
+    frame_processing   vision.process_frame             camera-sized frames
+
+Usage:
+    python benchmarks/bench_components.py                         # all benchmarks
+    python benchmarks/bench_components.py -k code_analyzer -k sentiment
+    python benchmarks/bench_components.py --baseline old.json     # fail on >20% p50 regressions
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from bench_common import StageTimer, check_baseline, save_results
+
+WORDS = ("thread lock memory cache latency mutable immutable reference object method "
+         "complexity linear constant recursion queue stack heap garbage collector "
+         "the a of and to in is that it for with as on").split()
+
+CODE_SIZES = [10, 100, 1000, 5000]
+RESUME_PAGES = [1, 5, 20]
+
+
+# --- Corpora (deterministic) -------------------------------------------------
+
+def make_answer(words, seed=0):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(words)) + "."
+
+
+def make_code(lines):
+    """A valid Python module of roughly `lines` lines ending with solution(n)."""
+    body = []
+    i = 0
+    while len(body) < max(0, lines - 6):
+        body += [
+            f"def helper_{i}(values):",
+            "    total = 0",
+            "    for v in values:",
+            "        for w in range(2):",
+            "            total += v * w",
+            f"    return [x + {i} for x in range(total % 7)]",
+            "",
+        ]
+        i += 1
+    body += [
+        "def solution(n):",
+        "    if n <= 1:",
+        "        return 1",
+        "    return n * solution(n - 1)",
+    ]
+    return "\n".join(body) + "\n"
+
+
+def make_pdf(path, pages, lines_per_page=45):
+    """Writes a minimal text-only PDF with `pages` pages (no external dependencies)."""
+    rng = random.Random(pages)
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for _ in range(pages):
+        lines = [" ".join(rng.choice(WORDS) for _ in range(12)) for _ in range(lines_per_page)]
+        text = "BT /F1 10 Tf 14 TL 50 780 Td " + " ".join(f"({line}) '" for line in lines) + " ET"
+        stream = text.encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id)
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % i for i in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, pages)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+# --- Benchmarks --------------------------------------------------------------
+# Each returns a list of (case name, zero-argument callable).
+
+def bench_evaluator():
+    from evaluator import Evaluator
+    evaluator = Evaluator()
+    question = {"text": "Explain the Global Interpreter Lock (GIL).", "type": "theory"}
+    return [(f"{n}_words", lambda a=make_answer(n): evaluator.evaluate_answer(question, a))
+            for n in (20, 2000)]
+
+
+def bench_code_analyzer():
+    from code_analyzer import CodeAnalyzer
+    analyzer = CodeAnalyzer()
+    return [(f"{n}_lines", lambda c=make_code(n): analyzer.analyze_code(c)) for n in CODE_SIZES]
+
+
+def bench_question_generator():
+    from question_generator import QuestionGenerator
+    generator = QuestionGenerator()
+
+    def all_questions():
+        for domain in generator.questions:
+            for difficulty in ("easy", "medium", "hard"):
+                for q_type in (None, "theory", "coding"):
+                    generator.get_question(domain, difficulty, q_type)
+    return [("all_domains", all_questions)]
+
+
+def bench_resume_parser(tmpdir):
+    from resume_parser import ResumeParser
+    parser = ResumeParser()
+    cases = []
+    for pages in RESUME_PAGES:
+        path = os.path.join(tmpdir, f"resume_{pages}.pdf")
+        make_pdf(path, pages)
+        cases.append((f"{pages}_pages", lambda p=path: parser.extract_text(p)))
+    return cases
+
+
+def bench_sentiment():
+    from interview_engine import InterviewEngine
+    engine = InterviewEngine()
+    from sentiment_service import sentiment
+    cases = [(f"{n}_words", lambda a=make_answer(n, seed=1): engine.analyze_sentiment(a)) for n in (20, 2000)]
+    # Uncached scoring: the cache would otherwise hide the cost after the warm-up run
+    answers = [make_answer(50, seed=i) for i in range(100)]
+    cases.append(("batch_100_uncached", lambda: (sentiment.clear(), sentiment.score_batch(answers))))
+    cases.append(("2000_words_uncached",
+                  lambda a=make_answer(2000, seed=1): (sentiment.clear(), sentiment.polarity(a))))
+    return cases
+
+
+def bench_code_executor():
+    from code_executor import CodeExecutor
+    executor = CodeExecutor()
+    tests = [{"input": [5], "output": 120}, {"input": [0], "output": 1}]
+    return [(f"{n}_lines", lambda c=make_code(n): executor.run_code(c, "solution", tests)) for n in CODE_SIZES]
+
+
+def bench_frame_processing():
+    import numpy as np
+    import vision
+    face_mesh = vision.create_face_mesh()
+    rng = np.random.default_rng(0)
+    cases = []
+    for w, h in ((640, 480), (1280, 720), (1920, 1080)):
+        frame = rng.integers(0, 255, size=(h, w, 3), dtype=np.uint8)
+        cases.append((f"{w}x{h}", lambda f=frame: vision.process_frame(f, face_mesh)))
+    return cases
+
+
+BENCHMARKS = {
+    "evaluator": bench_evaluator,
+    "code_analyzer": bench_code_analyzer,
+    "question_generator": bench_question_generator,
+    "resume_parser": bench_resume_parser,
+    "sentiment": bench_sentiment,
+    "code_executor": bench_code_executor,
+    "frame_processing": bench_frame_processing,
+}
+
+# Slow cases get fewer repetitions
+REPEAT = {"code_executor": 5, "resume_parser": 5}
+
+
+def run_case(fn, repeat, timer, name, max_seconds):
+    fn()  # warm-up (imports, caches)
+    deadline = time.perf_counter() + max_seconds
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timer.record(name, time.perf_counter() - start)
+        if time.perf_counter() > deadline:
+            break
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", dest="selected", action="append", choices=sorted(BENCHMARKS),
+                        help="Run only these benchmarks (repeatable)")
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--max-seconds", type=float, default=10.0, help="Time cap per case")
+    parser.add_argument("--output")
+    parser.add_argument("--baseline", help="Previous results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.20)
+    args = parser.parse_args()
+
+    timer = StageTimer()
+    skipped = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for bench in args.selected or sorted(BENCHMARKS):
+            setup = BENCHMARKS[bench]
+            try:
+                cases = setup(tmpdir) if bench == "resume_parser" else setup()
+            except ImportError as e:
+                skipped[bench] = str(e)
+                print(f"{bench}: skipped ({e})")
+                continue
+            for case, fn in cases:
+                name = f"{bench}/{case}"
+                run_case(fn, REPEAT.get(bench, args.repeat), timer, name, args.max_seconds)
+                stats = timer.summary()[name]
+                print(f"{name:36s} n={stats['count']:<4d} p50={stats['p50_ms']:>10.3f} ms  "
+                      f"p90={stats['p90_ms']:>10.3f} ms")
+
+    stages = timer.summary()
+    save_results("components", {"python": sys.version.split()[0], "skipped": skipped, "stages": stages},
+                 args.output)
+    if args.baseline:
+        check_baseline(stages, args.baseline, args.threshold)
+
+
+if __name__ == "__main__":
+    main()
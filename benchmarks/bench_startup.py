@@ -0,0 +1,165 @@
+"""
+Cold-start benchmark.
+
+Measures, in fresh interpreters:
+  * per-module import time (via `python -X importtime`) for the app's entry modules
+  * time from process start until the MainWindow has been shown (offscreen Qt)
+
+and fails if `import gui` imports any of lazy_loader.INTERVIEW_MODULES (NumPy, the
+speech and LLM SDKs, ...), which must stay off the cold-start path.
+
+Usage:
+    python benchmarks/bench_startup.py                      # print + write results JSON
+    python benchmarks/bench_startup.py --baseline old.json  # fail if a metric regressed
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT = os.path.join(REPO_ROOT, "benchmarks", "results", "startup.json")
+
+# Project modules whose import cost is tracked individually
+ENTRY_MODULES = ["gui", "interview_engine", "llm_interface", "resume_parser",
+                 "code_executor", "question_generator", "evaluator", "code_analyzer"]
+
+FIRST_PAINT_SCRIPT = """
+import time
+start = time.perf_counter()
+from PyQt6.QtWidgets import QApplication
+from gui import SESSION_PATHS, MainWindow
+import os, shutil, tempfile
+app = QApplication([])
+# Keep the real session data (and its recovery dialog) out of the measurement
+sessions = tempfile.mkdtemp(prefix="startup_sessions_")
+window = MainWindow({key: os.path.join(sessions, os.path.basename(path)) for key, path in SESSION_PATHS.items()})
+window.show()
+app.processEvents()
+print(time.perf_counter() - start)
+window.tts_thread.stop()
+shutil.rmtree(sessions, ignore_errors=True)
+"""
+
+# Lists the lazily loaded modules that `import gui` pulled in anyway
+EAGER_IMPORTS_SCRIPT = """
+import json, sys
+import gui, lazy_loader
+print(json.dumps([name for name in lazy_loader.INTERVIEW_MODULES if name in sys.modules]))
+"""
+
+
+def _run(args, env=None):
+    return subprocess.run([sys.executable] + args, cwd=REPO_ROOT, env=env,
+                          capture_output=True, text=True, timeout=120)
+
+
+def parse_importtime(stderr):
+    """
+    Parses `-X importtime` output into {module: (self_us, cumulative_us)}.
+    Only the first occurrence of each module is kept (that is when it was imported).
+    """
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            _, self_us, cumulative_us, name = (part.strip() for part in
+                                               line.replace("import time:", "|", 1).split("|"))
+            times.setdefault(name.strip(), (int(self_us), int(cumulative_us)))
+        except ValueError:
+            continue
+    return times
+
+
+def measure_imports(module, repeat):
+    """Returns median cumulative import time (ms) of `module` and its 10 heaviest dependencies."""
+    runs = []
+    for _ in range(repeat):
+        result = _run(["-X", "importtime", "-c", f"import {module}"])
+        if result.returncode != 0:
+            return {"error": result.stderr.strip().splitlines()[-1] if result.stderr else "failed"}
+        runs.append(parse_importtime(result.stderr))
+
+    total_ms = statistics.median(r.get(module, (0, 0))[1] for r in runs) / 1000.0
+    heaviest = sorted(runs[0].items(), key=lambda kv: kv[1][0], reverse=True)[:10]
+    return {
+        "import_ms": round(total_ms, 2),
+        "heaviest_self_ms": {name: round(t[0] / 1000.0, 2) for name, t in heaviest},
+    }
+
+
+def measure_first_paint(repeat):
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    samples = []
+    for _ in range(repeat):
+        result = _run(["-c", FIRST_PAINT_SCRIPT], env=env)
+        if result.returncode != 0:
+            return {"error": result.stderr.strip().splitlines()[-1] if result.stderr else "failed"}
+        samples.append(float(result.stdout.strip().splitlines()[-1]) * 1000.0)
+    return {"first_paint_ms": round(statistics.median(samples), 2)}
+
+
+def eager_imports():
+    """INTERVIEW_MODULES imported by `import gui` (should be none), or None if it failed."""
+    result = _run(["-c", EAGER_IMPORTS_SCRIPT], env=dict(os.environ, QT_QPA_PLATFORM="offscreen"))
+    if result.returncode != 0:
+        return None
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def compare(current, baseline, threshold):
+    """Returns a list of human readable regressions (metric grew by more than `threshold`)."""
+    regressions = []
+    for section in ("imports", "startup"):
+        for name, metrics in current.get(section, {}).items():
+            old = baseline.get(section, {}).get(name, {})
+            for key in ("import_ms", "first_paint_ms"):
+                if key in metrics and key in old and old[key] > 0:
+                    ratio = metrics[key] / old[key]
+                    if ratio > 1 + threshold:
+                        regressions.append(f"{name}.{key}: {old[key]} -> {metrics[key]} ms (+{(ratio - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", help="Previous results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative slowdown (default 25%%)")
+    parser.add_argument("--no-gui", action="store_true", help="Skip the offscreen first-paint measurement")
+    args = parser.parse_args()
+
+    results = {"imports": {}, "startup": {}}
+    for module in ENTRY_MODULES:
+        results["imports"][module] = measure_imports(module, args.repeat)
+        print(f"{module:20s} {results['imports'][module].get('import_ms', 'error')} ms")
+    if not args.no_gui:
+        results["startup"]["main_window"] = measure_first_paint(args.repeat)
+        print(f"{'first paint':20s} {results['startup']['main_window'].get('first_paint_ms', 'error')} ms")
+    results["eager_imports"] = eager_imports()
+    print(f"{'eager imports':20s} {results['eager_imports']}")
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if results["eager_imports"]:
+        print(f"REGRESSION import gui loads {', '.join(results['eager_imports'])}; load them through lazy_loader")
+        sys.exit(1)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
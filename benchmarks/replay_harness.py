@@ -0,0 +1,214 @@
+"""
+Deterministic record/replay harness for end-to-end interview latency.
+
+Drives InterviewEngine (or the full MainWindow, offscreen, with --gui) through a
+recorded script of answers and code submissions. LLM calls are answered by a
+local FakeProvider with canned responses, so no camera, microphone or API key is
+needed, and runs are comparable across commits.
+
+Reports per-stage latency percentiles: question generation, evaluation,
+sentiment, code analysis, code run and the whole answer->next-question loop.
+
+Usage:
+    python benchmarks/replay_harness.py                                # default script, 5 iterations
+    python benchmarks/replay_harness.py --script my_session.json --iterations 20
+    python benchmarks/replay_harness.py --gui                          # drive MainWindow offscreen
+    python benchmarks/replay_harness.py --baseline old.json            # fail on >25% p50 regressions
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import zlib
+
+from bench_common import REPO_ROOT, StageTimer, check_baseline, save_results
+
+DEFAULT_SCRIPT = os.path.join(REPO_ROOT, "benchmarks", "scripts", "python_interview.json")
+
+
+def make_responder(llm_responses):
+    """
+    Picks a canned response from the prompt text (not call order), so hedged
+    duplicates and retries see the same answer and runs stay deterministic.
+    """
+    questions = llm_responses.get("generate_question") or ["Explain Python's memory model."]
+    evaluations = llm_responses.get("evaluate_answer") or [
+        '{"correctness": 70, "depth": 60, "trade_offs": 50, "confidence": 90, "feedback": "OK."}']
+    plans = llm_responses.get("generate_plan") or ['{"questions": []}']
+
+    def respond(messages):
+        system = messages[0]["content"] if messages else ""
+        prompt = messages[-1]["content"] if messages else ""
+        if "strict" in system:
+            pool = evaluations
+        elif "Plan the whole interview" in prompt:
+            pool = plans
+        else:
+            pool = questions
+        return pool[zlib.crc32(prompt.encode()) % len(pool)]
+    return respond
+
+
+def configure_environment(server_url):
+    # Route every LLM call to the fake provider only
+    os.environ.update({
+        "LLM_PROVIDER": "openai",
+        "OPENAI_API_KEY": "replay",
+        "OPENAI_BASE_URL": server_url,
+        "GEMINI_API_KEY": "",
+        "LLM_LOCAL_BASE_URL": "",
+    })
+    # A replay fires turns back to back, far faster than a human; don't let the
+    # provider rate limiter (sized for real APIs) dominate the measurements
+    import llm_interface
+    from llm_scheduler import RequestScheduler
+    llm_interface.scheduler = RequestScheduler(rate=1000, burst=1000)
+
+
+def code_for(turn, question):
+    code = turn.get("code", {})
+    if isinstance(code, str):
+        return code
+    return code.get((question or {}).get("function_name"), code.get("default", ""))
+
+
+def instrument(engine, executor, timer):
+    """Wraps the hot calls on these instances with stage timers."""
+    engine.llm.generate_question = timer.wrap("question_generation", engine.llm.generate_question)
+    engine.llm.evaluate_answer = timer.wrap("evaluation", engine.llm.evaluate_answer)
+    engine.analyze_sentiment = timer.wrap("sentiment", engine.analyze_sentiment)
+    engine.analyzer.analyze_code = timer.wrap("code_analysis", engine.analyzer.analyze_code)
+    executor.run_code = timer.wrap("code_run", executor.run_code)
+
+
+def replay_engine(script, timer):
+    from interview_engine import InterviewEngine
+    from code_executor import CodeExecutor
+
+    engine = InterviewEngine()
+    executor = CodeExecutor()
+    instrument(engine, executor, timer)
+
+    start = time.perf_counter()
+    question = engine.start_interview(script["domain"])
+    timer.record("start_interview", time.perf_counter() - start)
+
+    for turn in script["turns"]:
+        if question is None:
+            break
+        loop_start = time.perf_counter()
+        if question.get("type") == "coding":
+            code = code_for(turn, question)
+            executor.run_code(code, question.get("function_name", "solution"), question.get("test_cases", []))
+            engine.submit_answer(code)
+        else:
+            engine.submit_answer(turn.get("answer", ""), turn.get("wpm", 0), turn.get("fillers", 0))
+        question = engine.get_next_question()
+        timer.record("turn", time.perf_counter() - loop_start)
+    return engine.get_summary(), engine.llm.cache_stats()
+
+
+def replay_gui(script, timer):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+    from gui import SESSION_PATHS, MainWindow
+
+    app = QApplication.instance() or QApplication([])
+    # Session data (journal, response log, indexes) goes to a fresh directory per run:
+    # the replay must not touch the real sessions/, and an empty journal means the
+    # recovery dialog never opens
+    with tempfile.TemporaryDirectory(prefix="replay_sessions_") as sessions:
+        window = MainWindow({key: os.path.join(sessions, os.path.basename(path))
+                             for key, path in SESSION_PATHS.items()})
+        # No camera/microphone in a replay; the UI and engine paths are what we measure
+        window.start_session_threads = lambda: None
+        instrument(window.engine, window.executor, timer)
+        window.show()
+        app.processEvents()
+
+        window.domain_combo.setCurrentText(script["domain"])
+        start = time.perf_counter()
+        window.start_interview()
+        app.processEvents()
+        timer.record("start_interview", time.perf_counter() - start)
+
+        for turn in script["turns"]:
+            question = window.engine.current_question
+            if window.engine.state == "summary" or question is None:
+                break
+            loop_start = time.perf_counter()
+            if question.get("type") == "coding":
+                window.coding_panel.set_code(code_for(turn, question))
+                window.run_code()
+            else:
+                window.answer_input.setText(turn.get("answer", ""))
+                window.last_wpm, window.last_fillers = turn.get("wpm", 0), turn.get("fillers", 0)
+            window.submit_answer()
+            app.processEvents()
+            window.next_question()
+            app.processEvents()
+            timer.record("turn", time.perf_counter() - loop_start)
+
+        summary = window.engine.get_summary(), window.engine.llm.cache_stats()
+        window.tts_thread.stop()
+        window.close()
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--script", default=DEFAULT_SCRIPT)
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Injected provider latency (seconds)")
+    parser.add_argument("--gui", action="store_true", help="Drive MainWindow offscreen instead of the engine")
+    parser.add_argument("--output")
+    parser.add_argument("--baseline", help="Previous results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    args = parser.parse_args()
+
+    with open(args.script) as f:
+        script = json.load(f)
+
+    from fake_provider import FakeProvider
+    server = FakeProvider(responses=make_responder(script.get("llm_responses", {})),
+                          latency=args.llm_latency).start()
+    configure_environment(server.url)
+
+    timer = StageTimer()
+    summaries, cache_stats = [], {}
+    try:
+        for _ in range(args.iterations):
+            random.seed(script.get("seed", 0))
+            summary, cache_stats = replay_gui(script, timer) if args.gui else replay_engine(script, timer)
+            summaries.append(summary)
+    finally:
+        server.stop()
+
+    stages = timer.summary()
+    for stage, stats in stages.items():
+        print(f"{stage:22s} n={stats['count']:<4d} p50={stats['p50_ms']:>9.2f} ms  "
+              f"p90={stats['p90_ms']:>9.2f} ms  p99={stats['p99_ms']:>9.2f} ms")
+    for call_type, stats in cache_stats.items():
+        print(f"prompt cache {call_type:17s} input={stats['input_tokens']:<6d} "
+              f"cached={stats['cached_tokens']:<6d} hit ratio={stats['hit_ratio']:.0%}")
+
+    results = {
+        "script": os.path.relpath(args.script, REPO_ROOT),
+        "mode": "gui" if args.gui else "engine",
+        "iterations": args.iterations,
+        "llm_requests": len(server.requests),
+        "final_summary": summaries[-1] if summaries else None,
+        "prompt_cache": cache_stats,
+        "stages": stages,
+    }
+    save_results("replay_gui" if args.gui else "replay", results, args.output)
+
+    if args.baseline:
+        check_baseline(stages, args.baseline, args.threshold)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""
+Interview transcript view: a virtualized QListView over a bounded message model.
+
+Rows are measured in batches between events rather than all at once, each
+message's QTextDocument is laid out once per width and cached (painting reuses
+it), and long code blocks are clipped to a preview. The widget keeps the most recent CHAT_MAX_MESSAGES; the full transcript
+stays in InterviewEngine.history.
+"""
+import html
+from collections import OrderedDict
+from itertools import count
+
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QSize
+from PyQt6.QtGui import QColor, QTextDocument
+from PyQt6.QtWidgets import QAbstractItemView, QListView, QStyle, QStyledItemDelegate
+
+# Messages kept in the widget (older ones are dropped from the view, not the engine)
+CHAT_MAX_MESSAGES = 400
+
+# Laid-out documents kept by the delegate (one per message and width)
+CHAT_LAYOUT_CACHE_SIZE = 256
+
+# Code answers longer than this are shown as a preview
+CHAT_CODE_PREVIEW_LINES = 40
+
+# Rows laid out per batch while scrolling
+CHAT_LAYOUT_BATCH_SIZE = 50
+
+CHAT_PADDING = 6
+
+CHAT_STYLES = {
+    "ai": {"prefix": "AI:", "background": "#2f3b4a"},
+    "user": {"prefix": "You:", "background": "#3a3a3a"},
+    "feedback": {"prefix": "AI Feedback:", "background": "#2b2b2b"},
+    "follow_up": {"prefix": "Follow-ups:", "background": "#2b2b2b"},
+}
+
+MessageRole = Qt.ItemDataRole.UserRole + 1
+
+_ids = count()
+
+
+def looks_like_code(text):
+    return "\n" in text.strip() and any(line.startswith((" ", "\t")) for line in text.splitlines())
+
+
+def message_html(message):
+    """Renders one message as rich text. Code is clipped to CHAT_CODE_PREVIEW_LINES."""
+    style = CHAT_STYLES[message["kind"]]
+    text = message["text"]
+    if message["kind"] == "user" and looks_like_code(text):
+        lines = text.rstrip("\n").split("\n")
+        more = ""
+        if len(lines) > CHAT_CODE_PREVIEW_LINES:
+            more = f"<br><i>... {len(lines) - CHAT_CODE_PREVIEW_LINES} more lines</i>"
+            lines = lines[:CHAT_CODE_PREVIEW_LINES]
+        body = f"<pre style='font-family: \"Courier New\"'>{html.escape(chr(10).join(lines))}</pre>{more}"
+    else:
+        body = html.escape(text).replace("\n", "<br>")
+    if message["kind"] in ("feedback", "follow_up"):
+        return f"<i>{style['prefix']} {body}</i>"
+    return f"<b>{style['prefix']}</b> {body}"
+
+
+class ChatModel(QAbstractListModel):
+    """Bounded list of transcript messages ({"id", "kind", "text"})."""
+
+    def __init__(self, max_messages=CHAT_MAX_MESSAGES, parent=None):
+        super().__init__(parent)
+        self.max_messages = max_messages
+        self.messages = []
+        self.dropped = 0
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.messages)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        message = self.messages[index.row()]
+        if role == MessageRole:
+            return message
+        if role == Qt.ItemDataRole.DisplayRole:
+            return message["text"]
+        return None
+
+    def append(self, kind, text):
+        if kind not in CHAT_STYLES:
+            raise ValueError(f"Unknown message kind: {kind}")
+        row = len(self.messages)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.messages.append({"id": next(_ids), "kind": kind, "text": str(text)})
+        self.endInsertRows()
+        self._trim()
+
+    def _trim(self):
+        excess = len(self.messages) - self.max_messages
+        if excess > 0:
+            self.beginRemoveRows(QModelIndex(), 0, excess - 1)
+            del self.messages[:excess]
+            self.dropped += excess
+            self.endRemoveRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self.messages = []
+        self.dropped = 0
+        self.endResetModel()
+
+    def load_history(self, history):
+        """Rebuilds the transcript from InterviewEngine.history entries."""
+        messages = []
+        for entry in history:
+            if entry['role'] == 'ai':
+                messages.append(("ai", entry['content']))
+            else:
+                messages.append(("user", entry['content']))
+                if 'score' in entry:
+                    messages.append(("feedback", f"Score: {entry['score']}. {entry.get('feedback', '')}"))
+        self.beginResetModel()
+        self.dropped = max(0, len(messages) - self.max_messages)
+        self.messages = [{"id": next(_ids), "kind": kind, "text": str(text)}
+                         for kind, text in messages[self.dropped:]]
+        self.endResetModel()
+
+
+class ChatDelegate(QStyledItemDelegate):
+    """Paints messages from cached QTextDocuments, laid out lazily on first use."""
+
+    def __init__(self, cache_size=CHAT_LAYOUT_CACHE_SIZE, parent=None):
+        super().__init__(parent)
+        self.cache_size = cache_size
+        self._documents = OrderedDict()  # (message id, width) -> QTextDocument
+        self.stats = {"layouts": 0, "hits": 0}
+
+    def document(self, message, width):
+        key = (message["id"], width)
+        doc = self._documents.get(key)
+        if doc is not None:
+            self._documents.move_to_end(key)
+            self.stats["hits"] += 1
+            return doc
+        doc = QTextDocument()
+        doc.setDocumentMargin(0)
+        doc.setDefaultStyleSheet("body { color: white; }")
+        doc.setHtml(message_html(message))
+        doc.setTextWidth(width)
+        self.stats["layouts"] += 1
+        self._documents[key] = doc
+        if len(self._documents) > self.cache_size:
+            self._documents.popitem(last=False)
+        return doc
+
+    def clear(self):
+        self._documents.clear()
+
+    @staticmethod
+    def _row_width(option):
+        # Rows span the viewport; option.rect is not the item rect during layout
+        if option.widget is not None:
+            return option.widget.viewport().width() - 2 * option.widget.spacing()
+        return option.rect.width()
+
+    def _text_width(self, option):
+        return max(1, self._row_width(option) - 2 * CHAT_PADDING)
+
+    def sizeHint(self, option, index):
+        doc = self.document(index.data(MessageRole), self._text_width(option))
+        return QSize(self._row_width(option), int(doc.size().height()) + 2 * CHAT_PADDING)
+
+    def paint(self, painter, option, index):
+        message = index.data(MessageRole)
+        doc = self.document(message, self._text_width(option))
+        painter.save()
+        painter.setClipRect(option.rect)
+        rect = option.rect.adjusted(1, 1, -1, -1)
+        painter.fillRect(rect, QColor(CHAT_STYLES[message["kind"]]["background"]))
+        if option.state & QStyle.StateFlag.State_HasFocus:
+            painter.setPen(QColor("#555"))
+            painter.drawRect(rect)
+        painter.translate(option.rect.left() + CHAT_PADDING, option.rect.top() + CHAT_PADDING)
+        doc.drawContents(painter)
+        painter.restore()
+
+
+class ChatView(QListView):
+    """Transcript widget. append_message() keeps the view pinned to the bottom."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.chat_model = ChatModel(parent=self)
+        self.delegate = ChatDelegate(parent=self)
+        self.setModel(self.chat_model)
+        self.setItemDelegate(self.delegate)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setLayoutMode(QListView.LayoutMode.Batched)
+        self.setBatchSize(CHAT_LAYOUT_BATCH_SIZE)
+        self.setWordWrap(True)
+        self.setSpacing(2)
+
+    def append_message(self, kind, text):
+        scrollbar = self.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum() - 4
+        self.chat_model.append(kind, text)
+        if at_bottom:
+            self.scrollToBottom()
+
+    def load_history(self, history):
+        self.delegate.clear()
+        self.chat_model.load_history(history)
+        self.scrollToBottom()
+
+    def clear(self):
+        self.delegate.clear()
+        self.chat_model.clear()
+
+    def resizeEvent(self, event):
+        # Layouts for the old width will not be reused
+        if event.size().width() != event.oldSize().width():
+            self.delegate.clear()
+        super().resizeEvent(event)
@@ -1,4 +1,31 @@
 import ast
+import builtins
+import copy
+import hashlib
+import operator
+import sys
+import threading
+
+# Asked when nothing specific stands out in the code
+GENERIC_FOLLOW_UPS = [
+    "What is the time and space complexity of your solution?",
+    "Can you explain your logic step-by-step?",
+    "Are there any edge cases (like empty input) that might break this?",
+]
+
+# Before Python 3.12 the AST conversion in ast.parse shares one recursion counter per
+# interpreter (gh-106905), so concurrent parses can fail; the lint thread and the answer
+# scorers parse at the same time
+_PARSE_LOCK = threading.Lock() if sys.version_info < (3, 12) else None
+
+
+def parse(source):
+    """ast.parse, serialised where it is not thread-safe."""
+    if _PARSE_LOCK is None:
+        return ast.parse(source)
+    with _PARSE_LOCK:
+        return ast.parse(source)
+
 
 class CodeAnalyzer:
     def __init__(self):
@@ -12,7 +39,7 @@ class CodeAnalyzer:
         follow_ups = []
         
         try:
-            tree = ast.parse(code_snippet)
+            tree = parse(code_snippet)
         except SyntaxError as e:
             return {
                 "valid": False,
@@ -43,9 +70,7 @@ class CodeAnalyzer:
             follow_ups.append("You defined a class. How would you ensure encapsulation here?")
             
         if not follow_ups:
-            follow_ups.append("What is the time and space complexity of your solution?")
-            follow_ups.append("Can you explain your logic step-by-step?")
-            follow_ups.append("Are there any edge cases (like empty input) that might break this?")
+            follow_ups.extend(GENERIC_FOLLOW_UPS)
             
         return {
             "valid": True,
@@ -53,6 +78,24 @@ class CodeAnalyzer:
             "follow_ups": follow_ups
         }
 
+    def analyze_compiled(self, language, compile_error=None):
+        """
+        Result for code in languages other than Python, which are not parsed here:
+        validity comes from the compile step of CodeExecutor.
+        """
+        if compile_error:
+            return {
+                "valid": False,
+                "error": compile_error,
+                "observations": ["Code does not compile."],
+                "follow_ups": ["Can you fix the compilation error in your code?"]
+            }
+        return {
+            "valid": True,
+            "observations": [f"Solution written in {language}."],
+            "follow_ups": list(GENERIC_FOLLOW_UPS)
+        }
+
 class ASTVisitor(ast.NodeVisitor):
     def __init__(self):
         self.stats = []
@@ -101,6 +144,581 @@ class ASTVisitor(ast.NodeVisitor):
         self.stats.append(f"Detected class definition '{node.name}'.")
         self.generic_visit(node)
 
+
+# --- Live analysis while typing ----------------------------------------------
+
+BUILTIN_NAMES = set(dir(builtins)) | {"__name__", "__file__", "__doc__", "__builtins__",
+                                      "__spec__", "__loader__", "__package__"}
+# Top-level statements that can be re-parsed on their own when an edit stays inside them
+INCREMENTAL_KINDS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+COMPLEXITY_WARNING = 10
+COMPREHENSIONS = (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+DECISION_NODES = (ast.If, ast.For, ast.AsyncFor, ast.While, ast.IfExp, ast.ExceptHandler,
+                  ast.Assert, ast.comprehension)
+
+
+def _bindings(nodes):
+    """Names bound in the scope that directly contains `nodes` (nested scopes excluded)."""
+    names = set()
+    stack = list(nodes)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+            continue
+        if isinstance(node, (ast.Lambda,) + COMPREHENSIONS):
+            continue
+        if isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Load):
+            names.add(node.id)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            names.update((a.asname or a.name).split(".")[0] for a in node.names if a.name != "*")
+        elif isinstance(node, (ast.Global, ast.Nonlocal)):
+            names.update(node.names)
+        elif getattr(node, "name", None) and isinstance(node, (ast.ExceptHandler, ast.MatchAs, ast.MatchStar)):
+            names.add(node.name)
+        elif isinstance(node, ast.MatchMapping) and node.rest:
+            names.add(node.rest)
+        stack.extend(ast.iter_child_nodes(node))
+    return names
+
+
+def _params(args):
+    names = {a.arg for a in args.posonlyargs + args.args + args.kwonlyargs}
+    names.update(a.arg for a in (args.vararg, args.kwarg) if a)
+    return names
+
+
+class _FreeNameVisitor(ast.NodeVisitor):
+    """Collects loads of names that are not bound in any enclosing function/comprehension scope."""
+
+    def __init__(self):
+        self.scopes = []  # [(names, is_class_scope)], innermost last
+        self.free = []    # [(name, lineno, col)]
+
+    def _resolved(self, name):
+        for depth, (names, is_class) in enumerate(reversed(self.scopes)):
+            # Class bodies are only visible to their own statements, not to methods
+            if name in names and (not is_class or depth == 0):
+                return True
+        return False
+
+    def visit_Name(self, node):
+        if isinstance(node.ctx, ast.Load) and not self._resolved(node.id):
+            self.free.append((node.id, node.lineno, node.col_offset))
+
+    def _visit_all(self, nodes):
+        for node in nodes:
+            if node is not None:
+                self.visit(node)
+
+    def _visit_signature(self, args):
+        self._visit_all(args.defaults + args.kw_defaults)
+        for arg in args.posonlyargs + args.args + args.kwonlyargs + [args.vararg, args.kwarg]:
+            if arg is not None and arg.annotation is not None:
+                self.visit(arg.annotation)
+
+    def visit_FunctionDef(self, node):
+        self._visit_all(node.decorator_list)
+        self._visit_signature(node.args)
+        if node.returns is not None:
+            self.visit(node.returns)
+        self.scopes.append((_params(node.args) | _bindings(node.body), False))
+        self._visit_all(node.body)
+        self.scopes.pop()
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Lambda(self, node):
+        self._visit_all(node.args.defaults + node.args.kw_defaults)
+        self.scopes.append((_params(node.args), False))
+        self.visit(node.body)
+        self.scopes.pop()
+
+    def visit_ClassDef(self, node):
+        self._visit_all(node.decorator_list + node.bases + [k.value for k in node.keywords])
+        self.scopes.append((_bindings(node.body), True))
+        self._visit_all(node.body)
+        self.scopes.pop()
+
+    def _visit_comprehension(self, node):
+        # The first iterable is evaluated in the enclosing scope
+        self.visit(node.generators[0].iter)
+        self.scopes.append((_bindings([g.target for g in node.generators]), False))
+        for i, generator in enumerate(node.generators):
+            if i:
+                self.visit(generator.iter)
+            self._visit_all(generator.ifs)
+        self._visit_all([node.key, node.value] if isinstance(node, ast.DictComp) else [node.elt])
+        self.scopes.pop()
+
+    visit_ListComp = visit_SetComp = visit_DictComp = visit_GeneratorExp = _visit_comprehension
+
+
+def _complexity_hints(tree):
+    """(lineno, severity, message) hints for every function in `tree`."""
+    hints = []
+    for func in ast.walk(tree):
+        if not isinstance(func, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        complexity = 1
+        deepest = (0, None)
+        recursive = False
+        stack = [(child, 0) for child in func.body]
+        while stack:
+            node, depth = stack.pop()
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)):
+                continue  # Nested functions are reported on their own
+            if isinstance(node, DECISION_NODES):
+                complexity += 1
+            elif isinstance(node, ast.BoolOp):
+                complexity += len(node.values) - 1
+            elif isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == func.name:
+                recursive = True
+            if isinstance(node, (ast.For, ast.AsyncFor, ast.While)):
+                depth += 1
+                if depth > deepest[0]:
+                    deepest = (depth, node.lineno)
+            stack.extend((child, depth) for child in ast.iter_child_nodes(node))
+
+        if complexity >= COMPLEXITY_WARNING:
+            hints.append((func.lineno, "warning",
+                          f"'{func.name}' has cyclomatic complexity {complexity}; consider splitting it."))
+        if deepest[0] >= 2:
+            hints.append((deepest[1], "info",
+                          f"Nested loops (depth {deepest[0]}) in '{func.name}': roughly O(n^{deepest[0]})."))
+        if recursive:
+            hints.append((func.lineno, "info",
+                          f"'{func.name}' is recursive: check the base case and the recursion depth."))
+    return hints
+
+
+def normalized_tokens(code_snippet):
+    """
+    The AST of `code_snippet` as a flat, source-ordered stream of node types with
+    identifiers and literal values abstracted away, so renamed variables or changed
+    constants do not hide a copied solution. Returns [(token, lineno)]; raises SyntaxError.
+    """
+    tokens = []
+    stack = [(parse(code_snippet), 1)]
+    while stack:
+        node, line = stack.pop()
+        line = getattr(node, "lineno", line)
+        if isinstance(node, ast.Constant):
+            tokens.append((f"lit:{type(node.value).__name__}", line))
+        elif not isinstance(node, (ast.Module, ast.expr_context)):
+            tokens.append((type(node).__name__, line))
+        stack.extend((child, line) for child in reversed(list(ast.iter_child_nodes(node))))
+    return tokens
+
+
+# Calls that observe variable names; code using them is not renamed or cached
+INTROSPECTION_NAMES = {"eval", "exec", "locals", "globals", "vars", "compile"}
+
+# Operators folded when both operands are constants, and the commutative ones whose
+# constant operand is moved to the right
+_FOLDABLE = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv,
+             ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod, ast.Pow: operator.pow,
+             ast.LShift: operator.lshift, ast.RShift: operator.rshift, ast.BitAnd: operator.and_,
+             ast.BitOr: operator.or_, ast.BitXor: operator.xor}
+_UNARY = {ast.USub: operator.neg, ast.UAdd: operator.pos, ast.Invert: operator.invert, ast.Not: operator.not_}
+_COMMUTATIVE = (ast.Add, ast.Mult, ast.BitAnd, ast.BitOr, ast.BitXor)
+_MIRRORED = {ast.Lt: ast.Gt, ast.Gt: ast.Lt, ast.LtE: ast.GtE, ast.GtE: ast.LtE, ast.Eq: ast.Eq, ast.NotEq: ast.NotEq}
+
+# Folded results larger than this (bits, or characters) are left as expressions
+_FOLD_LIMIT = 4096
+
+
+def _constant(node):
+    return isinstance(node, ast.Constant) and not isinstance(node.value, (bytes, type(...)))
+
+
+def _pure(node):
+    return isinstance(node, (ast.Name, ast.Constant))
+
+
+def _fold(op, *values):
+    """The folded constant, or None if folding would raise or produce something huge."""
+    if isinstance(op, ast.Pow) and not (isinstance(values[1], int) and 0 <= values[1] <= 64):
+        return None
+    if isinstance(op, (ast.LShift, ast.Mult)) and any(
+            isinstance(v, int) and abs(v) > _FOLD_LIMIT or isinstance(v, str) and len(v) > _FOLD_LIMIT for v in values):
+        return None  # "x" * 10**9 would be built before its size could be checked
+    try:
+        result = (_FOLDABLE if len(values) == 2 else _UNARY)[type(op)](*values)
+    except Exception:
+        return None
+    if isinstance(result, int) and result.bit_length() > _FOLD_LIMIT or \
+            isinstance(result, str) and len(result) > _FOLD_LIMIT:
+        return None
+    return ast.Constant(result)
+
+
+def _bound_names(func):
+    """
+    Names local to a function, in source order: parameters and names it assigns.
+    Names bound by imports, match patterns or global/nonlocal are left out (kept as is).
+    """
+    args = func.args
+    names = [a.arg for a in args.posonlyargs + args.args + [args.vararg] + args.kwonlyargs + [args.kwarg] if a]
+    kept = set()
+    stack = list(reversed(func.body)) if isinstance(func.body, list) else [func.body]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.append(node.name)
+            stack.extend(reversed(node.decorator_list))
+            continue  # their bodies are scopes of their own
+        if isinstance(node, ast.Lambda):
+            continue
+        if isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            names.append(node.id)
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            names.append(node.name)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            kept.update((alias.asname or alias.name).split(".")[0] for alias in node.names)
+        elif isinstance(node, (ast.Global, ast.Nonlocal)):
+            kept.update(node.names)
+        elif isinstance(node, (ast.MatchAs, ast.MatchStar)) and node.name:
+            kept.add(node.name)
+        elif isinstance(node, ast.MatchMapping) and node.rest:
+            kept.add(node.rest)
+        stack.extend(reversed(list(ast.iter_child_nodes(node))))
+    return [name for name in dict.fromkeys(names) if name not in kept]
+
+
+def _strip_docstring(body):
+    if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) \
+            and isinstance(body[0].value.value, str):
+        body = body[1:] or [ast.Pass()]
+    return body
+
+
+class _Canonicalizer(ast.NodeTransformer):
+    """Alpha-renames function locals, folds constants and puts operands in a fixed order."""
+
+    def __init__(self):
+        self.scopes = []  # innermost last: {original name: canonical name}
+
+    def _lookup(self, name):
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        return name
+
+    def _enter(self, node, names):
+        depth = len(self.scopes)
+        self.scopes.append({name: f"_v{depth}_{i}" for i, name in enumerate(names)})
+        for arg in (node.args.posonlyargs + node.args.args + [node.args.vararg]
+                    + node.args.kwonlyargs + [node.args.kwarg]):
+            if arg:
+                arg.arg = self.scopes[-1][arg.arg]
+                arg.annotation = None
+
+    def visit_FunctionDef(self, node):
+        # Decorators and defaults belong to the enclosing scope
+        node.decorator_list = [self.visit(d) for d in node.decorator_list]
+        node.args.defaults = [self.visit(d) for d in node.args.defaults]
+        node.args.kw_defaults = [d and self.visit(d) for d in node.args.kw_defaults]
+        node.name = self._lookup(node.name)
+        node.returns = None
+        self._enter(node, _bound_names(node))
+        node.body = [self.visit(stmt) for stmt in _strip_docstring(node.body)]
+        self.scopes.pop()
+        return node
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Lambda(self, node):
+        node.args.defaults = [self.visit(d) for d in node.args.defaults]
+        node.args.kw_defaults = [d and self.visit(d) for d in node.args.kw_defaults]
+        self._enter(node, _bound_names(node))
+        node.body = self.visit(node.body)
+        self.scopes.pop()
+        return node
+
+    def visit_ClassDef(self, node):
+        node.decorator_list = [self.visit(d) for d in node.decorator_list]
+        node.bases = [self.visit(b) for b in node.bases]
+        node.name = self._lookup(node.name)
+        # Class attributes are reachable by name: keep them, and shadow outer renames
+        self.scopes.append({name: name for name in _bound_names(ast.Lambda(args=ast.arguments(
+            posonlyargs=[], args=[], vararg=None, kwonlyargs=[], kw_defaults=[], kwarg=None, defaults=[]),
+            body=node.body))})
+        node.body = [self.visit(stmt) for stmt in _strip_docstring(node.body)]
+        self.scopes.pop()
+        return node
+
+    def visit_Name(self, node):
+        node.id = self._lookup(node.id)
+        return node
+
+    def visit_ExceptHandler(self, node):
+        self.generic_visit(node)
+        if node.name:
+            node.name = self._lookup(node.name)
+        return node
+
+    def visit_Global(self, node):
+        return node
+
+    visit_Nonlocal = visit_Global
+
+    def visit_AnnAssign(self, node):
+        self.generic_visit(node)
+        if node.value is None:
+            return ast.Pass()
+        return ast.Assign(targets=[node.target], value=node.value)
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if _constant(node.operand):
+            return _fold(node.op, node.operand.value) or node
+        return node
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        if _constant(node.left) and _constant(node.right):
+            return _fold(node.op, node.left.value, node.right.value) or node
+        if isinstance(node.op, _COMMUTATIVE) and _constant(node.left) and not isinstance(node.left.value, str):
+            node.left, node.right = node.right, node.left  # 1 + n -> n + 1
+        return node
+
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+        if len(node.ops) == 1 and type(node.ops[0]) in _MIRRORED:
+            left, right = node.left, node.comparators[0]
+            # 0 == n -> n == 0, b > a -> a < b (operands without side effects only)
+            if (_constant(left) and not _constant(right)) or (
+                    isinstance(node.ops[0], (ast.Gt, ast.GtE)) and _pure(left) and _pure(right)):
+                node.left, node.comparators = right, [left]
+                node.ops = [_MIRRORED[type(node.ops[0])]()]
+        return node
+
+
+def _sort_definitions(body):
+    """Sorts runs of plain top-level functions (no decorators, constant defaults) by their code."""
+    def movable(stmt):
+        return (isinstance(stmt, ast.FunctionDef) and not stmt.decorator_list
+                and all(_constant(d) for d in stmt.args.defaults + [d for d in stmt.args.kw_defaults if d]))
+
+    result, run = [], []
+    for stmt in body + [None]:
+        if stmt is not None and movable(stmt) and stmt.name not in {f.name for f in run}:
+            run.append(stmt)
+            continue
+        result.extend(sorted(run, key=ast.dump))
+        run = []
+        if stmt is not None:
+            result.append(stmt)
+    return result
+
+
+def _binds_parameters_by_name(tree):
+    """
+    True if a call may bind a parameter of a function defined in the code by its name
+    (keyword arguments or ** unpacking). Parameters are alpha-renamed, so such code
+    would share a form with code that fails on an unknown keyword.
+    """
+    local = set()
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            local.add(node.name)
+        elif isinstance(node, ast.Assign) and isinstance(node.value, ast.Lambda):
+            local.update(target.id for target in node.targets if isinstance(target, ast.Name))
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call) or not node.keywords:
+            continue
+        if any(keyword.arg is None for keyword in node.keywords):
+            return True
+        func = node.func.id if isinstance(node.func, ast.Name) else getattr(node.func, "attr", None)
+        # Also functools.partial(helper, arr=...) and the like
+        passed = {arg.id for arg in node.args if isinstance(arg, ast.Name)}
+        if func in local or passed & local:
+            return True
+    return False
+
+
+def canonical_form(code_snippet):
+    """
+    A normalized dump of the code's AST, equal for solutions that differ only in local
+    variable names, comments, docstrings, annotations, constant arithmetic, the side
+    of a comparison or commutative constant operand, or the order of top-level helper
+    functions. Top-level names (the graded function) are kept.
+    Returns None if the code does not parse, inspects its own variable names or passes
+    keyword arguments to its own functions.
+    """
+    try:
+        tree = parse(code_snippet)
+    except (SyntaxError, ValueError):
+        return None
+    if any(isinstance(node, ast.Name) and node.id in INTROSPECTION_NAMES for node in ast.walk(tree)):
+        return None
+    if _binds_parameters_by_name(tree):
+        return None
+    tree = _Canonicalizer().visit(tree)
+    tree.body = _sort_definitions(_strip_docstring(tree.body))
+    return ast.dump(tree, annotate_fields=False)
+
+
+def canonical_hash(code_snippet):
+    """SHA-256 of canonical_form(), or None if the code has no canonical form."""
+    form = canonical_form(code_snippet)
+    return hashlib.sha256(form.encode()).hexdigest() if form is not None else None
+
+
+class _Block:
+    """One top-level statement and what it contributes. Line numbers are relative to `start`."""
+
+    def __init__(self, node, start, end, line_offset):
+        self.kind = type(node)
+        self.start = start  # first line (0-based), including decorators
+        self.end = end      # exclusive; runs up to the next top-level statement
+        self.bound = _bindings([node])
+        self.star_import = isinstance(node, ast.ImportFrom) and any(a.name == "*" for a in node.names)
+        visitor = _FreeNameVisitor()
+        visitor.visit(node)
+        self.free = [(name, line - line_offset, col) for name, line, col in visitor.free]
+        self.hints = [(line - line_offset, severity, message)
+                      for line, severity, message in _complexity_hints(node)]
+
+    def moved(self, delta):
+        if not delta:
+            return self
+        block = copy.copy(self)
+        block.start += delta
+        block.end += delta
+        return block
+
+
+def _node_start(node):
+    return min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])])
+
+
+class IncrementalAnalyzer:
+    """
+    Lint-as-you-type analysis: syntax errors, undefined names and complexity hints.
+
+    Keeps the last successfully parsed module split into top-level blocks. When an
+    edit is confined to one top-level function or class, only that block is re-parsed;
+    every other block keeps its cached results (shifted if lines were added/removed).
+
+    update(code) returns {"valid", "reparsed": "none"|"block"|"full", "diagnostics": [...]}
+    with diagnostics as {"line" (1-based), "col", "severity", "message"}.
+    """
+
+    def __init__(self):
+        self.lines = None   # lines of the last code that parsed
+        self.blocks = []
+        self.last_code = None
+        self.last_result = None
+
+    def _full_parse(self, code, lines):
+        tree = parse(code)
+        blocks = []
+        body = tree.body
+        for i, node in enumerate(body):
+            start = _node_start(node) - 1
+            end = _node_start(body[i + 1]) - 1 if i + 1 < len(body) else len(lines)
+            blocks.append(_Block(node, start, end, start + 1))
+        return blocks
+
+    def _changed_block(self, lines):
+        """Returns (index, new end) of the single incremental block an edit is confined to, or None."""
+        old = self.lines
+        limit = min(len(old), len(lines))
+        prefix = 0
+        while prefix < limit and old[prefix] == lines[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < limit - prefix and old[-1 - suffix] == lines[-1 - suffix]:
+            suffix += 1
+        old_end = len(old) - suffix
+        for index, block in enumerate(self.blocks):
+            if block.start <= prefix and old_end <= block.end and issubclass(block.kind, INCREMENTAL_KINDS):
+                return index, block.end + len(lines) - len(old)
+        return None
+
+    def _others_moved(self, index, new_end):
+        """The blocks before and after `index`, with the later ones shifted by the edit."""
+        delta = new_end - self.blocks[index].end
+        return self.blocks[:index], [block.moved(delta) for block in self.blocks[index + 1:]]
+
+    def _reparse_block(self, index, new_end, lines):
+        """Re-parses one block on its own. Returns the new block list (raises SyntaxError)."""
+        old = self.blocks[index]
+        segment = "\n".join(lines[old.start:new_end])
+        tree = parse(segment)
+        if len(tree.body) != 1 or not isinstance(tree.body[0], INCREMENTAL_KINDS) or _node_start(tree.body[0]) != 1:
+            return None  # The edit added or split top-level statements
+        before, after = self._others_moved(index, new_end)
+        return before + [_Block(tree.body[0], old.start, new_end, 1)] + after
+
+    def update(self, code):
+        if code == self.last_code:
+            return dict(self.last_result, reparsed="none")
+        lines = code.split("\n")
+        blocks = None
+        syntax_error = None
+
+        changed = self._changed_block(lines) if self.lines is not None else None
+        if changed:
+            index, new_end = changed
+            reparsed = "block"
+            try:
+                blocks = self._reparse_block(index, new_end, lines)
+            except SyntaxError:
+                # The block alone may not parse while the module does (e.g. deleting a
+                # `class K:` header folds its body into the function above), so only an
+                # error the full parse also raises is reported
+                try:
+                    blocks = self._full_parse(code, lines)
+                    reparsed = "full"
+                except SyntaxError as e:
+                    # The other blocks are still valid, and the names the broken block
+                    # defined (e.g. its own name) stay defined
+                    syntax_error = (e, 0)
+                    broken = copy.copy(self.blocks[index])
+                    broken.end, broken.free, broken.hints = new_end, [], []
+                    before, after = self._others_moved(index, new_end)
+                    blocks = before + [broken] + after
+        if blocks is None:
+            reparsed = "full"
+            try:
+                blocks = self._full_parse(code, lines)
+            except SyntaxError as e:
+                syntax_error = (e, 0)
+                blocks = []
+
+        if syntax_error is None:
+            self.lines, self.blocks = lines, blocks
+        diagnostics = self._diagnostics(blocks)
+        if syntax_error:
+            error, offset = syntax_error
+            diagnostics.append({"line": (error.lineno or 1) + offset, "col": max(0, (error.offset or 1) - 1),
+                                "severity": "error", "message": f"SyntaxError: {error.msg}"})
+            diagnostics.sort(key=lambda d: (d["line"], d["col"]))
+        self.last_code = code
+        self.last_result = {"valid": syntax_error is None, "reparsed": reparsed, "diagnostics": diagnostics}
+        return self.last_result
+
+    def _diagnostics(self, blocks):
+        diagnostics = []
+        defined = set(BUILTIN_NAMES)
+        for block in blocks:
+            defined |= block.bound
+        check_names = not any(block.star_import for block in blocks)
+        for block in blocks:
+            if check_names:
+                for name, line, col in block.free:
+                    if name not in defined:
+                        diagnostics.append({"line": block.start + line + 1, "col": col, "severity": "error",
+                                            "message": f"Undefined name '{name}'."})
+            for line, severity, message in block.hints:
+                diagnostics.append({"line": block.start + line + 1, "col": 0, "severity": severity,
+                                    "message": message})
+        diagnostics.sort(key=lambda d: (d["line"], d["col"]))
+        return diagnostics
+
 if __name__ == "__main__":
     sample_code = """
 def factorial(n):
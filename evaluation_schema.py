@@ -0,0 +1,173 @@
+import json
+import re
+
+# Rubric dimensions the LLM judge scores (0-100 each) and their weight in the final score.
+RUBRIC_WEIGHTS = {
+    "correctness": 0.5,
+    "depth": 0.3,
+    "trade_offs": 0.2,
+}
+
+EVALUATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "correctness": {"type": "integer", "minimum": 0, "maximum": 100,
+                        "description": "Is the answer technically right?"},
+        "depth": {"type": "integer", "minimum": 0, "maximum": 100,
+                  "description": "Does it go beyond definitions into internals and reasoning?"},
+        "trade_offs": {"type": "integer", "minimum": 0, "maximum": 100,
+                       "description": "Does it discuss alternatives, costs and limitations?"},
+        "confidence": {"type": "integer", "minimum": 0, "maximum": 100,
+                       "description": "How confident the evaluator is in this assessment."},
+        "feedback": {"type": "string",
+                     "description": "Concise, critical feedback. Mention what was wrong or missing."},
+    },
+    "required": ["correctness", "depth", "trade_offs", "confidence", "feedback"],
+    "additionalProperties": False,
+}
+
+
+# Interview plan: one entry per theory question, with variants one step easier/harder
+PLAN_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "questions": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "topic": {"type": "string", "description": "Short topic label."},
+                    "question": {"type": "string", "description": "The primary question, at the stated difficulty."},
+                    "easier": {"type": "string", "description": "Variant for a candidate who is struggling."},
+                    "harder": {"type": "string", "description": "Deeper variant for a candidate who is doing well."},
+                },
+                "required": ["topic", "question", "easier", "harder"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["questions"],
+    "additionalProperties": False,
+}
+
+
+class SchemaError(ValueError):
+    """Raised when a document does not match a schema."""
+
+
+def compile_schema(schema):
+    """
+    Turns a (small subset of) JSON Schema into a validator function, once.
+    Supports type, properties, required, additionalProperties, items, minimum and maximum.
+    The validator raises SchemaError with a JSON-pointer-like path on mismatch.
+    """
+    kind = schema.get("type")
+    checks = []
+
+    if kind == "object":
+        props = {name: compile_schema(sub) for name, sub in schema.get("properties", {}).items()}
+        required = tuple(schema.get("required", ()))
+        closed = schema.get("additionalProperties", True) is False
+
+        def check_object(value, path):
+            if not isinstance(value, dict):
+                raise SchemaError(f"{path or '/'}: expected object")
+            for name in required:
+                if name not in value:
+                    raise SchemaError(f"{path}/{name}: missing required property")
+            for name, item in value.items():
+                if name in props:
+                    props[name](item, f"{path}/{name}")
+                elif closed:
+                    raise SchemaError(f"{path}/{name}: unexpected property")
+        checks.append(check_object)
+    elif kind == "array":
+        item_check = compile_schema(schema["items"]) if "items" in schema else None
+
+        def check_array(value, path):
+            if not isinstance(value, list):
+                raise SchemaError(f"{path}: expected array")
+            if item_check:
+                for i, item in enumerate(value):
+                    item_check(item, f"{path}/{i}")
+        checks.append(check_array)
+    elif kind in ("integer", "number"):
+        minimum, maximum = schema.get("minimum"), schema.get("maximum")
+
+        def check_number(value, path):
+            # bool is an int subclass but never a valid score
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise SchemaError(f"{path}: expected {kind}")
+            if kind == "integer" and isinstance(value, float) and not value.is_integer():
+                raise SchemaError(f"{path}: expected integer")
+            if minimum is not None and value < minimum:
+                raise SchemaError(f"{path}: {value} < {minimum}")
+            if maximum is not None and value > maximum:
+                raise SchemaError(f"{path}: {value} > {maximum}")
+        checks.append(check_number)
+    elif kind == "string":
+        def check_string(value, path):
+            if not isinstance(value, str):
+                raise SchemaError(f"{path}: expected string")
+        checks.append(check_string)
+    elif kind == "boolean":
+        def check_boolean(value, path):
+            if not isinstance(value, bool):
+                raise SchemaError(f"{path}: expected boolean")
+        checks.append(check_boolean)
+
+    def validate(value, path=""):
+        for check in checks:
+            check(value, path)
+    return validate
+
+
+validate_evaluation = compile_schema(EVALUATION_SCHEMA)
+validate_plan = compile_schema(PLAN_SCHEMA)
+
+_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$", re.IGNORECASE)
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+
+def loads_lenient(text):
+    """
+    Parses a JSON object from model output, repairing only syntax noise:
+    markdown code fences, prose around the object and trailing commas.
+    Raises ValueError if no object can be recovered. Never invents values.
+    """
+    text = _FENCE.sub("", text.strip())
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end <= start:
+        raise ValueError("no JSON object in response")
+    candidate = _TRAILING_COMMA.sub(r"\1", text[start:end + 1])
+    return json.loads(candidate)
+
+
+def provider_schema(schema, provider):
+    """
+    Adapts a schema to what each provider's structured-output mode accepts.
+    Gemini's response_schema has no additionalProperties/minimum/maximum;
+    OpenAI strict mode needs additionalProperties false but ignores numeric bounds.
+    Bounds are still enforced locally by the compiled validator.
+    """
+    dropped = {"minimum", "maximum"}
+    if provider == "gemini":
+        dropped = dropped | {"additionalProperties"}
+
+    def strip(node):
+        if isinstance(node, dict):
+            return {k: strip(v) for k, v in node.items() if k not in dropped}
+        if isinstance(node, list):
+            return [strip(v) for v in node]
+        return node
+    return strip(schema)
+
+
+def rubric_score(evaluation):
+    """Weighted 0-100 score from the rubric breakdown."""
+    total = sum(evaluation[name] * weight for name, weight in RUBRIC_WEIGHTS.items())
+    return int(round(total))
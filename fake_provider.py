@@ -0,0 +1,160 @@
+"""
+A local fake of the OpenAI chat completions API.
+
+Used by the tests and benchmarks to exercise LLMInterface without a real
+API key: responses are canned, and latency/errors can be injected per request.
+Automatic prompt caching is emulated per message: the leading messages a request
+shares with an earlier one are reported as `prompt_tokens_details.cached_tokens`.
+
+    with FakeProvider(responses=["What is the GIL?"]) as server:
+        os.environ["OPENAI_BASE_URL"] = server.url
+        ...
+"""
+import json
+import socket
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_RESPONSE = "Explain how Python manages memory."
+
+
+class FakeProvider:
+    def __init__(self, responses=None, latency=0.0, host="127.0.0.1", port=0):
+        """
+        responses: list of strings served in order (the last one repeats),
+                   or a callable(messages) -> str.
+        latency:   seconds to wait before answering, or a list consumed one per request.
+        """
+        self.responses = responses if responses is not None else [DEFAULT_RESPONSE]
+        self.latency = latency
+        self.errors = deque()  # (status, retry_after) injected for the next requests
+        self.requests = []     # JSON bodies received, in order
+        self._lock = threading.Lock()
+        self._served = 0
+        self._prefixes = set()  # leading-message prefixes seen so far (as JSON)
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def inject_errors(self, *statuses, retry_after=None):
+        """Makes the next len(statuses) requests fail with the given HTTP statuses."""
+        with self._lock:
+            for status in statuses:
+                self.errors.append((status, retry_after))
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="FakeProvider", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _next(self, body):
+        """Picks latency, injected error and response text for one request."""
+        with self._lock:
+            self.requests.append(body)
+            index = self._served
+            self._served += 1
+            if isinstance(self.latency, (list, tuple)):
+                latency = self.latency[min(index, len(self.latency) - 1)] if self.latency else 0.0
+            else:
+                latency = self.latency
+            error = self.errors.popleft() if self.errors else None
+            if callable(self.responses):
+                text = None
+            else:
+                text = self.responses[min(index, len(self.responses) - 1)]
+        if text is None:
+            text = self.responses(body.get("messages", []))
+        return latency, error, text
+
+    def _cached_tokens(self, messages):
+        """Tokens (words) in the longest run of leading messages seen in an earlier request."""
+        keys = [json.dumps(messages[:k], sort_keys=True) for k in range(1, len(messages) + 1)]
+        with self._lock:
+            hit = max((k for k, key in enumerate(keys, 1) if key in self._prefixes), default=0)
+            self._prefixes.update(keys)
+        return sum(len(str(m.get("content", "")).split()) for m in messages[:hit])
+
+    def _make_handler(self):
+        provider = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def setup(self):
+                super().setup()
+                # Headers and body go out in separate writes; without this, Nagle's
+                # algorithm + delayed ACKs add ~40 ms to every keep-alive request
+                self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def _send(self, status, payload, headers=None):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                try:
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    # Client gave up (deadline/hedge); nothing to report
+                    pass
+
+            def do_GET(self):
+                if self.path.rstrip("/").endswith("/models"):
+                    self._send(200, {"object": "list", "data": [{"id": "fake-model", "object": "model"}]})
+                else:
+                    self._send(404, {"error": {"message": "not found"}})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if not self.path.endswith("/chat/completions"):
+                    self._send(404, {"error": {"message": "not found"}})
+                    return
+
+                latency, error, text = provider._next(body)
+                if latency:
+                    time.sleep(latency)
+                if error:
+                    status, retry_after = error
+                    headers = {"Retry-After": str(retry_after)} if retry_after is not None else None
+                    self._send(status, {"error": {"message": f"injected {status}", "type": "fake"}}, headers)
+                    return
+
+                messages = body.get("messages", [])
+                prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in messages)
+                cached_tokens = provider._cached_tokens(messages)
+                self._send(200, {
+                    "id": f"fake-{len(provider.requests)}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model", "fake-model"),
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": text}}],
+                    "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(text.split()),
+                              "total_tokens": prompt_tokens + len(text.split()),
+                              "prompt_tokens_details": {"cached_tokens": cached_tokens}},
+                })
+
+        return Handler
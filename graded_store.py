@@ -0,0 +1,79 @@
+"""
+Store of already-graded solutions, so equivalent code skips the sandbox.
+
+Results of CodeExecutor.run_code are kept per question (language, function name and
+test cases) and per solution form: code_analyzer.canonical_hash for Python, so
+submissions that differ only in variable names, comments, constant arithmetic or
+operand order share an entry; the exact source for other languages.
+
+Only complete, deterministic runs are stored: every test case reported, no timeout.
+
+    store = GradedStore("sessions/graded.db")
+    store.get(question_key, form)            # stored run_code result or None
+    store.put(question_key, form, result)
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+GRADED_STORE_PATH = os.path.join("sessions", "graded.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS graded (
+    question TEXT NOT NULL,
+    form TEXT NOT NULL,
+    result TEXT NOT NULL,
+    created REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (question, form)
+) WITHOUT ROWID;
+"""
+
+
+def question_key(language, function_name, test_cases):
+    """Identifies a question by what grading depends on; new test cases start a new entry."""
+    payload = json.dumps([language, function_name, test_cases], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+class GradedStore:
+    def __init__(self, path=GRADED_STORE_PATH):
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self.stats = {"hits": 0, "misses": 0, "stored": 0}
+
+    def get(self, question, form):
+        with self._lock:
+            row = self._db.execute("SELECT result FROM graded WHERE question = ? AND form = ?",
+                                   (question, form)).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["hits"] += 1
+            with self._db:
+                self._db.execute("UPDATE graded SET hits = hits + 1 WHERE question = ? AND form = ?",
+                                 (question, form))
+        return json.loads(row[0])
+
+    def put(self, question, form, result):
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO graded (question, form, result, created) VALUES (?, ?, ?, ?)",
+                             (question, form, json.dumps(result), time.time()))
+            self.stats["stored"] += 1
+
+    def count(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM graded").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
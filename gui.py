@@ -4,29 +4,62 @@ from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QComboBox, QStackedWidget, QMessageBox, QProgressBar,
                              QDialog, QFormLayout, QLineEdit, QFileDialog)
 from PyQt6.QtCore import Qt, QTimer, QThread, pyqtSignal
-from PyQt6.QtGui import QFont, QColor, QPalette, QImage, QPixmap
-import cv2
-import mss
-import numpy as np
-import speech_recognition as sr
-import pyttsx3
-import threading
-try:
-    import mediapipe as mp
-    MEDIAPIPE_AVAILABLE = True
-except ImportError:
-    MEDIAPIPE_AVAILABLE = False
-from textblob import TextBlob
+from PyQt6.QtGui import (QFont, QColor, QPalette, QImage, QPixmap, QShortcut, QKeySequence,
+                         QTextCharFormat, QTextCursor)
 import time
+import threading
 import random
 import queue
 import subprocess
 import platform
 import os
+import html
 from dotenv import set_key
 
+import lazy_loader
+import llm_clients
+import telemetry
+from sampling_profiler import name_thread
+from vision_process import VisionProcess
 from interview_engine import InterviewEngine
-from code_executor import CodeExecutor
+from sentiment_service import sentiment
+from code_executor import BACKENDS, CodeExecutor
+from code_analyzer import IncrementalAnalyzer
+from chat_view import ChatView
+from speculative_eval import SPECULATION_STABLE_MS
+from answer_index import ANSWER_INDEX_PATH
+from graded_store import GRADED_STORE_PATH
+from hidden_tests import HIDDEN_TESTS_DIR
+from irt_model import RESPONSE_LOG_PATH
+from plagiarism_index import PLAGIARISM_INDEX_PATH
+
+# Delay after the first paint before background module warm-up starts
+WARM_UP_DELAY_MS = 200
+
+# Write-ahead journal of the running interview, used for crash recovery
+SESSION_JOURNAL_PATH = os.path.join("sessions", "current.jsonl")
+
+# Session data the main window's engine keeps on disk (InterviewEngine keyword -> path):
+# the journal, scored answers for IRT calibration, code fingerprints, graded solutions,
+# theory-answer signatures and hidden-test corpora
+SESSION_PATHS = {
+    "journal_path": SESSION_JOURNAL_PATH,
+    "response_log_path": RESPONSE_LOG_PATH,
+    "plagiarism_index_path": PLAGIARISM_INDEX_PATH,
+    "graded_store_path": GRADED_STORE_PATH,
+    "answer_index_path": ANSWER_INDEX_PATH,
+    "hidden_tests_dir": HIDDEN_TESTS_DIR,
+}
+
+# Live lint in the code editor: pause after the last keystroke before analysing,
+# and how many diagnostics to list under the editor
+LINT_DEBOUNCE_MS = 40
+LINT_MAX_MESSAGES = 4
+LINT_COLORS = {"error": "#ff4444", "warning": "#ffb300", "info": "#4fc3f7"}
+
+# Debug overlay (F12): refresh interval, and whether it starts visible
+DEBUG_OVERLAY_INTERVAL_MS = 500
+DEBUG_OVERLAY_ON_START = os.getenv("DEBUG_OVERLAY", "") == "1"
 
 class SettingsDialog(QDialog):
     def __init__(self, parent=None):
@@ -108,28 +141,38 @@ class TTSThread(QThread):
         self.running = True
 
     def run(self):
+        name_thread("TTSThread")
         # pyttsx3 can be unstable in threads on macOS. 
         # Using system 'say' command is much more robust.
         is_mac = platform.system() == 'Darwin'
         
+        engine = None
         if not is_mac:
-            engine = pyttsx3.init()
+            # Imported here (not at module load) so the welcome screen shows sooner.
+            # A missing speech backend must not take the whole app down with it.
+            try:
+                pyttsx3 = lazy_loader.load("pyttsx3")
+                engine = pyttsx3.init()
+            except Exception as e:
+                print(f"TTS Init Error: {e}")
         
         while self.running:
             try:
                 text = self.queue.get(timeout=1)
+                telemetry.set_gauge("tts.queue_depth", self.queue.qsize())
                 if text is None:
                     break
                 
                 self.started_speaking.emit()
                 
-                if is_mac:
-                    # macOS native TTS
-                    subprocess.run(['say', text])
-                else:
-                    # Windows/Linux fallback
-                    engine.say(text)
-                    engine.runAndWait()
+                with telemetry.span("tts.utterance", chars=len(text)):
+                    if is_mac:
+                        # macOS native TTS
+                        subprocess.run(['say', text])
+                    elif engine:
+                        # Windows/Linux fallback
+                        engine.say(text)
+                        engine.runAndWait()
                     
                 self.finished_speaking.emit()
                 
@@ -141,6 +184,7 @@ class TTSThread(QThread):
 
     def speak(self, text):
         self.queue.put(text)
+        telemetry.set_gauge("tts.queue_depth", self.queue.qsize())
 
     def stop(self):
         self.running = False
@@ -160,7 +204,9 @@ class ListenerThread(QThread):
         self.paused = False
 
     def run(self):
+        name_thread("ListenerThread")
         self.running = True
+        sr = lazy_loader.load("speech_recognition")
         recognizer = sr.Recognizer()
         mic = sr.Microphone()
         
@@ -177,7 +223,9 @@ class ListenerThread(QThread):
                 if self.paused:
                     continue
 
-                text = recognizer.recognize_google(audio)
+                with telemetry.span("listener.recognize"):
+                    text = recognizer.recognize_google(audio)
+                telemetry.set_gauge("listener.phrase_seconds", end_time - start_time)
                 if text:
                     # Calculate WPM
                     duration = end_time - start_time
@@ -206,52 +254,36 @@ class CameraThread(QThread):
     behavior_signal = pyqtSignal(dict) # {looking_away: bool, eyes_closed: bool}
 
     def run(self):
+        name_thread("CameraThread")
         self.running = True
-        cap = cv2.VideoCapture(0)
-        
-        if MEDIAPIPE_AVAILABLE:
-            mp_face_mesh = mp.solutions.face_mesh
-            face_mesh = mp_face_mesh.FaceMesh(min_detection_confidence=0.5, min_tracking_confidence=0.5)
-        
-        while self.running:
-            ret, frame = cap.read()
-            if ret:
-                frame = cv2.resize(frame, (640, 480))
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                
-                looking_away = False
-                h, w, _ = frame.shape
-
-                if MEDIAPIPE_AVAILABLE:
-                    results = face_mesh.process(rgb_frame)
-                    
-                    if results.multi_face_landmarks:
-                        for face_landmarks in results.multi_face_landmarks:
-                            # Simple Head Pose Estimation (Nose tip vs ears/eyes)
-                            # This is a simplified heuristic. Real pose estimation requires PnP.
-                            nose_tip = face_landmarks.landmark[1]
-                            nose_x = nose_tip.x * w
-                            
-                            # Check if nose is too far left or right (looking away)
-                            if nose_x < w * 0.3 or nose_x > w * 0.7:
-                                looking_away = True
-                                
-                            # Draw mesh (optional, maybe just landmarks)
-                            # mp.solutions.drawing_utils.draw_landmarks(frame, face_landmarks, mp_face_mesh.FACEMESH_TESSELATION)
+        # Capture and inference run in a child process; this thread only relays
+        # its events and preview frames, and mostly sleeps in poll()
+        self.vision = VisionProcess()
+        self.vision.start()
+        try:
+            while self.running:
+                event = self.vision.poll(timeout=0.1)
+                if event is None:
+                    continue
+                telemetry.observe("camera.process_frame", event["inference_ms"] / 1000)
+                telemetry.set_gauge("camera.fps", event["fps"])
 
+                looking_away = event["looking_away"]
                 if looking_away:
                     self.warning_signal.emit("Please maintain eye contact.")
-                    cv2.putText(frame, "LOOKING AWAY", (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
                 else:
                     self.warning_signal.emit("")
-                
+
                 self.behavior_signal.emit({"looking_away": looking_away})
 
-                # Convert to QImage
-                qt_image = QImage(rgb_frame.data, w, h, w*3, QImage.Format.Format_RGB888)
-                self.frame_captured.emit(qt_image)
-            self.msleep(30)
-        cap.release()
+                preview = self.vision.read_preview(event)
+                if preview is not None:
+                    h, w, _ = preview.shape
+                    # Copy: the QImage must not outlive the numpy buffer it wraps
+                    qt_image = QImage(preview.data, w, h, w*3, QImage.Format.Format_RGB888).copy()
+                    self.frame_captured.emit(qt_image)
+        finally:
+            self.vision.stop()
 
     def stop(self):
         self.running = False
@@ -259,7 +291,9 @@ class CameraThread(QThread):
 
 class ScreenCaptureThread(QThread):
     def run(self):
+        name_thread("ScreenCaptureThread")
         self.running = True
+        mss = lazy_loader.load("mss")
         with mss.mss() as sct:
             # Capture primary monitor
             monitor = sct.monitors[1]
@@ -273,6 +307,44 @@ class ScreenCaptureThread(QThread):
         self.running = False
         self.wait()
 
+class LintThread(QThread):
+    # generation, {"valid", "reparsed", "diagnostics"}
+    diagnostics_ready = pyqtSignal(int, dict)
+
+    def __init__(self):
+        super().__init__()
+        self.queue = queue.Queue()
+        self.running = True
+        self.analyzer = IncrementalAnalyzer()
+
+    def run(self):
+        name_thread("LintThread")
+        while self.running:
+            try:
+                item = self.queue.get(timeout=1)
+            except queue.Empty:
+                continue
+            # Only the newest text matters; skip edits that were already superseded
+            while not self.queue.empty():
+                item = self.queue.get_nowait()
+            if item is None:
+                break
+            generation, code = item
+            try:
+                with telemetry.span("lint.update"):
+                    result = self.analyzer.update(code)
+                self.diagnostics_ready.emit(generation, result)
+            except Exception as e:
+                print(f"Lint Error: {e}")
+
+    def analyze(self, generation, code):
+        self.queue.put((generation, code))
+
+    def stop(self):
+        self.running = False
+        self.queue.put(None)
+        self.wait()
+
 class CodingPanel(QWidget):
     run_clicked = pyqtSignal()
     submit_clicked = pyqtSignal()
@@ -287,7 +359,21 @@ class CodingPanel(QWidget):
         header = QLabel("Code Editor")
         header.setFont(QFont("Segoe UI", 14, QFont.Weight.Bold))
         header.setStyleSheet("color: #e0e0e0; margin-bottom: 10px;")
-        layout.addWidget(header)
+        
+        # Language (only those whose toolchain is installed)
+        self.language_combo = QComboBox()
+        for backend in BACKENDS.values():
+            if backend.available():
+                self.language_combo.addItem(backend.label, backend.name)
+        self.language_combo.currentIndexChanged.connect(self.on_language_changed)
+        self.function_name = None
+        self.stub = None
+        
+        header_layout = QHBoxLayout()
+        header_layout.addWidget(header)
+        header_layout.addStretch()
+        header_layout.addWidget(self.language_combo)
+        layout.addLayout(header_layout)
         
         # Code Editor
         self.code_edit = QTextEdit()
@@ -304,6 +390,21 @@ class CodingPanel(QWidget):
         self.code_edit.setPlaceholderText("Write your Python code here...")
         layout.addWidget(self.code_edit, stretch=2)
         
+        # Live diagnostics (syntax errors, undefined names, complexity hints)
+        self.lint_label = QLabel("")
+        self.lint_label.setWordWrap(True)
+        self.lint_label.setFont(QFont("Courier New", 11))
+        self.lint_label.setStyleSheet("color: #aaa;")
+        layout.addWidget(self.lint_label)
+        
+        self.lint_thread = None
+        self.lint_generation = 0
+        self.lint_timer = QTimer(self)
+        self.lint_timer.setSingleShot(True)
+        self.lint_timer.setInterval(LINT_DEBOUNCE_MS)
+        self.lint_timer.timeout.connect(self.request_lint)
+        self.code_edit.textChanged.connect(self.lint_timer.start)
+        
         # Console Output
         self.console_label = QLabel("Console Output:")
         self.console_label.setStyleSheet("color: #aaa; margin-top: 10px;")
@@ -340,6 +441,70 @@ class CodingPanel(QWidget):
         
         layout.addLayout(btn_layout)
         
+    def get_language(self):
+        return self.language_combo.currentData() or "python"
+
+    def start_question(self, function_name):
+        """Pre-fills the editor with a starter signature in the selected language."""
+        self.function_name = function_name
+        self.stub = BACKENDS[self.get_language()].stub(function_name) if function_name else None
+        if self.stub:
+            self.set_code(self.stub)
+
+    def on_language_changed(self):
+        # Swap the starter code only if the candidate has not started editing it
+        if self.function_name and self.get_code() in ("", self.stub):
+            self.start_question(self.function_name)
+        self.request_lint()
+
+    def request_lint(self):
+        if self.get_language() != "python":
+            # The live analysis understands Python only
+            self.lint_generation += 1
+            self.code_edit.setExtraSelections([])
+            self.lint_label.clear()
+            return
+        if self.lint_thread is None:
+            self.lint_thread = LintThread()
+            self.lint_thread.diagnostics_ready.connect(self.show_diagnostics)
+            self.lint_thread.start()
+        self.lint_generation += 1
+        self.lint_thread.analyze(self.lint_generation, self.get_code())
+
+    def show_diagnostics(self, generation, result):
+        if generation != self.lint_generation:
+            return  # The code changed again while this was being analysed
+        diagnostics = result["diagnostics"]
+        document = self.code_edit.document()
+        selections = []
+        for diag in diagnostics:
+            block = document.findBlockByNumber(diag["line"] - 1)
+            if not block.isValid():
+                continue
+            selection = QTextEdit.ExtraSelection()
+            fmt = QTextCharFormat()
+            fmt.setUnderlineStyle(QTextCharFormat.UnderlineStyle.WaveUnderline)
+            fmt.setUnderlineColor(QColor(LINT_COLORS[diag["severity"]]))
+            selection.format = fmt
+            cursor = QTextCursor(block)
+            cursor.movePosition(QTextCursor.MoveOperation.Right, n=min(diag["col"], max(0, block.length() - 1)))
+            cursor.movePosition(QTextCursor.MoveOperation.EndOfBlock, QTextCursor.MoveMode.KeepAnchor)
+            selection.cursor = cursor
+            selections.append(selection)
+        self.code_edit.setExtraSelections(selections)
+
+        lines = [f'<span style="color: {LINT_COLORS[d["severity"]]};">L{d["line"]}: {html.escape(d["message"])}</span>'
+                 for d in diagnostics[:LINT_MAX_MESSAGES]]
+        if len(diagnostics) > LINT_MAX_MESSAGES:
+            lines.append(f"... {len(diagnostics) - LINT_MAX_MESSAGES} more")
+        self.lint_label.setText("<br>".join(lines))
+
+    def stop_linting(self):
+        self.lint_timer.stop()
+        if self.lint_thread:
+            self.lint_thread.stop()
+            self.lint_thread = None
+
     def get_code(self):
         return self.code_edit.toPlainText()
         
@@ -362,15 +527,18 @@ class CodingPanel(QWidget):
     def clear(self):
         self.code_edit.clear()
         self.console_output.clear()
+        self.lint_label.clear()
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, session_paths=None):
+        # session_paths overrides entries of SESSION_PATHS (e.g. a temporary directory
+        # for the replay harness, so it never touches the real session data)
         super().__init__()
         self.setWindowTitle("AI Mock Interviewer - Video Call Mode")
         self.resize(1280, 800)
         
-        self.engine = InterviewEngine()
-        self.executor = CodeExecutor()
+        self.engine = InterviewEngine(**dict(SESSION_PATHS, **(session_paths or {})))
+        self.executor = CodeExecutor(graded_store=self.engine.executor.graded_store)
         self.camera_thread = None
         self.screen_thread = None
         self.listener_thread = None
@@ -406,7 +574,86 @@ class MainWindow(QMainWindow):
         self.central_widget.setCurrentWidget(self.welcome_widget)
         
         self.apply_styles()
-        
+        self._warmed_up = False
+        self.init_debug_overlay()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # Defer heavy imports until the welcome screen has been painted
+        if not self._warmed_up:
+            self._warmed_up = True
+            QTimer.singleShot(WARM_UP_DELAY_MS, self.warm_up_subsystems)
+            if self.engine.has_recoverable_session():
+                QTimer.singleShot(0, self.offer_session_recovery)
+
+    def offer_session_recovery(self):
+        reply = QMessageBox.question(self, "Resume Interview",
+                                     "An unfinished interview was found. Do you want to resume it?")
+        if reply == QMessageBox.StandardButton.Yes and self.engine.recover_session():
+            self.resume_interview()
+        else:
+            self.engine.end_session()
+
+    def resume_interview(self):
+        # Rebuild the transcript from the recovered history
+        history = self.engine.history
+        answered = bool(history) and history[-1]['role'] == 'user'
+        self.chat_history.load_history(history if answered else history[:-1])
+
+        # If the crash happened after an answer was scored, move on to the next question
+        question = self.engine.get_next_question() if answered else self.engine.current_question
+        self.update_question_ui(question)
+        if question:
+            self.central_widget.setCurrentWidget(self.interview_widget)
+            self.start_session_threads()
+
+    def warm_up_subsystems(self):
+        # Background-load camera/audio/NLP libraries and the LLM client
+        lazy_loader.warm_up()
+        sentiment.preload()
+        threading.Thread(target=self.engine.llm.warm_up, name="LLMWarmUp", daemon=True).start()
+        
+    def init_debug_overlay(self):
+        # Floating panel with live latency percentiles and queue depths, toggled with F12
+        self.debug_overlay = QLabel(self)
+        self.debug_overlay.setStyleSheet("background-color: rgba(0,0,0,0.8); color: #0f0; "
+                                         "font-family: 'Courier New'; font-size: 11px; padding: 6px;")
+        self.debug_overlay.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.debug_overlay.hide()
+
+        self.debug_timer = QTimer(self)
+        self.debug_timer.timeout.connect(self.refresh_debug_overlay)
+        QShortcut(QKeySequence("F12"), self, activated=self.toggle_debug_overlay)
+        if DEBUG_OVERLAY_ON_START:
+            self.toggle_debug_overlay()
+
+    def toggle_debug_overlay(self):
+        if self.debug_overlay.isVisible():
+            self.debug_timer.stop()
+            self.debug_overlay.hide()
+        else:
+            self.refresh_debug_overlay()
+            self.debug_overlay.show()
+            self.debug_overlay.raise_()
+            self.debug_timer.start(DEBUG_OVERLAY_INTERVAL_MS)
+
+    def refresh_debug_overlay(self):
+        data = telemetry.snapshot()
+        lines = [f"{'span':28s} {'n':>5s} {'p50 ms':>9s} {'p95 ms':>9s}"]
+        for name, stats in sorted(data["spans"].items()):
+            lines.append(f"{name:28s} {stats['count']:5d} {stats['p50_ms']:9.1f} {stats['p95_ms']:9.1f}")
+        lines.append("")
+        lines.append(f"{'tts queue':28s} {self.tts_thread.queue.qsize():5d}")
+        lines.append(f"{'llm in flight':28s} {self.engine.llm.scheduler_stats()['in_flight']:5d}")
+        spec = self.engine.speculator.stats
+        lines.append(f"{'speculation hit/miss':28s} {spec['hits'] + spec['near_hits']:5d} {spec['misses']:9d}")
+        for name, value in sorted(data["gauges"].items()):
+            if not name.endswith(("queue_depth", "in_flight")):
+                lines.append(f"{name:28s} {value:9.1f}")
+        self.debug_overlay.setText("<pre>" + "\n".join(lines) + "</pre>")
+        self.debug_overlay.adjustSize()
+        self.debug_overlay.move(self.width() - self.debug_overlay.width() - 10, 10)
+
     def apply_styles(self):
         # Dark Theme with Glassmorphism feel
         self.setStyleSheet("""
@@ -595,9 +842,7 @@ class MainWindow(QMainWindow):
         header_layout.addWidget(self.difficulty_label)
         
         # Chat History (Transcript)
-        self.chat_history = QTextEdit()
-        self.chat_history.setReadOnly(True)
-        self.chat_history.setPlaceholderText("Interview transcript will appear here...")
+        self.chat_history = ChatView()
         
         # Current Question (also spoken)
         self.current_q_label = QLabel("...")
@@ -608,6 +853,14 @@ class MainWindow(QMainWindow):
         self.answer_input = QTextEdit()
         self.answer_input.setPlaceholderText("Speak your answer or type here...")
         self.answer_input.setFixedHeight(100)
+
+        # Speculative evaluation: once speech has ended and the transcript has not
+        # changed for SPECULATION_STABLE_MS, the engine starts scoring it
+        self.speculate_timer = QTimer(self)
+        self.speculate_timer.setSingleShot(True)
+        self.speculate_timer.setInterval(SPECULATION_STABLE_MS)
+        self.speculate_timer.timeout.connect(self.speculate_answer)
+        self.answer_input.textChanged.connect(self.on_answer_edited)
         
         # Code Output Console (Hidden by default)
         self.console_output = QTextEdit()
@@ -698,7 +951,9 @@ class MainWindow(QMainWindow):
         if question:
             self.update_question_ui(question)
         self.central_widget.setCurrentWidget(self.interview_widget)
-        
+        self.start_session_threads()
+
+    def start_session_threads(self):
         # Start Monitoring
         self.start_monitoring()
         
@@ -712,6 +967,7 @@ class MainWindow(QMainWindow):
         self.camera_thread = CameraThread()
         self.camera_thread.frame_captured.connect(self.update_camera_feed)
         self.camera_thread.warning_signal.connect(self.update_warning)
+        self.camera_thread.behavior_signal.connect(self.on_behavior)
         self.camera_thread.start()
         
         # Screen
@@ -730,6 +986,15 @@ class MainWindow(QMainWindow):
             self.listener_thread = None
         if self.tts_thread:
             self.tts_thread.stop()
+        self.coding_panel.stop_linting()
+
+    def closeEvent(self, event):
+        # Background threads must be finished before Qt tears them down
+        self.stop_monitoring()
+        if self.engine.answer_index:
+            self.engine.answer_index.close()  # so the next start does not rebuild pending band keys
+        llm_clients.close_all()  # pooled provider connections
+        super().closeEvent(event)
 
     def update_camera_feed(self, image):
         self.camera_label.setPixmap(QPixmap.fromImage(image))
@@ -743,6 +1008,12 @@ class MainWindow(QMainWindow):
             self.warning_label.hide()
             self.camera_label.setStyleSheet("background-color: #222; border: 2px solid #444; border-radius: 10px;")
 
+    def on_behavior(self, metrics):
+        # The camera reports every frame; only journal changes
+        if metrics != getattr(self, 'last_behavior', None):
+            self.last_behavior = metrics
+            self.engine.record_behavior(dict(metrics, t=time.time()))
+
     def on_speech_recognized(self, text, wpm, filler_count):
         current_text = self.answer_input.toPlainText()
         if current_text:
@@ -750,10 +1021,24 @@ class MainWindow(QMainWindow):
         else:
             new_text = text
         self.answer_input.setText(new_text)
+        # Score the transcript so far so the confidence bonus is ready on Submit
+        sentiment.prefetch(new_text)
         
         # Store metrics for submission
         self.last_wpm = wpm
         self.last_fillers = filler_count
+        # The listener emits at the end of a phrase: speech has stopped
+        self.speculate_timer.start()
+
+    def on_answer_edited(self):
+        # Typing after speech delays the speculation until the text settles again
+        if self.speculate_timer.isActive():
+            self.speculate_timer.start()
+
+    def speculate_answer(self):
+        if self.answer_input.isReadOnly() or self.coding_panel.isVisible():
+            return
+        self.engine.speculate_answer(self.answer_input.toPlainText())
 
     def speak_text(self, text):
         self.tts_thread.speak(text)
@@ -797,7 +1082,7 @@ class MainWindow(QMainWindow):
             return
             
         self.current_q_label.setText(question['text'])
-        self.chat_history.append(f"<b>AI:</b> {question['text']}")
+        self.chat_history.append_message("ai", question['text'])
         self.speak_text(question['text'])
         
         self.answer_input.clear()
@@ -819,8 +1104,7 @@ class MainWindow(QMainWindow):
             self.coding_panel.show()
             self.coding_panel.clear()
             # Pre-fill function signature
-            if 'function_name' in question:
-                self.coding_panel.set_code(f"def {question['function_name']}(...):\n    pass")
+            self.coding_panel.start_question(question.get('function_name'))
             
             # Hide standard inputs in sidebar to avoid confusion
             self.answer_input.hide()
@@ -855,7 +1139,8 @@ class MainWindow(QMainWindow):
         function_name = question.get('function_name', 'solution')
         test_cases = question.get('test_cases', [])
         
-        result = self.executor.run_code(code, function_name, test_cases)
+        language = self.coding_panel.get_language() if self.coding_panel.isVisible() else "python"
+        result = self.executor.run_code(code, function_name, test_cases, language)
         
         if self.coding_panel.isVisible():
             if result['success']:
@@ -879,23 +1164,43 @@ class MainWindow(QMainWindow):
         if not answer.strip():
             QMessageBox.warning(self, "Warning", "Please enter an answer.")
             return
+        self.speculate_timer.stop()
             
-        self.chat_history.append(f"<b>You:</b> {answer}")
+        self.chat_history.append_message("user", answer)
         
         # Get metrics
         wpm = getattr(self, 'last_wpm', 0)
         fillers = getattr(self, 'last_fillers', 0)
         
-        result = self.engine.submit_answer(answer, wpm, fillers)
+        language = self.coding_panel.get_language() if self.coding_panel.isVisible() else "python"
+        result = self.engine.submit_answer(answer, wpm, fillers, language=language)
         
         # Feedback
         feedback_text = f"Score: {result.get('score', 'N/A')}. {result.get('feedback', '')}"
-        self.chat_history.append(f"<i>AI Feedback: {feedback_text}</i>")
+        self.chat_history.append_message("feedback", feedback_text)
         self.speak_text(result.get('feedback', ''))
         
+        run = result.get('run')
+        if run and self.coding_panel.isVisible():
+            # The sandbox ran the tests as part of scoring
+            status = "Execution Successful" if run['success'] else f"Execution Failed:\n{run['errors']}\nOutput"
+            self.coding_panel.set_output(f"{status}:\n{run['output']}", is_error=not run['success'])
+
+        similar = result.get('similar_submissions')
+        if similar:
+            self.chat_history.append_message(
+                "feedback", f"Note: this solution closely matches {len(similar)} earlier submission(s) "
+                            f"({similar[0]['similarity']:.0%} similar). Be ready to explain it line by line.")
+
+        duplicate = result.get('near_duplicate')
+        if duplicate:
+            self.chat_history.append_message(
+                "feedback", f"Note: this answer is nearly identical to an earlier one "
+                            f"({duplicate['jaccard']:.0%} overlap). Try explaining it in your own words.")
+
         if 'analysis' in result and result['analysis'].get('follow_ups'):
             follow_ups = "\n".join(["- " + f for f in result['analysis']['follow_ups'][:2]])
-            self.chat_history.append(f"<i>Follow-ups:</i>\n{follow_ups}")
+            self.chat_history.append_message("follow_up", "\n" + follow_ups)
             
         self.submit_btn.hide()
         self.run_btn.hide()
@@ -908,13 +1213,16 @@ class MainWindow(QMainWindow):
 
     def show_summary(self):
         self.stop_monitoring()
+        self.engine.end_session()
         summary = self.engine.get_summary()
         self.score_label.setText(f"Total Score: {summary['total_score']} (Avg: {summary['average_score']:.1f})")
-        self.verdict_label.setText(f"Verdict: {summary['verdict']}")
+        self.verdict_label.setText(f"Verdict: {summary['verdict']} "
+                                   f"(ability {summary['ability']:+.2f} ± {summary['ability_se']:.2f})")
         self.central_widget.setCurrentWidget(self.summary_widget)
 
     def reset_app(self):
         self.stop_monitoring()
+        self.engine.end_session()
         self.central_widget.setCurrentWidget(self.welcome_widget)
 
 if __name__ == "__main__":
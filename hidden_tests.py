@@ -0,0 +1,409 @@
+"""
+Property-based hidden tests for coding questions.
+
+Each covered question has a PropertySpec: a reference implementation (trusted, run
+in-process), a generator of valid inputs of a given size, and for questions whose
+inputs are not plain JSON values (linked lists, decorators, classes) an adapter that
+is appended to the candidate's code and exposes a JSON-in/JSON-out entry point.
+
+The corpus of a question (FUZZ_CASES generated inputs of growing size, with the
+reference outputs) is deterministic and cached per question, so repeated runs only
+cost the sandbox run; equivalent solutions are then served by the graded store. The
+candidate runs against the corpus in FUZZ_WORKERS parallel sandbox runs. A failing
+input is shrunk, first by regenerating at smaller sizes and then by simplifying its
+values, and the smallest failing input is returned as the counterexample.
+
+    runner = HiddenTestRunner(executor, "sessions/hidden_tests")
+    runner.check(question, code, "python")
+    # {"cases": 200, "passed": 187, "counterexample": {"input", "expected", "actual", "error"}, ...}
+"""
+import hashlib
+import inspect
+import json
+import math
+import os
+import random
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import telemetry
+
+HIDDEN_TESTS_DIR = os.path.join("sessions", "hidden_tests")
+
+# Generated inputs per question, and the size the generators ramp up to
+FUZZ_CASES = 200
+FUZZ_MAX_SIZE = 24
+FUZZ_SEED = 20240601
+
+# Parallel sandbox runs the corpus is split across
+FUZZ_WORKERS = 4
+
+# Per-case time limit for generated inputs (they are small; a slow case is a hang)
+FUZZ_CASE_TIME_LIMIT_MS = 500
+
+# Shrinking: seeds tried per smaller size, candidates per sandbox run, and sandbox runs
+SHRINK_SEEDS = 4
+SHRINK_BATCH = 32
+SHRINK_RUNS = 12
+
+
+class PropertySpec:
+    def __init__(self, reference, generate, valid=None, entry=None, prefix="", adapter="", languages=None):
+        self.reference = reference  # args -> expected output
+        self.generate = generate    # (random.Random, size) -> args list
+        self.valid = valid or (lambda args: True)
+        self.entry = entry          # function the harness calls; the question's function_name if None
+        self.prefix = prefix        # code placed before the candidate's
+        self.adapter = adapter      # code placed after it
+        # Adapters are Python; plain JSON specs run in every language with a harness
+        self.languages = languages or (("python",) if prefix or adapter else None)
+
+    def fingerprint(self):
+        """Changes whenever the reference, generator or adapter do, invalidating cached corpora."""
+        digest = hashlib.sha256()
+        for part in (self.reference, self.generate, self.valid):
+            try:
+                digest.update(inspect.getsource(part).encode())
+            except TypeError:  # builtins such as math.factorial
+                digest.update(f"{part.__module__}.{part.__qualname__}".encode())
+        digest.update(f"{self.entry}\0{self.prefix}\0{self.adapter}\0{FUZZ_CASES}\0{FUZZ_MAX_SIZE}\0{FUZZ_SEED}".encode())
+        return digest.hexdigest()[:16]
+
+
+def _factorial_inputs(rng, size):
+    return [rng.randint(0, min(size, 12))]
+
+
+def _missing_inputs(rng, size):
+    n = rng.randint(1, size + 1)
+    values = list(range(1, n + 1))
+    values.remove(rng.randint(1, n))
+    rng.shuffle(values)
+    return [values, n]
+
+
+def _missing_valid(args):
+    values, n = args
+    return isinstance(n, int) and n >= 1 and len(values) == n - 1 and len(set(values)) == n - 1 \
+        and all(isinstance(v, int) and 1 <= v <= n for v in values)
+
+
+def _palindrome_inputs(rng, size):
+    half = "".join(rng.choice("ab") for _ in range(rng.randint(0, size // 2 + 1)))
+    if rng.random() < 0.5:
+        return [half + half[::-1][rng.randint(0, 1):]]
+    return [half + "".join(rng.choice("ab") for _ in range(rng.randint(0, 3)))]
+
+
+def _median(first, second):
+    merged = sorted(first + second)
+    middle = len(merged) // 2
+    return merged[middle] if len(merged) % 2 else (merged[middle - 1] + merged[middle]) / 2
+
+
+def _median_inputs(rng, size):
+    first = sorted(rng.randint(-size, size) for _ in range(rng.randint(0, size)))
+    second = sorted(rng.randint(-size, size) for _ in range(rng.randint(0 if first else 1, size + 1)))
+    return [first, second]
+
+
+def _median_valid(args):
+    first, second = args
+    return bool(first or second) and first == sorted(first) and second == sorted(second)
+
+
+def _list_inputs(rng, size):
+    return [[rng.randint(-9, 9) for _ in range(rng.randint(0, size))]]
+
+
+def _lru_reference(capacity, operations):
+    cache, results = OrderedDict(), []
+    for operation in operations:
+        key = operation[1]
+        if operation[0] == "get":
+            results.append(cache.get(key, -1))
+            if key in cache:
+                cache.move_to_end(key)
+        else:
+            cache[key] = operation[2]
+            cache.move_to_end(key)
+            if len(cache) > capacity:
+                cache.popitem(last=False)
+    return results
+
+
+def _lru_inputs(rng, size):
+    keys = rng.randint(1, max(2, size // 3))
+    operations = [["get", rng.randint(1, keys)] if rng.random() < 0.5 else ["put", rng.randint(1, keys), rng.randint(0, 99)]
+                  for _ in range(rng.randint(1, size + 1))]
+    return [rng.randint(1, 4), operations]
+
+
+def _lru_valid(args):
+    capacity, operations = args
+    return capacity >= 1 and all(len(op) == {"get": 2, "put": 3}.get(op[0]) for op in operations)
+
+
+_NODE_PREFIX = '''
+class _HiddenNode:
+    def __init__(self, data=None, next=None):
+        self.data = data
+        self.next = next
+
+    val = value = property(lambda self: self.data, lambda self, v: setattr(self, "data", v))
+
+
+Node = ListNode = _HiddenNode
+'''
+
+_REVERSE_ADAPTER = '''
+def _hidden_reverse_list(values):
+    head = None
+    for value in reversed(values):
+        head = _HiddenNode(value, head)
+    node, result = reverse_list(head), []
+    while node is not None and len(result) <= len(values):
+        result.append(next(getattr(node, name) for name in ("data", "val", "value") if hasattr(node, name)))
+        node = node.next
+    return result
+'''
+
+_TIME_LOGGER_ADAPTER = '''
+def _hidden_time_logger(values):
+    import contextlib, io
+
+    @time_logger
+    def total(*args, scale=1):
+        return sum(args) * scale
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        return [total(*values), total(*values, scale=2)]
+'''
+
+_LRU_ADAPTER = '''
+def _hidden_lru_cache(capacity, operations):
+    cache, results = LRUCache(capacity), []
+    for operation in operations:
+        if operation[0] == "get":
+            results.append(cache.get(operation[1]))
+        else:
+            cache.put(operation[1], operation[2])
+    return results
+'''
+
+# Question id -> spec
+SPECS = {
+    "py_h_3": PropertySpec(math.factorial, _factorial_inputs),
+    "py_h_4": PropertySpec(lambda values: [sum(values), 2 * sum(values)], _list_inputs,
+                           entry="_hidden_time_logger", adapter=_TIME_LOGGER_ADAPTER),
+    "dsa_m_1": PropertySpec(lambda values: values[::-1], _list_inputs, entry="_hidden_reverse_list",
+                            prefix=_NODE_PREFIX, adapter=_REVERSE_ADAPTER),
+    "dsa_m_2": PropertySpec(lambda values, n: n * (n + 1) // 2 - sum(values), _missing_inputs, valid=_missing_valid),
+    "dsa_m_3": PropertySpec(lambda s: s == s[::-1], _palindrome_inputs, valid=lambda args: isinstance(args[0], str)),
+    "dsa_h_1": PropertySpec(_lru_reference, _lru_inputs, valid=_lru_valid, entry="_hidden_lru_cache",
+                            adapter=_LRU_ADAPTER),
+    "dsa_h_2": PropertySpec(_median, _median_inputs, valid=_median_valid),
+}
+
+
+def _measure(args):
+    return len(json.dumps(args))
+
+
+def _smaller_values(value):
+    """Simpler variants of a JSON value, simplest first."""
+    if isinstance(value, bool):
+        if value:
+            yield False
+    elif isinstance(value, int):
+        if value:
+            yield 0
+            if abs(value) > 1:
+                yield int(value / 2)
+            yield value - (1 if value > 0 else -1)
+    elif isinstance(value, float):
+        if value:
+            yield 0.0
+        if value != int(value):
+            yield float(int(value))
+    elif isinstance(value, str):
+        if value:
+            yield ""
+            yield value[:len(value) // 2]
+            yield value[1:]
+            yield value[:-1]
+    elif isinstance(value, list):
+        if value:
+            yield []
+            yield value[:len(value) // 2]
+            yield value[len(value) // 2:]
+        for i in range(len(value)):
+            yield value[:i] + value[i + 1:]
+        for i, item in enumerate(value):
+            for smaller in _smaller_values(item):
+                yield value[:i] + [smaller] + value[i + 1:]
+
+
+class HiddenTestRunner:
+    def __init__(self, executor, cache_dir=None):
+        self.executor = executor  # code_executor.CodeExecutor
+        self.cache_dir = cache_dir
+        self._corpora = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=FUZZ_WORKERS, thread_name_prefix="HiddenTests")
+
+    def spec_for(self, question, language="python"):
+        """The question's spec if it can be checked in `language`, else None."""
+        spec = SPECS.get((question or {}).get('id'))
+        if spec is None or (spec.languages and language not in spec.languages):
+            return None
+        return spec
+
+    def corpus(self, question_id):
+        """Generated [{"input", "output", "size"}] for a question, from the cache if it is current."""
+        spec = SPECS[question_id]
+        fingerprint = spec.fingerprint()
+        with self._lock:
+            cached = self._corpora.get(question_id)
+            if cached and cached[0] == fingerprint:
+                return cached[1]
+        path = os.path.join(self.cache_dir, f"{question_id}.json") if self.cache_dir else None
+        cases = None
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    stored = json.load(f)
+                if stored.get("fingerprint") == fingerprint:
+                    cases = stored["cases"]
+            except (OSError, ValueError):
+                cases = None
+        if cases is None:
+            with telemetry.span("hidden_tests.generate", question=question_id):
+                cases = self._generate(spec)
+            if path:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with open(path + ".tmp", "w", encoding="utf-8") as f:
+                    json.dump({"fingerprint": fingerprint, "cases": cases}, f)
+                os.replace(path + ".tmp", path)
+        with self._lock:
+            self._corpora[question_id] = (fingerprint, cases)
+        return cases
+
+    def _generate(self, spec):
+        rng = random.Random(FUZZ_SEED)
+        cases, seen = [], set()
+        for attempt in range(FUZZ_CASES * 4):
+            if len(cases) == FUZZ_CASES:
+                break
+            size = attempt * FUZZ_MAX_SIZE // FUZZ_CASES
+            args = spec.generate(rng, min(size, FUZZ_MAX_SIZE))
+            key = json.dumps(args)
+            if key in seen:
+                continue
+            seen.add(key)
+            cases.append(self._case(spec, args, size))
+        return cases
+
+    @staticmethod
+    def _valid(spec, args):
+        try:
+            return bool(spec.valid(args))
+        except (TypeError, ValueError, IndexError, KeyError):
+            return False  # shrinking produced a value of the wrong shape
+
+    def _case(self, spec, args, size=0):
+        # Round-trip through JSON, as the candidate sees it (tuples become lists)
+        output = json.loads(json.dumps(spec.reference(*args)))
+        return {"input": args, "output": output, "size": size, "time_limit_ms": FUZZ_CASE_TIME_LIMIT_MS}
+
+    def _run(self, spec, code, function_name, cases, language):
+        return self.executor.run_code(f"{spec.prefix}\n{code}\n{spec.adapter}" if spec.prefix or spec.adapter else code,
+                                      spec.entry or function_name, cases, language)
+
+    def _first_failure(self, spec, code, function_name, cases, language):
+        """The first case (in order) the candidate fails, with its result; None if all pass."""
+        run = self._run(spec, code, function_name, cases, language)
+        for result in run.get("results", []):
+            if not result["passed"]:
+                return cases[result["case"] - 1], result
+        return None
+
+    @telemetry.traced("hidden_tests.check")
+    def check(self, question, code, language="python"):
+        """
+        Runs the candidate against the question's generated corpus. Returns {"cases",
+        "passed", "counterexample", "shrink_runs"} (counterexample: the smallest failing
+        {"input", "expected", "actual", "error"}, or None), {"error"} if the code did not
+        run, or None if the question has no spec for this language.
+        """
+        spec = self.spec_for(question, language)
+        if spec is None:
+            return None
+        function_name = question.get('function_name', 'solution')
+        corpus = self.corpus(question['id'])
+        chunks = [corpus[i::FUZZ_WORKERS] for i in range(FUZZ_WORKERS)]
+        runs = list(self._pool.map(lambda chunk: self._run(spec, code, function_name, chunk, language), chunks))
+        broken = next((run for run in runs if not run.get("results")), None)
+        if broken is not None:
+            # Compile error, missing function, or the whole run timed out
+            return {"error": broken["errors"]}
+
+        failures = []
+        for chunk, run in zip(chunks, runs):
+            reported = {result["case"]: result for result in run["results"]}
+            for index, case in enumerate(chunk, start=1):
+                # Cases that never ran (the process died part-way) count as failed
+                result = reported.get(index, {"passed": False, "error": run["errors"]})
+                if not result["passed"]:
+                    failures.append((case, result))
+        outcome = {"cases": len(corpus), "passed": len(corpus) - len(failures), "counterexample": None,
+                   "shrink_runs": 0}
+        if failures:
+            case, result = min(failures, key=lambda failure: (failure[0]["size"], _measure(failure[0]["input"])))
+            case, result, outcome["shrink_runs"] = self._shrink(spec, code, function_name, case, result, language)
+            outcome["counterexample"] = {"input": case["input"], "expected": case["output"],
+                                         "actual": result.get("actual"), "error": result.get("error")}
+        return outcome
+
+    def _shrink(self, spec, code, function_name, case, result, language):
+        """Smallest failing case found within SHRINK_RUNS sandbox runs."""
+        runs = 0
+        # Regenerate at every smaller size; the generator keeps the inputs valid
+        if case["size"] > 0:
+            smaller = []
+            for size in range(case["size"]):
+                rng = random.Random(FUZZ_SEED + size)
+                smaller.extend(self._case(spec, spec.generate(rng, size), size) for _ in range(SHRINK_SEEDS))
+            runs += 1
+            found = self._first_failure(spec, code, function_name, smaller, language)
+            if found and _measure(found[0]["input"]) < _measure(case["input"]):
+                case, result = found
+        # Then simplify the values themselves while the candidate still fails
+        while runs < SHRINK_RUNS:
+            candidates, seen = [], set()
+            for position, value in enumerate(case["input"]):
+                for smaller in _smaller_values(value):
+                    args = case["input"][:position] + [smaller] + case["input"][position + 1:]
+                    key = json.dumps(args)
+                    if key not in seen and self._valid(spec, args):
+                        seen.add(key)
+                        candidates.append(args)
+            candidates = sorted(candidates, key=_measure)[:SHRINK_BATCH]
+            cases = []
+            for args in candidates:
+                try:
+                    cases.append(self._case(spec, args, case["size"]))
+                except Exception:
+                    continue  # outside the reference's domain
+            if not cases:
+                break
+            runs += 1
+            found = self._first_failure(spec, code, function_name, cases, language)
+            if not found:
+                break
+            case, result = found
+        return case, result, runs
+
+    def close(self):
+        self._pool.shutdown(wait=False)
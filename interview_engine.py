@@ -1,14 +1,49 @@
 from question_generator import QuestionGenerator
 from code_analyzer import CodeAnalyzer
+from code_executor import CodeExecutor
 from evaluator import Evaluator
 from llm_interface import LLMInterface
 from resume_parser import ResumeParser
+from sentiment_service import sentiment
+from session_journal import SessionJournal
+from speculative_eval import SpeculativeEvaluator
+from scoring_pipeline import ScoringPipeline, merge_code, merge_theory
+from plagiarism_index import PlagiarismIndex
+from answer_index import AnswerIndex
+from hidden_tests import HiddenTestRunner
+from graded_store import GradedStore
+from irt_model import (AbilityEstimator, BUCKET_DIFFICULTY, DEFAULT_DISCRIMINATION, ItemParameters,
+                       MIN_QUESTIONS, PASS_THETA, information, log_response, most_informative)
+import telemetry
+import os
 import random
+import uuid
+
+# Engine attributes captured in journal snapshots
+STATE_FIELDS = ["state", "domain", "resume_text", "difficulty", "current_question", "history",
+                "score_log", "questions_asked", "behavior_log", "current_follow_ups",
+                "session_id", "asked_ids", "responses", "plan", "plan_position"]
+
+# Planning mode: one LLM call at start_interview plans every theory question with
+# easier/harder variants; set INTERVIEW_PLAN=0 to generate each question separately
+PLAN_MODE = os.getenv("INTERVIEW_PLAN", "1") != "0"
+
+# Which planned variant serves which difficulty bucket
+PLAN_VARIANTS = {"easy": "easier", "medium": "question", "hard": "harder"}
+
+# The plan is abandoned for a turn (and the LLM asked instead) when even its best
+# variant carries less Fisher information than this at the current ability estimate
+PLAN_MIN_INFORMATION = 0.18
 
 class InterviewEngine:
-    def __init__(self):
+    def __init__(self, journal_path=None, response_log_path=None, scoring_policy=None, plagiarism_index_path=None,
+                 graded_store_path=None, answer_index_path=None, hidden_tests_dir=None):
         self.q_gen = QuestionGenerator()
         self.analyzer = CodeAnalyzer()
+        # Test results of already-graded solutions, shared across sessions when a path is given
+        self.executor = CodeExecutor(graded_store=GradedStore(graded_store_path) if graded_store_path else None)
+        # Generated tests checked against reference solutions; corpora cached in hidden_tests_dir
+        self.hidden_tests = HiddenTestRunner(self.executor, hidden_tests_dir)
         self.evaluator = Evaluator()
         self.evaluator = Evaluator()
         self.llm = LLMInterface()
@@ -24,29 +59,199 @@ class InterviewEngine:
         
         self.questions_asked = 0
         self.max_questions = 5 
+        self.behavior_log = []
+        self.current_follow_ups = []
         self.use_llm = self.llm.is_configured()
+        # Background evaluation of the stable spoken transcript, reused on Submit
+        self.speculator = SpeculativeEvaluator(self.llm.evaluate_answer)
+        # Answer scorers run concurrently under one deadline; scoring_policy picks how
+        # judge scores are merged (scoring_pipeline.MERGE_POLICIES, default SCORING_POLICY)
+        self.scoring = ScoringPipeline()
+        self.scoring_policy = scoring_policy
+
+        # Adaptive questioning: calibrated question parameters and the candidate's
+        # ability posterior, rebuilt from `responses` ([a, b, score / 100] per answer)
+        self.item_params = ItemParameters.load()
+        self.ability = AbilityEstimator()
+        self.responses = []
+        self.asked_ids = []
+        self.session_id = None
+        self.response_log_path = response_log_path
+        # Fingerprints of earlier code submissions, to flag copied solutions
+        self.plagiarism = PlagiarismIndex(plagiarism_index_path) if plagiarism_index_path else None
+        # MinHash signatures of earlier theory answers, to flag reused or pasted ones
+        self.answer_index = AnswerIndex(answer_index_path) if answer_index_path else None
+
+        # Interview plan (list of {"topic", "question", "easier", "harder"}) and the
+        # next slot to use
+        self.plan = []
+        self.plan_position = 0
+        
+        # Write-ahead journal so a crashed session can be recovered
+        self.journal = SessionJournal(journal_path) if journal_path else None
+
+    def _journal(self, event_type, durable=False, **data):
+        if not self.journal:
+            return
+        try:
+            self.journal.append(event_type, durable=durable, **data)
+            if self.journal.needs_compaction():
+                self.journal.compact(self._state_snapshot())
+        except OSError as e:
+            # Never let journaling break the interview itself
+            print(f"Journal Error: {e}")
+
+    def _state_snapshot(self):
+        return {field: getattr(self, field) for field in STATE_FIELDS}
+
+    def _apply_event(self, record):
+        """Re-applies one journal record to the engine state (used during recovery)."""
+        kind = record["type"]
+        if kind == "start":
+            self.domain = record["domain"]
+            self.resume_text = record.get("resume_text")
+            self.difficulty = record.get("difficulty", self.difficulty)
+            self.state = "ask_theory_question"
+            self.questions_asked = 0
+            self.history = []
+            self.score_log = []
+            self.behavior_log = []
+            self.session_id = record.get("session_id")
+            self.asked_ids = []
+            self.responses = []
+            self.plan = []
+            self.plan_position = 0
+        elif kind == "plan":
+            self.plan = record["plan"]
+        elif kind == "question":
+            self.current_question = record["question"]
+            self.questions_asked = record["questions_asked"]
+            self.state = record["state"]
+            self.history.append({"role": "ai", "content": record["question"]["text"]})
+            if record["question"].get("id"):
+                self.asked_ids.append(record["question"]["id"])
+            self.plan_position = record.get("plan_position", self.plan_position)
+        elif kind == "answer":
+            self.history.append({"role": "user", "content": record["answer"]})
+        elif kind == "score":
+            self.history[-1].update(score=record["score"], feedback=record["feedback"],
+                                    wpm=record["wpm"], fillers=record["fillers"])
+            self.score_log.append(record["score"])
+            self.difficulty = record["difficulty"]
+            self.state = record["state"]
+            self.current_follow_ups = record.get("follow_ups", [])
+            if "item" in record:
+                self.responses.append(record["item"] + [record["score"] / 100])
+        elif kind == "behavior":
+            self.behavior_log.append(record["metrics"])
+        elif kind == "end":
+            self.state = "summary"
 
+    def has_recoverable_session(self):
+        """True if the journal holds a session that was started but never ended."""
+        if not self.journal:
+            return False
+        snapshot, records = self.journal.read()
+        if records:
+            return records[-1]["type"] != "end"
+        return bool(snapshot) and snapshot["state"].get("state") not in ("summary", "select_domain")
+
+    def recover_session(self):
+        """
+        Rebuilds the engine state from the latest snapshot plus the journal records after it.
+        Returns True if an unfinished session was restored.
+        """
+        if not self.has_recoverable_session():
+            return False
+        snapshot, records = self.journal.read()
+        if snapshot:
+            for field, value in snapshot["state"].items():
+                setattr(self, field, value)
+        for record in records:
+            self._apply_event(record)
+        self.ability = AbilityEstimator.from_responses(self.responses)
+        self.use_llm = self.llm.is_configured()
+        return True
+
+    def record_behavior(self, metrics):
+        """Stores behavioral metrics (e.g. camera/eye-contact events) with the session."""
+        self.behavior_log.append(metrics)
+        self._journal("behavior", metrics=metrics)
+
+    def end_session(self):
+        self.speculator.cancel()
+        if self.state != "summary":
+            self.state = "summary"
+        self.llm.end_session()
+        self._journal("end", durable=True)
+
+    @telemetry.traced("engine.start_interview")
     def start_interview(self, domain, resume_path=None):
         self.domain = domain
         self.state = "ask_theory_question"
         self.questions_asked = 0
         self.history = []
         self.score_log = []
+        self.behavior_log = []
         self.resume_text = None
+        self.ability = AbilityEstimator()
+        self.responses = []
+        self.asked_ids = []
+        self.difficulty = self.ability.difficulty()
+        self.session_id = uuid.uuid4().hex
         
         if resume_path:
             self.resume_text = self.resume_parser.extract_text(resume_path)
+        
+        if self.journal:
+            self.journal.reset()
+        self._journal("start", durable=True, domain=domain, resume_text=self.resume_text,
+                      difficulty=self.difficulty, session_id=self.session_id)
             
         # Re-check LLM config in case it changed (e.g. key added)
         self.llm._setup_client() 
         self.use_llm = self.llm.is_configured()
+        # Cache the instructions/domain/resume prompt prefix for the whole session
+        self.plan = []
+        self.plan_position = 0
+        if self.use_llm:
+            self.llm.start_session(domain, self.resume_text)
+            if PLAN_MODE:
+                # One theory question per slot except the coding one
+                self.plan = self.llm.generate_plan(domain, self.max_questions - 1, self.difficulty,
+                                                   self.resume_text) or []
+                self._journal("plan", plan=self.plan)
         return self.get_next_question()
 
+    def _planned_question(self):
+        """
+        The next planned question, in the variant that is most informative at the current
+        ability estimate. None if the plan is used up, or if the candidate has moved
+        outside what every variant of this slot can measure (the slot is then skipped).
+        """
+        if self.plan_position >= len(self.plan):
+            return None
+        slot = self.plan[self.plan_position]
+        self.plan_position += 1
+        theta = self.ability.theta
+        bucket = max(PLAN_VARIANTS, key=lambda b: information(theta, DEFAULT_DISCRIMINATION, BUCKET_DIFFICULTY[b]))
+        if information(theta, DEFAULT_DISCRIMINATION, BUCKET_DIFFICULTY[bucket]) < PLAN_MIN_INFORMATION:
+            return None
+        return {
+            "text": slot[PLAN_VARIANTS[bucket]],
+            "type": "conceptual",
+            "difficulty": bucket,
+            "domain": self.domain,
+            "topic": slot.get("topic"),
+        }
+
+    @telemetry.traced("engine.get_next_question")
     def get_next_question(self):
-        if self.questions_asked >= self.max_questions:
-            self.state = "summary"
+        if self.questions_asked >= self.max_questions or self.verdict_settled():
+            self.end_session()
             return None
 
+        self.speculator.cancel()
         self.questions_asked += 1
         
         # Determine Question Type
@@ -58,6 +263,16 @@ class InterviewEngine:
             q_type = "theory"
             self.state = "ask_theory_question"
 
+        # Walk the interview plan; only go back to the LLM when it no longer fits
+        if self.use_llm and q_type == "theory":
+            question = self._planned_question()
+            if question:
+                self.current_question = question
+                self.history.append({"role": "ai", "content": question['text']})
+                self._journal("question", question=question, questions_asked=self.questions_asked,
+                              state=self.state, plan_position=self.plan_position)
+                return question
+
         # Try LLM first if configured and not a coding question (for now)
         # (We can add LLM coding questions later, but let's stick to static for safety on coding first)
         if self.use_llm and q_type == "theory":
@@ -72,10 +287,17 @@ class InterviewEngine:
                     "domain": self.domain
                 }
                 self.history.append({"role": "ai", "content": llm_question_text})
+                self._journal("question", question=self.current_question, questions_asked=self.questions_asked,
+                              state=self.state, plan_position=self.plan_position)
                 return self.current_question
 
-        # Fallback to Static Generator
-        question = self.q_gen.get_question(self.domain, self.difficulty, q_type)
+        # Fallback to Static Generator: the unasked question that tells us most about
+        # the candidate at the current ability estimate
+        candidates = self.q_gen.candidates(self.domain, q_type, exclude=self.asked_ids)
+        if candidates:
+            question = most_informative(candidates, self.item_params, self.ability.theta)
+        else:
+            question = self.q_gen.get_question(self.domain, self.difficulty, q_type)
         
         # If we couldn't get the requested type, fallback to whatever we got
         if question:
@@ -85,56 +307,121 @@ class InterviewEngine:
                 self.state = "ask_theory_question"
             
             self.current_question = question
+            self.asked_ids.append(question['id'])
             self.history.append({"role": "ai", "content": question['text']})
+            self._journal("question", question=question,
+                          questions_asked=self.questions_asked, state=self.state)
             return question
             
         return None
 
-    def submit_answer(self, answer, wpm=0, fillers=0):
+    @telemetry.traced("engine.analyze_sentiment")
+    def analyze_sentiment(self, answer):
+        """Returns the polarity of the answer text (-1 to 1)."""
+        # Usually already cached: the GUI prefetches it while the answer is spoken
+        return sentiment.polarity(answer)
+
+    def speculate_answer(self, answer):
+        """
+        Starts evaluating a theory answer that is probably final (the candidate has
+        stopped speaking) so submit_answer can reuse the result.
+        """
+        if self.use_llm and self.state == "ask_theory_question" and self.current_question:
+            self.speculator.speculate(self.current_question['text'], answer)
+
+    def _analyze_code(self, answer, function_name, language):
+        if language == "python":
+            return self.analyzer.analyze_code(answer)
+        # Compile it instead (usually a build-cache hit after the candidate's last Run)
+        error = self.executor.check(answer, function_name, language)
+        return self.analyzer.analyze_compiled(language, error)
+
+    def _check_plagiarism(self, answer, language):
+        """Earlier submissions (other sessions) this code closely matches; then indexes it."""
+        matches = self.plagiarism.match(answer, language, exclude_session=self.session_id)
+        self.plagiarism.add(answer, language, question_id=self.current_question.get('id'),
+                            session_id=self.session_id)
+        return matches
+
+    def _check_duplicate(self, question, answer):
+        """The closest earlier answer (other sessions) to this question, if near-identical; then indexes it."""
+        # Generated questions have no id; their text identifies them
+        question_id = question.get('id') or question['text']
+        match = self.answer_index.match(question_id, answer, exclude_session=self.session_id)
+        self.answer_index.add(question_id, answer, session_id=self.session_id)
+        return match
+
+    @telemetry.traced("engine.submit_answer")
+    def submit_answer(self, answer, wpm=0, fillers=0, language="python"):
         """
         Processes the answer with behavioral metrics.
+        `language` is the language of a coding answer (see code_executor.BACKENDS).
+        The result's 'scoring' entry lists scorers that missed the deadline or failed.
         """
         self.history.append({"role": "user", "content": answer})
+        self._journal("answer", answer=answer, wpm=wpm, fillers=fillers)
         result = {}
         
-        # Sentiment Analysis
-        from textblob import TextBlob
-        blob = TextBlob(answer)
-        sentiment_score = blob.sentiment.polarity # -1 to 1
-        
-        # Adjust score based on confidence/sentiment
-        confidence_bonus = 5 if sentiment_score > 0.3 else 0
-        
         feedback = ""
         score = 0
         
+        question = self.current_question
         if self.state == "ask_coding_question":
-            # Analyze code
-            analysis = self.analyzer.analyze_code(answer)
-            result['analysis'] = analysis
-            
-            # Simple scoring for code (validity check)
-            score = 100 if analysis['valid'] else 0
-            feedback = "Code looks good!" if analysis['valid'] else f"Error: {analysis.get('error')}"
+            # Static analysis and the sandbox test run in parallel
+            function_name = question.get('function_name', 'solution')
+            test_cases = question.get('test_cases', [])
+            scorers = {"analysis": lambda: self._analyze_code(answer, function_name, language)}
+            if test_cases:
+                scorers["sandbox"] = lambda: self.executor.run_code(answer, function_name, test_cases, language)
+            if self.plagiarism:
+                scorers["plagiarism"] = lambda: self._check_plagiarism(answer, language)
+            if self.hidden_tests.spec_for(question, language):
+                scorers["hidden_tests"] = lambda: self.hidden_tests.check(question, answer, language)
+            outcome = self.scoring.run(scorers)
+            merged = merge_code(outcome.results, len(test_cases), outcome.missed + outcome.failed)
+            result['analysis'] = merged['analysis']
+            if merged['run'] is not None:
+                result['run'] = merged['run']
+                if merged['run'].get('profile'):
+                    # CPU time, peak traced memory and peak RSS of the test run (per case in run['results'])
+                    result['profile'] = merged['run']['profile']
+            score, feedback = merged['score'], merged['feedback']
+            if not merged['graded']:
+                result['ungraded'] = True
+            if outcome.results.get("hidden_tests"):
+                result['hidden_tests'] = outcome.results["hidden_tests"]
+            if outcome.results.get("plagiarism"):
+                # Reported, not scored: a memorised answer can still be understood
+                result['similar_submissions'] = outcome.results["plagiarism"]
             
             # Store follow-ups for the GUI to display
-            self.current_follow_ups = analysis.get('follow_ups', [])
+            self.current_follow_ups = merged['analysis'].get('follow_ups', [])
             self.state = "ask_code_followup_question"
             
         else:
-            # Evaluate theory
-            # Try LLM Evaluation first
+            # Evaluate theory: LLM judge, keyword evaluator and sentiment in parallel
+            scorers = {
+                "heuristic": lambda: self.evaluator.evaluate_answer(question, answer),
+                "sentiment": lambda: self.analyze_sentiment(answer),
+            }
             if self.use_llm:
-                llm_result = self.llm.evaluate_answer(self.current_question['text'], answer)
-                if llm_result and isinstance(llm_result, dict):
-                    feedback = llm_result.get('feedback', '')
-                    score = llm_result.get('score', 0)
-                else:
-                    # Fallback if LLM fails or returns None
-                     score, feedback = self.evaluator.evaluate_answer(self.current_question, answer)
-            else:
-                score, feedback = self.evaluator.evaluate_answer(self.current_question, answer)
+                # Usually finished already: the GUI starts it when the candidate stops speaking
+                scorers["llm"] = lambda: (self.speculator.take(question['text'], answer)
+                                          or self.llm.evaluate_answer(question['text'], answer))
+            if self.answer_index:
+                scorers["duplicate"] = lambda: self._check_duplicate(question, answer)
+            outcome = self.scoring.run(scorers)
+            merged = merge_theory(outcome.results, self.scoring_policy)
+            score, feedback = merged['score'], merged['feedback']
+            if merged['rubric']:
+                result['rubric'] = merged['rubric']
+            if outcome.results.get("duplicate"):
+                # Reported like similar code submissions; the score is left alone
+                result['near_duplicate'] = outcome.results["duplicate"]
             
+            # Adjust score based on confidence/sentiment (theory answers only; code is not scored on tone)
+            sentiment_score = outcome.results.get("sentiment", 0.0) # -1 to 1
+            confidence_bonus = 5 if sentiment_score > 0.3 else 0
             score += confidence_bonus
             score = min(100, score)
             
@@ -154,13 +441,16 @@ class InterviewEngine:
             
             self.state = "ask_theory_question" # Ready for next
         
-        # Update difficulty
-        if score > 80:
-            self.difficulty = "hard"
-        elif score < 40:
-            self.difficulty = "easy"
-        else:
-            self.difficulty = "medium"
+        # Update the ability estimate; the difficulty bucket follows it
+        item = list(self.item_params.get(self.current_question))
+        self.responses.append(item + [score / 100])
+        self.ability.update(*self.responses[-1])
+        self.difficulty = self.ability.difficulty()
+        if self.response_log_path:
+            try:
+                log_response(self.response_log_path, self.session_id, self.current_question, score)
+            except OSError as e:
+                print(f"Response Log Error: {e}")
             
         self.score_log.append(score)
         
@@ -169,18 +459,34 @@ class InterviewEngine:
         self.history[-1]['feedback'] = feedback
         self.history[-1]['wpm'] = wpm
         self.history[-1]['fillers'] = fillers
+        self._journal("score", score=score, feedback=feedback, wpm=wpm, fillers=fillers,
+                      difficulty=self.difficulty, state=self.state, item=item,
+                      follow_ups=getattr(self, 'current_follow_ups', []))
         
         result['score'] = score
         result['feedback'] = feedback
+        result['scoring'] = outcome.summary()
         return result
 
+    def verdict_settled(self):
+        """True once enough questions were answered and the pass/fail call is confident."""
+        return len(self.responses) >= MIN_QUESTIONS and self.ability.is_confident()
+
     def get_summary(self):
         total_score = sum(self.score_log)
         avg_score = total_score / len(self.score_log) if self.score_log else 0
+        if self.responses:
+            # Scores on harder questions count for more than the plain average. The
+            # unshrunk estimate, so a few answers just above the bar still pass
+            passed = self.ability.mle > PASS_THETA
+        else:
+            passed = avg_score > 70
         
         return {
             "total_score": total_score,
             "average_score": avg_score,
             "questions_answered": len(self.score_log),
-            "verdict": "Passed" if avg_score > 70 else "Needs Improvement"
+            "ability": round(self.ability.theta, 2),
+            "ability_se": round(self.ability.se, 2),
+            "verdict": "Passed" if passed else "Needs Improvement"
         }
@@ -0,0 +1,340 @@
+"""
+Item response theory (2PL) model for adaptive questioning.
+
+Each question has a discrimination `a` and difficulty `b`. The chance that a candidate
+of ability theta answers well is P = 1 / (1 + exp(-a * (theta - b))); scores (0-100)
+are used as fractional responses x = score / 100.
+
+- ItemParameters: per-question (a, b) store, fitted offline from the response log.
+  Uncalibrated questions (including LLM-generated ones) use a prior by difficulty bucket.
+- fit_2pl: marginal maximum likelihood by EM over a fixed quadrature grid, vectorized
+  over candidates and items.
+- AbilityEstimator: grid posterior over theta, updated after every answer. Used to pick
+  the most informative next question and to stop once the verdict is settled; the
+  verdict itself uses the maximum-likelihood ability, which the prior does not shrink.
+
+Fit the parameters from recorded interviews:
+    python irt_model.py --log sessions/responses.jsonl --out irt_params.json
+"""
+import argparse
+import json
+import math
+import os
+import random
+
+import lazy_loader
+
+# Fitted parameters, and the log of scored answers they are fitted from
+IRT_PARAMS_PATH = "irt_params.json"
+RESPONSE_LOG_PATH = os.path.join("sessions", "responses.jsonl")
+
+# Prior difficulty of each question bucket (and the bucket used to ask the LLM)
+BUCKET_DIFFICULTY = {"easy": -1.0, "medium": 0.0, "hard": 1.0}
+DEFAULT_DISCRIMINATION = 1.0
+
+# A 0-100 score aggregates the four rubric dimensions (correctness, depth, trade-offs,
+# confidence), so one answer counts as this many binary observations
+RESPONSE_WEIGHT = 4.0
+
+# Ability grid shared by the EM quadrature and the online estimator (see theta_grid())
+THETA_RANGE = (-4.0, 4.0)
+THETA_POINTS = 81
+
+# Verdict: "Passed" means expected score >= PASSING_SCORE on a prior medium question
+PASSING_SCORE = 70
+PASS_THETA = math.log(PASSING_SCORE / (100 - PASSING_SCORE))
+
+# Newton iterations for the maximum-likelihood ability, and the largest step per iteration
+MLE_ITERATIONS = 50
+MLE_MAX_STEP = 1.0
+
+# Early stopping: ask at least this many questions (the coding question is the third),
+# then stop once the posterior puts this much mass on one side of PASS_THETA
+MIN_QUESTIONS = 4
+STOP_CONFIDENCE = 0.9
+
+# Question choice: pick at random among this many most informative questions, so
+# every candidate at the same ability does not get the same interview
+EXPOSURE_TOP_K = 2
+
+# Fitting: strength of the pull towards the bucket prior (acts like this many responses)
+# and parameter bounds
+PRIOR_WEIGHT = 2.0
+DISCRIMINATION_RANGE = (0.2, 4.0)
+DIFFICULTY_RANGE = (-4.0, 4.0)
+
+
+_grid = None
+
+
+def theta_grid():
+    """THETA_POINTS abilities spanning THETA_RANGE (NumPy is imported on first use, not at startup)."""
+    global _grid
+    if _grid is None:
+        _grid = lazy_loader.load("numpy").linspace(*THETA_RANGE, THETA_POINTS)
+    return _grid
+
+
+def probability(theta, a, b):
+    """P(good answer) for every (theta, item) pair; broadcasts like NumPy."""
+    np = lazy_loader.load("numpy")
+    return 1.0 / (1.0 + np.exp(-np.asarray(a) * (np.asarray(theta) - np.asarray(b))))
+
+
+def information(theta, a, b):
+    """Fisher information of an item at ability theta."""
+    np = lazy_loader.load("numpy")
+    p = probability(theta, a, b)
+    return np.asarray(a) ** 2 * p * (1.0 - p)
+
+
+def _normal_prior(grid):
+    np = lazy_loader.load("numpy")
+    weights = np.exp(-0.5 * grid ** 2)
+    return weights / weights.sum()
+
+
+class AbilityEstimator:
+    """Posterior over the candidate's ability on theta_grid() (standard normal prior)."""
+
+    def __init__(self, grid=None):
+        self._grid = grid
+        self._log_posterior = None  # built on first use, so an idle engine never imports NumPy
+        self.responses = 0
+        self.answers = []  # (a, b, x) per answer, for the maximum-likelihood estimate
+
+    @classmethod
+    def from_responses(cls, responses):
+        estimator = cls()
+        for a, b, x in responses:
+            estimator.update(a, b, x)
+        return estimator
+
+    @property
+    def grid(self):
+        if self._grid is None:
+            self._grid = theta_grid()
+        return self._grid
+
+    @property
+    def log_posterior(self):
+        if self._log_posterior is None:
+            self._log_posterior = lazy_loader.load("numpy").log(_normal_prior(self.grid))
+        return self._log_posterior
+
+    @log_posterior.setter
+    def log_posterior(self, value):
+        self._log_posterior = value
+
+    def update(self, a, b, x):
+        """Adds one answer with fractional score x in [0, 1] on item (a, b)."""
+        np = lazy_loader.load("numpy")
+        p = np.clip(probability(self.grid, a, b), 1e-9, 1 - 1e-9)
+        x = min(1.0, max(0.0, float(x)))
+        self.log_posterior += RESPONSE_WEIGHT * (x * np.log(p) + (1.0 - x) * np.log(1.0 - p))
+        self.log_posterior -= self.log_posterior.max()
+        self.responses += 1
+        self.answers.append((a, b, x))
+
+    def posterior(self):
+        weights = lazy_loader.load("numpy").exp(self.log_posterior)
+        return weights / weights.sum()
+
+    @property
+    def theta(self):
+        return float(self.posterior() @ self.grid)
+
+    @property
+    def se(self):
+        np = lazy_loader.load("numpy")
+        weights = self.posterior()
+        mean = weights @ self.grid
+        return float(np.sqrt(weights @ (self.grid - mean) ** 2))
+
+    @property
+    def mle(self):
+        """
+        Maximum-likelihood ability (clipped to the grid), 0.0 before any answer. Unlike
+        `theta` it is not pulled towards the prior mean, so a candidate who scores above
+        PASSING_SCORE on every medium question is above PASS_THETA after any number of answers.
+        """
+        if not self.answers:
+            return 0.0
+        np = lazy_loader.load("numpy")
+        a, b, x = np.array(self.answers, dtype=float).T
+        theta = 0.0
+        for _ in range(MLE_ITERATIONS):
+            p = probability(theta, a, b)
+            step = (a @ (x - p)) / max(float((a ** 2) @ (p * (1.0 - p))), 1e-9)
+            step = float(np.clip(step, -MLE_MAX_STEP, MLE_MAX_STEP))
+            theta = float(np.clip(theta + step, self.grid[0], self.grid[-1]))
+            if abs(step) < 1e-6:
+                break
+        return theta
+
+    def prob_above(self, threshold):
+        return float(self.posterior()[self.grid > threshold].sum())
+
+    def is_confident(self, threshold=PASS_THETA, confidence=STOP_CONFIDENCE):
+        p = self.prob_above(threshold)
+        return p >= confidence or p <= 1.0 - confidence
+
+    def difficulty(self):
+        """The difficulty bucket whose prior item is most informative right now."""
+        theta = self.theta
+        return min(BUCKET_DIFFICULTY, key=lambda bucket: abs(BUCKET_DIFFICULTY[bucket] - theta))
+
+
+def most_informative(questions, params, theta, top_k=EXPOSURE_TOP_K, rng=None):
+    """The question (from a non-empty list) carrying the most information at theta."""
+    np = lazy_loader.load("numpy")
+    ab = np.array([params.get(q) for q in questions], dtype=float)
+    info = information(theta, ab[:, 0], ab[:, 1])
+    best = np.argsort(-info, kind="stable")[:top_k]
+    return questions[int((rng or random).choice(list(best)))]
+
+
+class ItemParameters:
+    """Per-question (a, b) store, backed by a JSON file of {question_id: {"a", "b", "n"}}."""
+
+    def __init__(self, items=None):
+        self.items = items or {}
+
+    @classmethod
+    def load(cls, path=IRT_PARAMS_PATH):
+        try:
+            with open(path, encoding="utf-8") as f:
+                return cls(json.load(f))
+        except (OSError, ValueError):
+            return cls()
+
+    def save(self, path=IRT_PARAMS_PATH):
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.items, f, indent=2, sort_keys=True)
+        os.replace(tmp, path)
+
+    def get(self, question):
+        """(a, b) for a question dict; the bucket prior if it has not been calibrated."""
+        item = self.items.get(question.get("id"))
+        if item:
+            return item["a"], item["b"]
+        return DEFAULT_DISCRIMINATION, BUCKET_DIFFICULTY.get(question.get("difficulty"), 0.0)
+
+
+def log_response(path, session_id, question, score):
+    """Appends one scored answer to the response log used for offline fitting."""
+    if not question.get("id"):
+        return  # LLM-generated questions are never asked twice, nothing to calibrate
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    record = {"session": session_id, "item": question["id"],
+              "bucket": question.get("difficulty"), "score": score}
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def load_responses(path):
+    """
+    Reads the response log into a (sessions x items) score matrix in [0, 1] with NaN
+    for unanswered items. Returns (matrix, item_ids, buckets).
+    """
+    np = lazy_loader.load("numpy")
+    sessions, items, buckets, cells = {}, {}, {}, []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # torn last line
+            row = sessions.setdefault(record["session"], len(sessions))
+            col = items.setdefault(record["item"], len(items))
+            buckets.setdefault(record["item"], record.get("bucket"))
+            cells.append((row, col, record["score"] / 100.0))
+    matrix = np.full((len(sessions), len(items)), np.nan)
+    for row, col, x in cells:
+        matrix[row, col] = x  # the last answer wins if an item was repeated
+    return matrix, list(items), [buckets[item] for item in items]
+
+
+def fit_2pl(scores, prior_b=None, max_iter=200, tol=1e-4, grid=None):
+    """
+    Fits (a, b) per item by EM (Bock-Aitkin) on a quadrature grid.
+
+    scores: (candidates x items) array of fractional scores in [0, 1], NaN if unanswered.
+    prior_b: optional per-item prior difficulty; items with few responses stay near it.
+    Returns (a, b) arrays.
+    """
+    np = lazy_loader.load("numpy")
+    grid = theta_grid() if grid is None else grid
+    scores = np.asarray(scores, dtype=float)
+    mask = ~np.isnan(scores)
+    x = RESPONSE_WEIGHT * np.where(mask, np.clip(scores, 0.0, 1.0), 0.0)
+    m = RESPONSE_WEIGHT * mask
+    n_items = scores.shape[1]
+    prior_b = np.zeros(n_items) if prior_b is None else np.asarray(prior_b, dtype=float)
+    log_prior = np.log(_normal_prior(grid))
+
+    # Slope-intercept form: logit P = a * theta + c, with b = -c / a
+    a0 = np.full(n_items, DEFAULT_DISCRIMINATION)
+    c0 = -a0 * prior_b
+    a, c = a0.copy(), c0.copy()
+    design = np.stack([grid, np.ones_like(grid)])  # (2, Q)
+
+    for _ in range(max_iter):
+        # E-step: posterior over the grid for every candidate
+        p = np.clip(1.0 / (1.0 + np.exp(-(np.outer(grid, a) + c))), 1e-9, 1 - 1e-9)  # (Q, J)
+        log_like = x @ np.log(p).T + (m - x) @ np.log(1.0 - p).T + log_prior        # (N, Q)
+        log_like -= log_like.max(axis=1, keepdims=True)
+        post = np.exp(log_like)
+        post /= post.sum(axis=1, keepdims=True)
+        expected_n = post.T @ m  # (Q, J) expected answers at each grid point
+        expected_x = post.T @ x  # (Q, J) expected score mass
+
+        # M-step: one penalised Newton step per item, all items at once
+        residual = expected_x - expected_n * p
+        weight = expected_n * p * (1.0 - p)
+        grad = design @ residual - PRIOR_WEIGHT * np.stack([a - a0, c - c0])       # (2, J)
+        h_aa = (grid ** 2) @ weight + PRIOR_WEIGHT
+        h_ac = grid @ weight
+        h_cc = weight.sum(axis=0) + PRIOR_WEIGHT
+        det = h_aa * h_cc - h_ac ** 2
+        step_a = (h_cc * grad[0] - h_ac * grad[1]) / det
+        step_c = (h_aa * grad[1] - h_ac * grad[0]) / det
+
+        new_a = np.clip(a + step_a, *DISCRIMINATION_RANGE)
+        new_c = np.clip(c + step_c, -new_a * DIFFICULTY_RANGE[1], -new_a * DIFFICULTY_RANGE[0])
+        change = max(np.abs(new_a - a).max(initial=0.0), np.abs(new_c - c).max(initial=0.0))
+        a, c = new_a, new_c
+        if change < tol:
+            break
+    return a, -c / a
+
+
+def fit_from_log(log_path=RESPONSE_LOG_PATH):
+    """Fits an ItemParameters store from the response log."""
+    np = lazy_loader.load("numpy")
+    matrix, item_ids, buckets = load_responses(log_path)
+    prior_b = [BUCKET_DIFFICULTY.get(bucket, 0.0) for bucket in buckets]
+    a, b = fit_2pl(matrix, prior_b)
+    counts = (~np.isnan(matrix)).sum(axis=0)
+    return ItemParameters({item: {"a": round(float(a[j]), 4), "b": round(float(b[j]), 4), "n": int(counts[j])}
+                           for j, item in enumerate(item_ids)})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit 2PL question parameters from recorded interviews.")
+    parser.add_argument("--log", default=RESPONSE_LOG_PATH, help="response log (JSON lines)")
+    parser.add_argument("--out", default=IRT_PARAMS_PATH, help="where to write the parameters")
+    args = parser.parse_args()
+
+    params = fit_from_log(args.log)
+    params.save(args.out)
+    for item, values in sorted(params.items.items(), key=lambda kv: kv[1]["b"]):
+        print(f"{item:12s} a={values['a']:.2f} b={values['b']:+.2f} (n={values['n']})")
+    print(f"Wrote {len(params.items)} items to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import importlib
+import threading
+import time
+
+# Heavy subsystems that are only needed once an interview is running.
+# They are imported on first use, or ahead of time by warm_up() once the
+# welcome screen has been painted. (OpenCV and MediaPipe are only imported
+# by the vision child process, see vision_process.py.)
+INTERVIEW_MODULES = [
+    "numpy",
+    "speech_recognition",
+    "pyttsx3",
+    "mss",
+    "textblob",
+    "pdfminer.high_level",
+    "google.generativeai",
+    "openai",
+]
+
+_modules = {}
+_failed = {}
+import_times = {}  # module name -> seconds spent importing it
+
+
+def load(name):
+    """
+    Imports a module on first use and caches it.
+    Raises ImportError if the module is not installed.
+    """
+    module = _modules.get(name)
+    if module is not None:
+        return module
+    if name in _failed:
+        raise ImportError(_failed[name])
+
+    start = time.perf_counter()
+    try:
+        # importlib serialises concurrent imports of the same module,
+        # so the warm-up thread and a consumer can race here safely.
+        module = importlib.import_module(name)
+    except ImportError as e:
+        _failed[name] = str(e)
+        raise
+    import_times.setdefault(name, time.perf_counter() - start)
+    _modules[name] = module
+    return module
+
+
+def try_load(name):
+    """Same as load(), but returns None for optional modules that are missing."""
+    try:
+        return load(name)
+    except ImportError:
+        return None
+
+
+def is_loaded(name):
+    return name in _modules
+
+
+def warm_up(names=None):
+    """
+    Imports the given modules (default: INTERVIEW_MODULES) on a daemon thread
+    so that starting an interview does not pay the import cost.
+    Returns the thread.
+    """
+    names = list(names or INTERVIEW_MODULES)
+
+    def _run():
+        for name in names:
+            try:
+                load(name)
+            except Exception as e:
+                # Missing optional deps are reported when they are actually used
+                print(f"Warm-up skipped {name}: {e}")
+
+    thread = threading.Thread(target=_run, name="ModuleWarmUp", daemon=True)
+    thread.start()
+    return thread
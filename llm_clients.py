@@ -0,0 +1,199 @@
+import importlib.util
+import threading
+import weakref
+
+import lazy_loader
+
+# HTTP connection pool tuning for the OpenAI-compatible clients.
+# An interview makes a handful of requests a minute, mostly one at a time,
+# so a small pool with long keep-alive keeps the TLS session warm between turns.
+MAX_CONNECTIONS = 20
+MAX_KEEPALIVE_CONNECTIONS = 10
+KEEPALIVE_EXPIRY = 300  # seconds
+CONNECT_TIMEOUT = 10
+REQUEST_TIMEOUT = 60
+
+_lock = threading.RLock()
+_openai_clients = {}        # (api_key, base_url) -> OpenAI
+_async_openai_clients = {}  # (api_key, base_url) -> AsyncOpenAI
+_gemini_key = None
+_gemini_models = {}         # model name -> GenerativeModel
+
+
+class ConnectionStats:
+    """Counts requests and how many of them reused an already open connection."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seen_streams = weakref.WeakSet()
+        self.requests = 0
+        self.new_connections = 0
+
+    def record(self, response):
+        stream = response.extensions.get("network_stream")
+        with self._lock:
+            self.requests += 1
+            if stream is None:
+                return
+            try:
+                if stream not in self._seen_streams:
+                    self._seen_streams.add(stream)
+                    self.new_connections += 1
+            except TypeError:
+                # Stream type is not weak-referenceable; count it as new
+                self.new_connections += 1
+
+    async def arecord(self, response):
+        self.record(response)
+
+    def snapshot(self):
+        with self._lock:
+            reused = max(0, self.requests - self.new_connections)
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_connections": reused,
+                "reuse_ratio": reused / self.requests if self.requests else 0.0,
+            }
+
+    def reset(self):
+        with self._lock:
+            self._seen_streams = weakref.WeakSet()
+            self.requests = 0
+            self.new_connections = 0
+
+
+stats = ConnectionStats()
+
+
+def http2_available():
+    # httpx only negotiates HTTP/2 when the optional `h2` package is installed
+    return importlib.util.find_spec("h2") is not None
+
+
+def _http_client_kwargs(httpx, event_hook):
+    return {
+        "http2": http2_available(),
+        "limits": httpx.Limits(max_connections=MAX_CONNECTIONS,
+                               max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                               keepalive_expiry=KEEPALIVE_EXPIRY),
+        "timeout": httpx.Timeout(REQUEST_TIMEOUT, connect=CONNECT_TIMEOUT),
+        "event_hooks": {"response": [event_hook]},
+    }
+
+
+def get_openai_client(api_key, base_url=None):
+    """
+    Returns the process-wide OpenAI client for this key/endpoint.
+    The client (and its connection pool) is created once and shared by all
+    callers; the OpenAI client is thread-safe.
+    """
+    key = (api_key, base_url)
+    client = _openai_clients.get(key)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _openai_clients.get(key)
+        if client is None:
+            openai = lazy_loader.load("openai")
+            kwargs = {"api_key": api_key, "base_url": base_url}
+            httpx = lazy_loader.try_load("httpx")
+            if httpx is not None:
+                kwargs["http_client"] = httpx.Client(**_http_client_kwargs(httpx, stats.record))
+            client = openai.OpenAI(**kwargs)
+            _openai_clients[key] = client
+    return client
+
+
+def get_async_openai_client(api_key, base_url=None):
+    """
+    Async counterpart of get_openai_client() for asyncio callers.
+    An httpx.AsyncClient is bound to the event loop it is first used on,
+    so use one event loop per process (or call close_all() between loops).
+    """
+    key = (api_key, base_url)
+    client = _async_openai_clients.get(key)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _async_openai_clients.get(key)
+        if client is None:
+            openai = lazy_loader.load("openai")
+            kwargs = {"api_key": api_key, "base_url": base_url}
+            httpx = lazy_loader.try_load("httpx")
+            if httpx is not None:
+                kwargs["http_client"] = httpx.AsyncClient(**_http_client_kwargs(httpx, stats.arecord))
+            client = openai.AsyncOpenAI(**kwargs)
+            _async_openai_clients[key] = client
+    return client
+
+
+def get_gemini_model(api_key, model_name):
+    """
+    Returns a shared GenerativeModel. genai.configure() is only called again
+    when the API key changes, so the underlying gRPC channel stays open.
+    """
+    global _gemini_key
+    with _lock:
+        genai = lazy_loader.load("google.generativeai")
+        if api_key != _gemini_key:
+            genai.configure(api_key=api_key)
+            _gemini_key = api_key
+            _gemini_models.clear()
+        model = _gemini_models.get(model_name)
+        if model is None:
+            model = genai.GenerativeModel(model_name)
+            _gemini_models[model_name] = model
+    return model
+
+
+def prewarm(provider, api_key, model_name=None, base_url=None):
+    """
+    Opens the connection to the provider ahead of the first real request
+    (DNS, TCP and TLS handshakes). Runs on a daemon thread; errors are only logged.
+    """
+    def _run():
+        try:
+            if provider == "gemini":
+                genai = lazy_loader.load("google.generativeai")
+                get_gemini_model(api_key, model_name)
+                # Cheap metadata call that establishes the gRPC channel
+                genai.get_model(f"models/{model_name}")
+            else:
+                client = get_openai_client(api_key, base_url)
+                # Any response (even 404) leaves a warm connection in the pool
+                client.with_options(max_retries=0).get("/models", cast_to=object)
+        except Exception as e:
+            print(f"LLM Prewarm Error: {e}")
+
+    thread = threading.Thread(target=_run, name="LLMPrewarm", daemon=True)
+    thread.start()
+    return thread
+
+
+def connection_stats():
+    result = stats.snapshot()
+    with _lock:
+        result["openai_clients"] = len(_openai_clients)
+        result["async_openai_clients"] = len(_async_openai_clients)
+        result["gemini_models"] = len(_gemini_models)
+    result["http2"] = http2_available()
+    return result
+
+
+def close_all():
+    """Closes every pooled client. Called on application shutdown."""
+    global _gemini_key
+    with _lock:
+        for client in _openai_clients.values():
+            try:
+                client.close()
+            except Exception as e:
+                print(f"Error closing LLM client: {e}")
+        _openai_clients.clear()
+        # Async clients must be closed from their event loop; just drop them here
+        _async_openai_clients.clear()
+        _gemini_models.clear()
+        _gemini_key = None
@@ -1,40 +1,162 @@
 import os
-import google.generativeai as genai
-from openai import OpenAI
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+import llm_clients
+import telemetry
+from evaluation_schema import (EVALUATION_SCHEMA, PLAN_SCHEMA, RUBRIC_WEIGHTS, loads_lenient,
+                               rubric_score, validate_evaluation, validate_plan)
+from llm_router import LLMRouter, backends_from_env
+from llm_scheduler import RequestScheduler
+from prompt_cache import PromptPrefix
+
+# Per-call time budgets (seconds), including retries and hedged requests
+QUESTION_DEADLINE = 30.0
+EVALUATION_DEADLINE = 45.0
+PLAN_DEADLINE = 45.0
+
+# Evaluation requests per answer, including re-asks after invalid JSON
+MAX_EVALUATION_ATTEMPTS = 2
+MAX_PLAN_ATTEMPTS = 2
+
+QUESTION_SYSTEM_PROMPT = "You are a Senior Technical Interviewer."
+
+# Stable part of every question prompt in a session (cached by the provider)
+QUESTION_PREFIX = """
+You are a Senior Staff Software Engineer conducting a rigorous technical interview.
+Your goal is to accurately assess the candidate's depth of knowledge, problem-solving skills, and ability to handle complexity.
+Do not ask surface-level definitions. Probe for understanding of trade-offs, internals, and best practices.
+
+Guidelines for every question:
+1. If Resume Context is available, prioritize questions about their specific projects or claimed skills. Challenge their design choices.
+2. If the previous answer was weak, ask a fundamental question to check basics, but don't make it too easy.
+3. If the previous answer was strong, ask a deep-dive follow-up (e.g., "How would this scale?", "What happens under memory pressure?", "Compare with X").
+4. Keep the question concise but professional.
+5. Output ONLY the question text. No preambles.
+
+Current Domain: {domain}
+"""
+
+# Changing part, sent after the prefix
+QUESTION_SUFFIX = """
+Difficulty Level: {difficulty} (Adjust based on history: if they are doing well, push harder.)
+
+Previous Conversation History:
+{history}
+
+Task: Generate the next interview question.
+"""
+
+# Whole-interview plan, sent after the same prefix
+PLAN_SUFFIX = """
+Task: Plan the whole interview up front. Write {count} primary questions at {difficulty} difficulty,
+in the order they should be asked, covering different topics. For each one also write an
+"easier" variant (one step down, for a candidate who is struggling) and a "harder" variant
+(a deep-dive for a candidate who is doing well). Each text must stand on its own as a question.
+
+Respond with a single JSON object:
+{{"questions": [{{"topic": "...", "question": "...", "easier": "...", "harder": "..."}}]}}
+"""
+
+# One scheduler per process so rate limits are shared by every LLMInterface
+scheduler = RequestScheduler()
+
 class LLMInterface:
     def __init__(self):
         load_dotenv()
         self.provider = os.getenv("LLM_PROVIDER", "gemini").lower()
         self.api_key = None
-        self.client = None
-        self.model = None
+        self.model_name = None
+        self.base_url = None
+        self.router = LLMRouter([], scheduler)
+        self.session_prefix = None
         
         self._setup_client()
 
     def _setup_client(self):
-        # Allow overriding model via env var
-        self.model_name = os.getenv("LLM_MODEL")
-
-        if self.provider == "gemini":
-            self.api_key = os.getenv("GEMINI_API_KEY")
-            if self.api_key:
-                genai.configure(api_key=self.api_key)
-                # Default to a stronger model for better reasoning
-                if not self.model_name:
-                    self.model_name = 'gemini-2.0-flash' 
-                self.model = genai.GenerativeModel(self.model_name)
-        elif self.provider == "openai":
-            self.api_key = os.getenv("OPENAI_API_KEY")
-            if self.api_key:
-                self.client = OpenAI(api_key=self.api_key)
-                if not self.model_name:
-                    self.model_name = 'gpt-4o'
+        """
+        Reads backend settings from the environment and (re)builds the router.
+        Backends whose settings did not change keep their latency/error history,
+        and the SDK clients are fetched lazily from the process-wide pool in llm_clients,
+        so calling this again (e.g. on every start_interview) is cheap.
+        """
+        existing = {(b.name, b.model_name, b.api_key, b.base_url): b for b in self.router.backends}
+        backends = [existing.get((b.name, b.model_name, b.api_key, b.base_url), b)
+                    for b in backends_from_env(self.provider)]
+        self.router.backends = backends
+
+        # Expose the primary backend for callers that display/log it
+        primary = self.router.primary("evaluate_answer")
+        self.api_key = primary.api_key if primary else None
+        self.model_name = primary.model_name if primary else None
+        self.base_url = primary.base_url if primary else None
+
+    def warm_up(self):
+        """Builds the provider clients and opens their connections ahead of the first request."""
+        for backend in self.router.backends:
+            try:
+                backend.client()
+                provider = "gemini" if backend.provider == "gemini" else "openai"
+                llm_clients.prewarm(provider, backend.api_key, backend.model_name, backend.base_url)
+            except Exception as e:
+                print(f"LLM Warm-up Error ({backend.name}): {e}")
+
+    def connection_stats(self):
+        return llm_clients.connection_stats()
+
+    def scheduler_stats(self):
+        return scheduler.snapshot()
+
+    def routing_metrics(self):
+        return self.router.metrics()
+
+    def cache_stats(self):
+        """Input tokens, cached input tokens and hit ratio per call type."""
+        return self.router.cache_stats.snapshot()
+
+    def _question_prefix(self, domain, resume_context=None):
+        text = QUESTION_PREFIX.format(domain=domain)
+        if resume_context:
+            text += f"\nCandidate Resume Context:\n{resume_context}\n"
+        return PromptPrefix(QUESTION_SYSTEM_PROMPT, text)
+
+    def _session_prefix_for(self, domain, resume_context):
+        # Reuse the session's cached prefix; a different domain/resume (or a recovered
+        # session) gets a new one, which becomes the session prefix
+        prefix = self._question_prefix(domain, resume_context)
+        if self.session_prefix is None or self.session_prefix.key != prefix.key:
+            self.end_session()
+            self.session_prefix = prefix
+        return self.session_prefix
+
+    def start_session(self, domain, resume_context=None):
+        """
+        Builds the session's cacheable question prefix and creates its provider cache
+        for the backend that will serve question generation.
+        """
+        self.end_session()
+        self.session_prefix = self._question_prefix(domain, resume_context)
+        if self.is_configured():
+            self.session_prefix.handle(self.router.primary("generate_question"))
+        return self.session_prefix
+
+    def end_session(self):
+        if self.session_prefix is not None:
+            self.session_prefix.close()
+            self.session_prefix = None
+
+    def _complete(self, call_type, system_prompt, prompt, deadline, **options):
+        """
+        Sends one prompt to the backend chosen by the router. Each backend call goes through
+        the shared scheduler (rate limit, retry, hedging); the deadline covers failover too.
+        Returns the response text. Raises on final failure.
+        """
+        return self.router.call(call_type, system_prompt, prompt, deadline, **options)
 
     def is_configured(self):
-        return bool(self.api_key)
+        return bool(self.router.backends)
 
+    @telemetry.traced("llm.generate_question")
     def generate_question(self, history, domain, difficulty, resume_context=None):
         """
         Generates the next interview question based on history, domain, difficulty, and optional resume context.
@@ -42,48 +164,53 @@ class LLMInterface:
         if not self.is_configured():
             return None
 
-        prompt = f"""
-You are a Senior Staff Software Engineer conducting a rigorous technical interview.
-Your goal is to accurately assess the candidate's depth of knowledge, problem-solving skills, and ability to handle complexity.
-Do not ask surface-level definitions. Probe for understanding of trade-offs, internals, and best practices.
-
-Current Domain: {domain}
-Difficulty Level: {difficulty} (Adjust based on history: if they are doing well, push harder.)
-"""
-        if resume_context:
-            prompt += f"\nCandidate Resume Context:\n{resume_context}\n"
-
-        prompt += f"""
-Previous Conversation History:
-{history}
-
-Task: Generate the next interview question.
-Guidelines:
-1. If Resume Context is available, prioritize questions about their specific projects or claimed skills. Challenge their design choices.
-2. If the previous answer was weak, ask a fundamental question to check basics, but don't make it too easy.
-3. If the previous answer was strong, ask a deep-dive follow-up (e.g., "How would this scale?", "What happens under memory pressure?", "Compare with X").
-4. Keep the question concise but professional.
-5. Output ONLY the question text. No preambles.
-"""
+        prefix = self._session_prefix_for(domain, resume_context)
+        prompt = QUESTION_SUFFIX.format(difficulty=difficulty, history=history)
 
         try:
-            if self.provider == "gemini":
-                response = self.model.generate_content(prompt)
-                return response.text.strip()
-            elif self.provider == "openai":
-                response = self.client.chat.completions.create(
-                    model=self.model_name,
-                    messages=[{"role": "system", "content": "You are a Senior Technical Interviewer."},
-                              {"role": "user", "content": prompt}]
-                )
-                return response.choices[0].message.content.strip()
+            return self._complete("generate_question", QUESTION_SYSTEM_PROMPT, prompt, QUESTION_DEADLINE,
+                                  prefix=prefix)
         except Exception as e:
             print(f"LLM Generation Error: {e}")
             return None
 
+    @telemetry.traced("llm.generate_plan")
+    def generate_plan(self, domain, count, difficulty="medium", resume_context=None):
+        """
+        Plans `count` questions in one call, each with easier/harder variants, tailored to the
+        resume. Uses the session prefix, so the instructions and resume are cached for the
+        question calls that may follow.
+        Returns [{"topic", "question", "easier", "harder"}, ...] or None.
+        """
+        if not self.is_configured():
+            return None
+        prefix = self._session_prefix_for(domain, resume_context)
+        prompt = PLAN_SUFFIX.format(count=count, difficulty=difficulty)
+        request = prompt
+        for attempt in range(MAX_PLAN_ATTEMPTS):
+            try:
+                text_response = self._complete("generate_plan", QUESTION_SYSTEM_PROMPT, request, PLAN_DEADLINE,
+                                               response_schema=PLAN_SCHEMA, prefix=prefix)
+                plan = loads_lenient(text_response)
+                validate_plan(plan)
+            except ValueError as e:
+                print(f"LLM Plan Invalid (attempt {attempt + 1}/{MAX_PLAN_ATTEMPTS}): {e}")
+                request = f"{prompt}\nYour previous response was invalid ({e}). Reply again with only the JSON object."
+                continue
+            except Exception as e:
+                print(f"LLM Plan Error: {e}")
+                return None
+            questions = [q for q in plan["questions"] if all(q[k].strip() for k in ("question", "easier", "harder"))]
+            return questions[:count] or None
+        return None
+
+    @telemetry.traced("llm.evaluate_answer")
     def evaluate_answer(self, question, answer):
         """
-        Evaluates the user's answer and provides feedback.
+        Evaluates the user's answer with a rubric breakdown.
+        Requests provider-native JSON output, validates it against EVALUATION_SCHEMA and
+        retries (at most MAX_EVALUATION_ATTEMPTS times) when the output is invalid.
+        Returns {"score", "feedback", "rubric", "confidence"} or None if no valid evaluation was produced.
         """
         if not self.is_configured():
             return None
@@ -93,38 +220,48 @@ Guidelines:
         Candidate's Answer: {answer}
         
         Act as a strict technical interviewer. Evaluate the answer critically.
+        Score each rubric dimension from 0 to 100:
+        - correctness: is it technically right?
+        - depth: does it go beyond definitions into internals and reasoning?
+        - trade_offs: does it discuss alternatives, costs and limitations?
+        - confidence: how confident you are in this assessment.
+        feedback: concise, critical feedback. Mention what was wrong or missing. Be direct.
         
-        Output format:
-        Score: <0-100>
-        Feedback: <Concise, critical feedback. Mention what was wrong or missing. Be direct.>
+        Respond with a single JSON object with exactly these keys:
+        {{"correctness": 0-100, "depth": 0-100, "trade_offs": 0-100, "confidence": 0-100, "feedback": "..."}}
         
         Example:
-        Score: 65
-        Feedback: You mentioned the basic concept but missed the thread-safety aspect. In a production environment, this would cause race conditions.
+        {{"correctness": 70, "depth": 55, "trade_offs": 40, "confidence": 85, "feedback": "You mentioned the basic concept but missed the thread-safety aspect. In a production environment, this would cause race conditions."}}
         """
 
-        try:
-            text_response = ""
-            if self.provider == "gemini":
-                response = self.model.generate_content(prompt)
-                text_response = response.text.strip()
-            elif self.provider == "openai":
-                response = self.client.chat.completions.create(
-                    model=self.model_name,
-                    messages=[{"role": "system", "content": "You are a strict technical interviewer."},
-                              {"role": "user", "content": prompt}]
-                )
-                text_response = response.choices[0].message.content.strip()
-            
-            # Parse Score and Feedback
-            import re
-            score_match = re.search(r"Score:\s*(\d+)", text_response, re.IGNORECASE)
-            feedback_match = re.search(r"Feedback:\s*(.*)", text_response, re.IGNORECASE | re.DOTALL)
-            
-            score = int(score_match.group(1)) if score_match else 50
-            feedback = feedback_match.group(1).strip() if feedback_match else text_response
-            
-            return {"score": score, "feedback": feedback}
-        except Exception as e:
-            print(f"LLM Evaluation Error: {e}")
-            return None
+        request = prompt
+        for attempt in range(MAX_EVALUATION_ATTEMPTS):
+            try:
+                text_response = self._complete("evaluate_answer", "You are a strict technical interviewer.", request,
+                                               EVALUATION_DEADLINE, response_schema=EVALUATION_SCHEMA, temperature=0)
+            except Exception as e:
+                print(f"LLM Evaluation Error: {e}")
+                return None
+
+            try:
+                evaluation = loads_lenient(text_response)
+                validate_evaluation(evaluation)
+            except ValueError as e:
+                # SchemaError is a ValueError too
+                print(f"LLM Evaluation Invalid (attempt {attempt + 1}/{MAX_EVALUATION_ATTEMPTS}): {e}")
+                request = (f"{prompt}\n        Your previous response was invalid ({e}). "
+                           f"Reply again with only the JSON object.")
+                continue
+
+            return {
+                "score": rubric_score(evaluation),
+                "feedback": evaluation["feedback"].strip(),
+                "rubric": {name: evaluation[name] for name in RUBRIC_WEIGHTS},
+                "confidence": evaluation["confidence"],
+            }
+        return None
+
+    def evaluate_answers(self, pairs, max_workers=4):
+        """Scores many (question, answer) pairs concurrently. Returns results in input order."""
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(lambda pair: self.evaluate_answer(*pair), pairs))
@@ -0,0 +1,332 @@
+import os
+import threading
+import time
+from collections import deque, Counter
+
+import llm_clients
+import telemetry
+from evaluation_schema import provider_schema
+from llm_scheduler import DeadlineExceeded
+from prompt_cache import CacheStats
+
+# Which model tier each call type prefers, best first.
+# Question generation is short and latency-sensitive; evaluation needs reasoning.
+ROUTING_POLICY = {
+    "generate_question": ["fast", "strong"],
+    "evaluate_answer": ["strong", "fast"],
+    "generate_plan": ["strong", "fast"],
+}
+DEFAULT_TIERS = ["strong", "fast"]
+
+DEFAULT_MODELS = {
+    "gemini": {"fast": "gemini-2.0-flash-lite", "strong": "gemini-2.0-flash"},
+    "openai": {"fast": "gpt-4o-mini", "strong": "gpt-4o"},
+}
+
+# Approximate list prices, USD per 1M tokens (input, output). Unknown models cost 0.
+MODEL_PRICES = {
+    "gemini-2.0-flash-lite": (0.075, 0.30),
+    "gemini-2.0-flash": (0.10, 0.40),
+    "gemini-1.5-pro": (1.25, 5.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+}
+
+# Price of cached input tokens relative to uncached ones
+CACHED_INPUT_PRICE_RATIO = {"openai": 0.5, "gemini": 0.25}
+
+# A backend is considered degraded after this many consecutive failures,
+# or when more than half of its recent calls failed. It then sits out a cooldown,
+# after which its window is cleared and it is tried again (half-open): one more
+# failure sends it straight back into cooldown.
+FAILURE_THRESHOLD = 3
+ERROR_RATE_THRESHOLD = 0.5
+COOLDOWN_SECONDS = 30.0
+STATS_WINDOW = 50
+
+
+class Backend:
+    """One provider/model pair the router can send calls to."""
+
+    def __init__(self, name, provider, model_name, api_key, tier, base_url=None):
+        self.name = name
+        self.provider = provider  # "gemini", "openai" or "local" (OpenAI-compatible)
+        self.model_name = model_name
+        self.api_key = api_key
+        self.tier = tier
+        self.base_url = base_url
+        self._lock = threading.Lock()
+        self._window = deque(maxlen=STATS_WINDOW)  # (latency, ok)
+        self.calls = 0
+        self.errors = 0
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self.input_tokens = 0
+        self.cached_input_tokens = 0
+        self.output_tokens = 0
+        self.cost = 0.0
+
+    @property
+    def key(self):
+        """Rate-limit/latency key used by the scheduler."""
+        return f"{self.provider}:{self.model_name}"
+
+    def client(self):
+        if self.provider == "gemini":
+            return llm_clients.get_gemini_model(self.api_key, self.model_name)
+        return llm_clients.get_openai_client(self.api_key, self.base_url)
+
+    def complete(self, system_prompt, prompt, timeout, response_schema=None, temperature=None, prefix=None):
+        """
+        Sends one request. Returns (text, input_tokens, output_tokens, cached_input_tokens).
+        With response_schema the provider's native JSON mode is requested.
+        With a prompt_cache.PromptPrefix, the prefix is sent ahead of `prompt` (or served
+        from the provider's cache) and replaces `system_prompt`.
+        """
+        if self.provider == "gemini":
+            model = self.client()
+            contents = prompt
+            if prefix is not None:
+                cached_model = prefix.handle(self)
+                if cached_model is not None:
+                    model = cached_model
+                else:
+                    contents = [prefix.text, prompt]
+            generation_config = {}
+            if temperature is not None:
+                generation_config["temperature"] = temperature
+            if response_schema is not None:
+                generation_config["response_mime_type"] = "application/json"
+                generation_config["response_schema"] = provider_schema(response_schema, "gemini")
+            response = model.generate_content(contents, generation_config=generation_config or None,
+                                              request_options={"timeout": timeout})
+            usage = getattr(response, "usage_metadata", None)
+            return (response.text.strip(),
+                    getattr(usage, "prompt_token_count", 0) or 0,
+                    getattr(usage, "candidates_token_count", 0) or 0,
+                    getattr(usage, "cached_content_token_count", 0) or 0)
+
+        kwargs = {}
+        if temperature is not None:
+            kwargs["temperature"] = temperature
+        if response_schema is not None:
+            if self.provider == "local":
+                # Most local servers only implement plain JSON mode
+                kwargs["response_format"] = {"type": "json_object"}
+            else:
+                kwargs["response_format"] = {"type": "json_schema", "json_schema": {
+                    "name": "response", "strict": True, "schema": provider_schema(response_schema, "openai")}}
+        # Stable messages first: automatic prompt caching matches on the leading tokens
+        if prefix is not None:
+            messages = [{"role": "system", "content": prefix.system_prompt},
+                        {"role": "user", "content": prefix.text},
+                        {"role": "user", "content": prompt}]
+        else:
+            messages = [{"role": "system", "content": system_prompt},
+                        {"role": "user", "content": prompt}]
+        # Retries are handled by the scheduler, not the SDK
+        response = self.client().with_options(max_retries=0, timeout=timeout).chat.completions.create(
+            model=self.model_name,
+            messages=messages,
+            **kwargs
+        )
+        usage = getattr(response, "usage", None)
+        details = getattr(usage, "prompt_tokens_details", None)
+        return (response.choices[0].message.content.strip(),
+                getattr(usage, "prompt_tokens", 0) or 0,
+                getattr(usage, "completion_tokens", 0) or 0,
+                getattr(details, "cached_tokens", 0) or 0)
+
+    def record(self, latency, ok, input_tokens=0, output_tokens=0, cached_tokens=0):
+        with self._lock:
+            self.calls += 1
+            self._window.append((latency, ok))
+            if ok:
+                self.consecutive_failures = 0
+                self.input_tokens += input_tokens
+                self.cached_input_tokens += cached_tokens
+                self.output_tokens += output_tokens
+                in_price, out_price = MODEL_PRICES.get(self.model_name, (0.0, 0.0))
+                if self.provider != "local":
+                    cached_price = in_price * CACHED_INPUT_PRICE_RATIO.get(self.provider, 1.0)
+                    self.cost += ((input_tokens - cached_tokens) * in_price + cached_tokens * cached_price
+                                  + output_tokens * out_price) / 1_000_000
+            else:
+                self.errors += 1
+                self.consecutive_failures += 1
+                failures = sum(1 for _, ok in self._window if not ok)
+                degraded = (len(self._window) >= FAILURE_THRESHOLD
+                            and failures / len(self._window) > ERROR_RATE_THRESHOLD)
+                if self.consecutive_failures >= FAILURE_THRESHOLD or degraded:
+                    self.cooldown_until = time.monotonic() + COOLDOWN_SECONDS
+
+    def error_rate(self):
+        with self._lock:
+            if not self._window:
+                return 0.0
+            return sum(1 for _, ok in self._window if not ok) / len(self._window)
+
+    def latency_percentile(self, pct):
+        with self._lock:
+            latencies = sorted(lat for lat, ok in self._window if ok)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(round(pct / 100.0 * (len(latencies) - 1))))]
+
+    def is_healthy(self):
+        with self._lock:
+            if self.cooldown_until:
+                if time.monotonic() < self.cooldown_until:
+                    return False
+                # Cooldown over: forget the failures that started it, or the window's
+                # error rate would keep the backend out of service for good
+                self._window.clear()
+                self.cooldown_until = 0.0
+                self.consecutive_failures = FAILURE_THRESHOLD - 1
+            enough = len(self._window) >= FAILURE_THRESHOLD
+        return not enough or self.error_rate() <= ERROR_RATE_THRESHOLD
+
+    def snapshot(self):
+        return {
+            "provider": self.provider,
+            "model": self.model_name,
+            "tier": self.tier,
+            "healthy": self.is_healthy(),
+            "calls": self.calls,
+            "errors": self.errors,
+            "error_rate": round(self.error_rate(), 3),
+            "p50_latency": self.latency_percentile(50),
+            "p95_latency": self.latency_percentile(95),
+            "input_tokens": self.input_tokens,
+            "cached_input_tokens": self.cached_input_tokens,
+            "output_tokens": self.output_tokens,
+            "cost_usd": round(self.cost, 6),
+        }
+
+
+def backends_from_env(preferred_provider=None):
+    """
+    Builds the backend list from environment variables:
+      GEMINI_API_KEY / OPENAI_API_KEY   enable the hosted providers
+      LLM_MODEL                         overrides the strong model of the preferred provider
+      LLM_FAST_MODEL                    overrides the fast model of the preferred provider
+      OPENAI_BASE_URL                   OpenAI endpoint override (proxy)
+      LLM_LOCAL_BASE_URL/LLM_LOCAL_MODEL  a local OpenAI-compatible server (e.g. Ollama, vLLM)
+    Backends of the preferred provider come first.
+    """
+    preferred_provider = (preferred_provider or os.getenv("LLM_PROVIDER", "gemini")).lower()
+    backends = []
+    keys = {"gemini": os.getenv("GEMINI_API_KEY"), "openai": os.getenv("OPENAI_API_KEY")}
+
+    providers = sorted(keys, key=lambda p: p != preferred_provider)
+    for provider in providers:
+        api_key = keys[provider]
+        if not api_key:
+            continue
+        models = dict(DEFAULT_MODELS[provider])
+        if provider == preferred_provider:
+            models["strong"] = os.getenv("LLM_MODEL") or models["strong"]
+            models["fast"] = os.getenv("LLM_FAST_MODEL") or models["fast"]
+        base_url = os.getenv("OPENAI_BASE_URL") if provider == "openai" else None
+        for tier in ("strong", "fast"):
+            backends.append(Backend(f"{provider}-{tier}", provider, models[tier], api_key, tier, base_url))
+
+    local_url = os.getenv("LLM_LOCAL_BASE_URL")
+    if local_url:
+        local = Backend("local", "local", os.getenv("LLM_LOCAL_MODEL", "llama3"),
+                        os.getenv("LLM_LOCAL_API_KEY", "local"), "fast", local_url)
+        # A local server is the preferred choice only if explicitly selected
+        if preferred_provider == "local":
+            backends.insert(0, local)
+        else:
+            backends.append(local)
+    return backends
+
+
+class LLMRouter:
+    """
+    Routes each call type to a backend by policy, preferring healthy, low-latency
+    backends of the preferred tier and failing over to the others.
+    """
+
+    def __init__(self, backends, scheduler, policy=None):
+        self.backends = backends
+        self.scheduler = scheduler
+        self.policy = policy or ROUTING_POLICY
+        self._lock = threading.Lock()
+        self.decisions = Counter()  # (call_type, backend name) -> count
+        self.failovers = Counter()  # call_type -> count
+        self.cache_stats = CacheStats()
+
+    def route(self, call_type):
+        """Returns the backends to try for this call type, best first."""
+        tiers = self.policy.get(call_type, DEFAULT_TIERS)
+        order = {backend.name: i for i, backend in enumerate(self.backends)}
+
+        def rank(backend):
+            tier_rank = tiers.index(backend.tier) if backend.tier in tiers else len(tiers)
+            latency = backend.latency_percentile(50)
+            # Within a tier: backends with recent errors last, then measured backends by
+            # latency, then unmeasured ones in their configured order
+            return (not backend.is_healthy(), tier_rank, backend.error_rate() > 0, latency is None,
+                    latency or 0.0, order[backend.name])
+
+        return sorted(self.backends, key=rank)
+
+    def primary(self, call_type=None):
+        candidates = self.route(call_type) if call_type else self.backends
+        return candidates[0] if candidates else None
+
+    def call(self, call_type, system_prompt, prompt, deadline, **options):
+        """
+        Runs the call on the best backend, failing over to the next one on error.
+        `options` (response_schema, temperature, prefix) are passed to Backend.complete().
+        Raises the last error if every backend fails or the deadline passes.
+        """
+        end = time.monotonic() + deadline
+        last_error = None
+        for attempt, backend in enumerate(self.route(call_type)):
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                break
+            with self._lock:
+                self.decisions[(call_type, backend.name)] += 1
+                if attempt:
+                    self.failovers[call_type] += 1
+
+            start = time.monotonic()
+            usage = {}
+
+            def _call(timeout, backend=backend, usage=usage):
+                text, usage["input"], usage["output"], usage["cached"] = backend.complete(
+                    system_prompt, prompt, timeout, **options)
+                return text
+
+            try:
+                with telemetry.span("llm.backend", call_type=call_type, backend=backend.name,
+                                    model=backend.model_name, failover=bool(attempt)) as span:
+                    text = self.scheduler.call(backend.key, _call, deadline=remaining)
+                    span.set(input_tokens=usage.get("input", 0), cached_tokens=usage.get("cached", 0))
+            except Exception as e:
+                backend.record(time.monotonic() - start, False)
+                print(f"LLM backend {backend.name} failed: {e}")
+                last_error = e
+                continue
+            backend.record(time.monotonic() - start, True, usage.get("input", 0), usage.get("output", 0),
+                           usage.get("cached", 0))
+            self.cache_stats.record(call_type, usage.get("input", 0), usage.get("cached", 0))
+            return text
+
+        raise last_error or DeadlineExceeded(f"{call_type}: no backend answered within {deadline:.1f}s")
+
+    def metrics(self):
+        """Routing decisions and per-backend health, ready for export."""
+        with self._lock:
+            decisions = {f"{call_type}/{name}": count for (call_type, name), count in self.decisions.items()}
+            failovers = dict(self.failovers)
+        return {
+            "decisions": decisions,
+            "failovers": failovers,
+            "prompt_cache": self.cache_stats.snapshot(),
+            "backends": {backend.name: backend.snapshot() for backend in self.backends},
+        }
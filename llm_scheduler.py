@@ -0,0 +1,288 @@
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import telemetry
+
+# HTTP status codes worth retrying: rate limited, or the provider is having a bad moment
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+# gRPC-style status names used by google.api_core exceptions
+RETRYABLE_GRPC = {"RESOURCE_EXHAUSTED", "UNAVAILABLE", "DEADLINE_EXCEEDED", "INTERNAL", "ABORTED"}
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a call could not complete within its deadline."""
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter with additive-increase / multiplicative-decrease
+    adaptation: a 429 halves the refill rate, every success nudges it back up.
+    """
+
+    def __init__(self, rate, capacity=None, min_rate=0.05):
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.min_rate = min_rate
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+    def acquire(self, timeout=None):
+        """Blocks until a token is available. Returns False if `timeout` runs out first."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait_for = (1 - self.tokens) / self.rate
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait_for = min(wait_for, remaining)
+            time.sleep(wait_for)
+
+    def on_throttled(self):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.1)
+
+
+class LatencyTracker:
+    """Rolling window of call latencies used to pick the hedging threshold."""
+
+    def __init__(self, window=100):
+        self.samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self.samples.append(seconds)
+
+    def percentile(self, pct):
+        with self._lock:
+            if not self.samples:
+                return None
+            ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def __len__(self):
+        return len(self.samples)
+
+
+def classify_error(exc):
+    """
+    Returns (retryable, retry_after_seconds) for an exception raised by a provider SDK.
+    Works on OpenAI (status_code/response) and google.api_core (code/grpc_status_code)
+    errors as well as plain network errors, without importing either SDK.
+    """
+    retry_after = None
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is not None:
+        value = headers.get("retry-after") or headers.get("Retry-After")
+        try:
+            retry_after = float(value) if value is not None else None
+        except (TypeError, ValueError):
+            retry_after = None
+
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        code = getattr(exc, "code", None)
+        status = code if isinstance(code, int) else None
+    if status is not None:
+        return status in RETRYABLE_STATUS, retry_after
+
+    grpc_status = getattr(exc, "grpc_status_code", None)
+    if grpc_status is not None and getattr(grpc_status, "name", None) in RETRYABLE_GRPC:
+        return True, retry_after
+
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True, retry_after
+    name = type(exc).__name__
+    if "Timeout" in name or "Connection" in name:
+        return True, retry_after
+    return False, retry_after
+
+
+class RequestScheduler:
+    """
+    Runs provider calls with per-key rate limiting, jittered exponential
+    backoff (honouring Retry-After), hedged requests and per-call deadlines.
+
+    `fn` passed to call() receives the remaining time budget in seconds and
+    should use it as the request timeout.
+    """
+
+    def __init__(self, rate=2.0, burst=4, max_attempts=4, base_backoff=0.5,
+                 max_backoff=8.0, hedge_percentile=95, min_hedge_samples=5,
+                 default_deadline=45.0, max_workers=8):
+        self.rate = rate
+        self.burst = burst
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.hedge_percentile = hedge_percentile
+        self.min_hedge_samples = min_hedge_samples
+        self.default_deadline = default_deadline
+        self._buckets = {}
+        self._latency = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm")
+        self.stats = {"calls": 0, "attempts": 0, "retries": 0, "hedges": 0,
+                      "hedge_wins": 0, "deadline_exceeded": 0, "failures": 0}
+        self.in_flight = 0  # submitted requests not yet finished (queued or running)
+
+    def bucket(self, key):
+        with self._lock:
+            if key not in self._buckets:
+                self._buckets[key] = TokenBucket(self.rate, self.burst)
+            return self._buckets[key]
+
+    def latency(self, key):
+        with self._lock:
+            if key not in self._latency:
+                self._latency[key] = LatencyTracker()
+            return self._latency[key]
+
+    def hedge_threshold(self, key):
+        tracker = self.latency(key)
+        if len(tracker) < self.min_hedge_samples:
+            return None
+        return tracker.percentile(self.hedge_percentile)
+
+    def backoff(self, attempt, retry_after=None):
+        if retry_after is not None:
+            return retry_after
+        # "Full jitter" exponential backoff
+        return random.uniform(0, min(self.max_backoff, self.base_backoff * (2 ** attempt)))
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _submit(self, fn, timeout):
+        with self._lock:
+            self.in_flight += 1
+        telemetry.set_gauge("llm.in_flight", self.in_flight)
+        future = self._executor.submit(fn, timeout)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future):
+        with self._lock:
+            self.in_flight -= 1
+        telemetry.set_gauge("llm.in_flight", self.in_flight)
+
+    def call(self, key, fn, deadline=None, hedge=True):
+        """
+        Calls fn(timeout) until it succeeds, fails with a non-retryable error,
+        runs out of attempts, or `deadline` seconds pass.
+        Raises the last error, or DeadlineExceeded.
+        """
+        self._count("calls")
+        budget = self.default_deadline if deadline is None else deadline
+        end = time.monotonic() + budget
+        bucket = self.bucket(key)
+        last_error = None
+
+        for attempt in range(self.max_attempts):
+            remaining = end - time.monotonic()
+            if remaining <= 0 or not bucket.acquire(timeout=remaining):
+                break
+            self._count("attempts")
+            try:
+                result = self._attempt(key, fn, end, hedge)
+                bucket.on_success()
+                return result
+            except DeadlineExceeded:
+                break
+            except Exception as e:
+                last_error = e
+                retryable, retry_after = classify_error(e)
+                if getattr(e, "status_code", None) == 429 or retry_after is not None:
+                    bucket.on_throttled()
+                if not retryable or attempt == self.max_attempts - 1:
+                    self._count("failures")
+                    raise
+                delay = self.backoff(attempt, retry_after)
+                if time.monotonic() + delay >= end:
+                    break
+                self._count("retries")
+                time.sleep(delay)
+
+        self._count("deadline_exceeded")
+        message = f"{key}: no response within {budget:.1f}s"
+        if last_error is not None:
+            message += f" (last error: {last_error})"
+        raise DeadlineExceeded(message)
+
+    def _attempt(self, key, fn, end, hedge):
+        start = time.monotonic()
+        futures = [self._submit(fn, max(0.1, end - start))]
+        threshold = self.hedge_threshold(key) if hedge else None
+        hedged = None
+        errors = []
+
+        while futures:
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceeded(key)
+            timeout = remaining
+            if hedged is None and threshold is not None:
+                timeout = min(remaining, max(0.0, start + threshold - time.monotonic()))
+            done, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if not done:
+                # Slower than p95: fire a second request and take whichever finishes first
+                if hedged is None and threshold is not None and time.monotonic() < end:
+                    if self.bucket(key).try_acquire():
+                        self._count("hedges")
+                        hedged = self._submit(fn, max(0.1, end - time.monotonic()))
+                        futures.append(hedged)
+                    else:
+                        threshold = None  # No budget for a hedge; just wait
+                continue
+
+            for future in done:
+                futures.remove(future)
+                error = future.exception()
+                if error is None:
+                    if future is hedged:
+                        self._count("hedge_wins")
+                    self.latency(key).record(time.monotonic() - start)
+                    return future.result()
+                errors.append(error)
+        raise errors[0]
+
+    def snapshot(self):
+        with self._lock:
+            result = dict(self.stats)
+            result["in_flight"] = self.in_flight
+            keys = list(self._latency)
+        result["p95_latency"] = {k: self.latency(k).percentile(95) for k in keys}
+        result["rates"] = {k: b.rate for k, b in self._buckets.items()}
+        return result
@@ -1,16 +1,48 @@
+import argparse
+import os
 import sys
+import time
 from PyQt6.QtWidgets import QApplication
 from gui import MainWindow
+import telemetry
+
+# Where --profile writes its flamegraph files when no path is given
+PROFILE_DIR = "profiles"
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="AI Mock Interviewer")
+    parser.add_argument("--profile", nargs="?", const="", metavar="PATH",
+                        help="Sample all threads during the session and write PATH.folded / "
+                             "PATH.speedscope.json (default: profiles/session-<time>)")
+    parser.add_argument("--profile-interval", type=float, default=0.01, metavar="SECONDS")
+    # Anything else (e.g. -platform offscreen) is left for Qt
+    return parser.parse_known_args(argv[1:])
 
 def main():
-    app = QApplication(sys.argv)
-    
+    args, qt_args = parse_args(sys.argv)
+    profiler = None
+    window = None
+    if args.profile is not None:
+        from sampling_profiler import SamplingProfiler
+        # Started before the window is built so startup is profiled too
+        profiler = SamplingProfiler(args.profile_interval,
+                                    state_fn=lambda: window.engine.state if window else "startup").start()
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    telemetry.configure_from_env()
+
     # Optional: Load custom fonts or global styles here
-    
+
     window = MainWindow()
     window.show()
-    
-    sys.exit(app.exec())
+
+    exit_code = app.exec()
+    if profiler:
+        profiler.stop()
+        base = args.profile or os.path.join(PROFILE_DIR, time.strftime("session-%Y%m%d-%H%M%S"))
+        for path in profiler.write(base):
+            print(f"Profile written to {path}")
+    sys.exit(exit_code)
 
 if __name__ == "__main__":
     main()
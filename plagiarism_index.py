@@ -0,0 +1,250 @@
+"""
+Fingerprint index of code submissions, for spotting copied or memorised solutions.
+
+Each submission is reduced to a normalized token stream (code_analyzer.normalized_tokens
+for Python; a small lexer that abstracts identifiers and literals for the other
+languages), hashed as overlapping KGRAM_SIZE-grams and winnowed: the smallest hash in
+every WINNOW_WINDOW consecutive k-grams becomes a fingerprint. Two submissions that
+share a run of WINNOW_WINDOW + KGRAM_SIZE - 1 tokens are guaranteed to share a
+fingerprint; runs shorter than KGRAM_SIZE never match.
+
+Fingerprints are stored in SQLite, clustered by fingerprint (an inverted index:
+fingerprint -> submission and lines), so a new submission is matched by looking up its
+few dozen fingerprints rather than by comparing it with every stored submission.
+
+    index = PlagiarismIndex("sessions/submissions.db")
+    index.match(code, "python")    # [{"submission", "similarity", "regions", ...}], best first
+    index.add(code, "python", question_id="py_h_3", session_id=session_id)
+
+Usage: python plagiarism_index.py solution.py [--index sessions/submissions.db] [--add]
+"""
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from code_analyzer import normalized_tokens
+
+PLAGIARISM_INDEX_PATH = os.path.join("sessions", "submissions.db")
+
+# Tokens per k-gram, and k-grams per winnowing window
+KGRAM_SIZE = 8
+WINNOW_WINDOW = 4
+
+# Share of a submission's fingerprints found in an earlier one for it to be reported
+MATCH_THRESHOLD = 0.5
+
+# Distinct fingerprints a submission needs before it is matched at all. Short idiomatic
+# solutions (a factorial or Fibonacci loop, a slice reversal) have 1-8 and are written
+# the same way by everyone, so matching them would flag honest candidates
+MIN_FINGERPRINTS = 10
+MAX_MATCHES = 5
+
+# Postings read per fingerprint, newest first. A popular memorised solution shares all of
+# its fingerprints with each recent copy, so those copies are still found; this bounds
+# the work for fingerprints that occur in a large share of the index
+MAX_POSTINGS = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    id INTEGER PRIMARY KEY,
+    question TEXT,
+    language TEXT,
+    session TEXT,
+    created REAL,
+    fingerprints INTEGER
+);
+CREATE TABLE IF NOT EXISTS fingerprints (
+    hash INTEGER NOT NULL,
+    submission INTEGER NOT NULL,
+    first_line INTEGER NOT NULL,
+    last_line INTEGER NOT NULL,
+    PRIMARY KEY (hash, submission, first_line)
+) WITHOUT ROWID;
+"""
+
+# Lexer for languages without a parser here: strings, numbers, words, comments, symbols
+_LEXER = re.compile(r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|`[^`]*`|\d[\w.]*|[A-Za-z_]\w*'
+                    r'|//[^\n]*|/\*.*?\*/|\S', re.S)
+
+# Words kept as themselves; every other identifier becomes "id"
+_KEYWORDS = frozenset("""
+    if else for while do switch case default break continue return function class struct
+    new delete const let var func go defer range map chan select type interface package
+    import public private protected static final void int long double float char bool
+    boolean string auto true false null nil nullptr this self try catch finally throw
+    throws extends implements template typename using namespace include define
+""".split())
+
+
+def _lexed_tokens(code):
+    tokens = []
+    line = 1
+    position = 0
+    for match in _LEXER.finditer(code):
+        line += code.count("\n", position, match.start())
+        position = match.start()
+        text = match.group()
+        if text.startswith(("//", "/*")):
+            continue
+        if text[0] in "\"'`" or text[0].isdigit():
+            token = "lit"
+        elif text[0].isalpha() or text[0] == "_":
+            token = text if text in _KEYWORDS else "id"
+        else:
+            token = text
+        tokens.append((token, line))
+    return tokens
+
+
+def tokens_for(code, language="python"):
+    """Normalized [(token, line)] for a submission; [] if Python code does not parse."""
+    if language == "python":
+        try:
+            return normalized_tokens(code)
+        except SyntaxError:
+            return []
+    return _lexed_tokens(code)
+
+
+def _hash(gram):
+    return int.from_bytes(hashlib.blake2b("\x1f".join(gram).encode(), digest_size=8).digest(), "big", signed=True)
+
+
+def fingerprints(tokens, k=KGRAM_SIZE, window=WINNOW_WINDOW):
+    """Winnowed fingerprints of a token stream: [(hash, first_line, last_line)]."""
+    names = [token for token, _ in tokens]
+    grams = [(_hash(names[i:i + k]), i) for i in range(len(names) - k + 1)]
+    selected = []
+    last = None
+    for start in range(max(len(grams) - window + 1, 1 if grams else 0)):
+        # Rightmost minimum, so a repeated minimum is not selected again
+        best = min(grams[start:start + window], key=lambda gram: (gram[0], -gram[1]))
+        if best != last:
+            selected.append(best)
+            last = best
+    lines = [line for _, line in tokens]
+    return [(value, min(lines[i:i + k]), max(lines[i:i + k])) for value, i in selected]
+
+
+def _merge_regions(pairs):
+    """Merges overlapping ((first, last), (first, last)) line-range pairs."""
+    regions = []
+    for lines, matched in sorted(pairs):
+        if regions:
+            previous = regions[-1]
+            if (lines[0] <= previous["lines"][1] + 1 and matched[0] <= previous["matched_lines"][1] + 1
+                    and matched[1] >= previous["matched_lines"][0] - 1):
+                previous["lines"][1] = max(previous["lines"][1], lines[1])
+                previous["matched_lines"][0] = min(previous["matched_lines"][0], matched[0])
+                previous["matched_lines"][1] = max(previous["matched_lines"][1], matched[1])
+                continue
+        regions.append({"lines": list(lines), "matched_lines": list(matched)})
+    return regions
+
+
+class PlagiarismIndex:
+    def __init__(self, path=PLAGIARISM_INDEX_PATH):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def match(self, code, language="python", min_similarity=MATCH_THRESHOLD, limit=MAX_MATCHES,
+              exclude_session=None):
+        """
+        Earlier submissions sharing at least `min_similarity` of this submission's
+        fingerprints, best first: {"submission", "question", "language", "created",
+        "similarity", "regions"}, where each region maps lines of `code` to the
+        matched lines of the earlier submission. Empty for submissions with fewer than
+        MIN_FINGERPRINTS fingerprints.
+        """
+        prints = {}
+        for value, first, last in fingerprints(tokens_for(code, language)):
+            prints.setdefault(value, []).append((first, last))
+        if len(prints) < MIN_FINGERPRINTS:
+            return []
+        with self._lock:
+            shared = {}  # submission -> {hash: [matched line ranges]}
+            for value in prints:
+                rows = self._db.execute(
+                    "SELECT f.submission, f.first_line, f.last_line FROM fingerprints f "
+                    "JOIN submissions s ON s.id = f.submission "
+                    "WHERE f.hash = :hash AND (:session IS NULL OR s.session IS NOT :session) "
+                    "ORDER BY f.submission DESC LIMIT :limit",
+                    {"hash": value, "session": exclude_session, "limit": MAX_POSTINGS})
+                for submission, first, last in rows:
+                    shared.setdefault(submission, {}).setdefault(value, []).append((first, last))
+            scored = sorted(((len(hashes) / len(prints), submission) for submission, hashes in shared.items()),
+                            reverse=True)
+            scored = [(similarity, submission) for similarity, submission in scored
+                      if similarity >= min_similarity][:limit]
+            ids = [submission for _, submission in scored]
+            details = {row[0]: row[1:] for row in self._db.execute(
+                f"SELECT id, question, language, created FROM submissions WHERE id IN ({','.join('?' * len(ids))})",
+                ids)}
+
+        matches = []
+        for similarity, submission in scored:
+            pairs = [(lines, matched) for value, matched_ranges in shared[submission].items()
+                     for lines in prints[value] for matched in matched_ranges]
+            question, matched_language, created = details[submission]
+            matches.append({"submission": submission, "question": question, "language": matched_language,
+                            "created": created, "similarity": round(similarity, 3),
+                            "regions": _merge_regions(pairs)})
+        return matches
+
+    def add(self, code, language="python", question_id=None, session_id=None):
+        """Indexes a submission. Returns its id, or None if it has no fingerprints (too short, invalid)."""
+        prints = {(value, first, last) for value, first, last in fingerprints(tokens_for(code, language))}
+        if not prints:
+            return None
+        with self._lock, self._db:
+            submission = self._db.execute(
+                "INSERT INTO submissions (question, language, session, created, fingerprints) VALUES (?, ?, ?, ?, ?)",
+                (question_id, language, session_id, time.time(), len({p[0] for p in prints}))).lastrowid
+            self._db.executemany(
+                "INSERT OR IGNORE INTO fingerprints VALUES (?, ?, ?, ?)",
+                [(value, submission, first, last) for value, first, last in prints])
+        return submission
+
+    def count(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM submissions").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Match code files against the submission index.")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--index", default=PLAGIARISM_INDEX_PATH)
+    parser.add_argument("--language", default="python")
+    parser.add_argument("--add", action="store_true", help="index the files after matching")
+    args = parser.parse_args(argv)
+
+    index = PlagiarismIndex(args.index)
+    for path in args.files:
+        with open(path, encoding="utf-8") as f:
+            code = f.read()
+        matches = index.match(code, args.language)
+        print(f"{path}: {len(matches)} match(es)")
+        for match in matches:
+            regions = ", ".join(f"{r['lines'][0]}-{r['lines'][1]} ~ {r['matched_lines'][0]}-{r['matched_lines'][1]}"
+                                for r in match["regions"])
+            print(f"  #{match['submission']} ({match['question']}): {match['similarity']:.0%}  lines {regions}")
+        if args.add:
+            index.add(code, args.language, question_id=os.path.basename(path))
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Provider-side caching of the stable part of the interviewer prompt.
+
+Question prompts are split into a prefix that is fixed for the whole session
+(interviewer instructions, guidelines, domain, resume) and a short suffix (difficulty
+and history). Backends send the prefix first:
+
+- OpenAI (and compatible servers): the system message and the prefix lead every
+  request unchanged, which is what automatic prompt caching matches on.
+- Gemini: the prefix is stored once as a CachedContent and later calls send only
+  the suffix. Gemini caches have a minimum size; smaller prefixes are sent inline.
+
+A PromptPrefix is created per interview session (LLMInterface.start_session) and
+holds one cache handle per backend.
+"""
+import datetime
+import hashlib
+import threading
+
+import lazy_loader
+import llm_clients
+
+# Gemini explicit caches below this size are rejected by the API (estimated tokens)
+GEMINI_CACHE_MIN_TOKENS = 4096
+
+# Lifetime of a Gemini cache; it is deleted earlier when the session ends
+PREFIX_CACHE_TTL = 3600
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token) used before a call is made."""
+    return len(text) // 4 + 1
+
+
+def _create_gemini_cache(backend, system_prompt, text):
+    """Returns (CachedContent, GenerativeModel bound to it)."""
+    genai = lazy_loader.load("google.generativeai")
+    llm_clients.get_gemini_model(backend.api_key, backend.model_name)  # configures the API key
+    cache = genai.caching.CachedContent.create(
+        model=f"models/{backend.model_name}",
+        display_name="interview-prefix",
+        system_instruction=system_prompt,
+        contents=[text],
+        ttl=datetime.timedelta(seconds=PREFIX_CACHE_TTL),
+    )
+    return cache, genai.GenerativeModel.from_cached_content(cached_content=cache)
+
+
+class PromptPrefix:
+    """The stable leading part of a session's prompts, plus its per-backend cache handles."""
+
+    def __init__(self, system_prompt, text):
+        self.system_prompt = system_prompt
+        self.text = text
+        self.key = hashlib.sha256(f"{system_prompt}\0{text}".encode()).hexdigest()[:16]
+        self._lock = threading.Lock()
+        self._handles = {}  # backend name -> (CachedContent, GenerativeModel), or None if not cached
+
+    def handle(self, backend):
+        """
+        The Gemini model bound to this prefix's cache for `backend`, created on first use.
+        None if the backend caches automatically (OpenAI) or the prefix cannot be cached;
+        the caller then sends the prefix inline.
+        """
+        if backend is None or backend.provider != "gemini":
+            return None
+        with self._lock:
+            if backend.name not in self._handles:
+                handle = None
+                if estimate_tokens(self.system_prompt + self.text) >= GEMINI_CACHE_MIN_TOKENS:
+                    try:
+                        handle = _create_gemini_cache(backend, self.system_prompt, self.text)
+                    except Exception as e:
+                        print(f"Prompt Cache Error ({backend.name}): {e}")
+                self._handles[backend.name] = handle
+            handle = self._handles[backend.name]
+        return handle[1] if handle else None
+
+    def close(self):
+        """Deletes the provider-side caches (they are billed for storage until they expire)."""
+        with self._lock:
+            handles, self._handles = self._handles, {}
+        for handle in handles.values():
+            if handle:
+                try:
+                    handle[0].delete()
+                except Exception as e:
+                    print(f"Prompt Cache Delete Error: {e}")
+
+
+class CacheStats:
+    """Input and cached-input token totals per call type."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = {}  # call type -> {"calls", "input_tokens", "cached_tokens"}
+
+    def record(self, call_type, input_tokens, cached_tokens):
+        with self._lock:
+            totals = self._totals.setdefault(call_type, {"calls": 0, "input_tokens": 0, "cached_tokens": 0})
+            totals["calls"] += 1
+            totals["input_tokens"] += input_tokens
+            totals["cached_tokens"] += cached_tokens
+
+    def snapshot(self):
+        with self._lock:
+            result = {call_type: dict(totals) for call_type, totals in self._totals.items()}
+        for totals in result.values():
+            totals["hit_ratio"] = round(totals["cached_tokens"] / totals["input_tokens"], 3) if totals["input_tokens"] else 0.0
+        return result
@@ -32,8 +32,8 @@ class QuestionGenerator:
                     {"id": "dsa_m_3", "text": "Check if a string is a palindrome using recursion. Function: is_palindrome(s)", "type": "coding", "function_name": "is_palindrome", "test_cases": [{"input": ["racecar"], "output": True}, {"input": ["hello"], "output": False}]}
                 ],
                 "hard": [
-                    {"id": "dsa_h_1", "text": "Implement an LRU Cache.", "type": "coding"},
-                    {"id": "dsa_h_2", "text": "Find the median of two sorted arrays.", "type": "coding"}
+                    {"id": "dsa_h_1", "text": "Implement an LRU Cache: class LRUCache(capacity) with get(key) (returns -1 if the key is missing) and put(key, value).", "type": "coding"},
+                    {"id": "dsa_h_2", "text": "Find the median of two sorted arrays. Function: find_median_sorted_arrays(nums1, nums2)", "type": "coding", "function_name": "find_median_sorted_arrays", "test_cases": []}
                 ]
             },
             "OOP": {
@@ -121,6 +121,20 @@ class QuestionGenerator:
 
         return random.choice(questions_list)
 
+    def candidates(self, domain, q_type=None, exclude=()):
+        """
+        All questions of a domain not yet asked (ids in `exclude`), each tagged with its
+        difficulty bucket. Falls back to any type if none of `q_type` are left.
+        """
+        pool = [dict(q, difficulty=diff)
+                for diff, questions_list in self.questions.get(domain, {}).items()
+                for q in questions_list if q['id'] not in exclude]
+        if q_type:
+            filtered_list = [q for q in pool if q['type'] == q_type]
+            if filtered_list:
+                return filtered_list
+        return pool
+
 if __name__ == "__main__":
     qg = QuestionGenerator()
     print(qg.get_question("Python", "medium"))
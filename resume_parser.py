@@ -1,10 +1,13 @@
-from pdfminer.high_level import extract_text
 import os
 
+import lazy_loader
+import telemetry
+
 class ResumeParser:
     def __init__(self):
         pass
 
+    @telemetry.traced("resume.extract_text")
     def extract_text(self, pdf_path):
         """
         Extracts text from a PDF file.
@@ -15,7 +18,9 @@ class ResumeParser:
             return None
         
         try:
-            text = extract_text(pdf_path)
+            # pdfminer is slow to import, so it is only loaded once a resume is parsed
+            pdfminer = lazy_loader.load("pdfminer.high_level")
+            text = pdfminer.extract_text(pdf_path)
             return text.strip()
         except Exception as e:
             print(f"Error parsing PDF: {e}")
@@ -0,0 +1,210 @@
+// Test harness, compiled next to the submission's Solution class.
+
+import java.lang.reflect.Array;
+import java.lang.reflect.InvocationTargetException;
+import java.lang.reflect.Method;
+import java.lang.reflect.Modifier;
+import java.nio.charset.StandardCharsets;
+import java.util.ArrayList;
+import java.util.Collection;
+import java.util.LinkedHashMap;
+import java.util.List;
+import java.util.Map;
+
+public class Main {
+    static final String FUNCTION = "__FUNCTION_NAME__";
+    static String marker;
+
+    public static void main(String[] argv) throws Exception {
+        // First line: this run's result marker; then the test cases
+        String input = new String(System.in.readAllBytes(), StandardCharsets.UTF_8);
+        int newline = input.indexOf('\n');
+        marker = input.substring(0, newline).trim();
+        List<?> cases = (List<?>) new Parser(input.substring(newline + 1)).parse();
+
+        Method method = null;
+        for (Method m : Solution.class.getDeclaredMethods()) {
+            if (m.getName().equals(FUNCTION)) {
+                method = m;
+                break;
+            }
+        }
+        if (method == null) {
+            emit("{\"fatal\": " + quote("Method '" + FUNCTION + "' not found in class Solution.") + "}");
+            return;
+        }
+        method.setAccessible(true);
+        Object target = null;
+        if (!Modifier.isStatic(method.getModifiers())) {
+            var constructor = Solution.class.getDeclaredConstructor();
+            constructor.setAccessible(true);
+            target = constructor.newInstance();
+        }
+
+        for (int i = 0; i < cases.size(); i++) {
+            String record = "{\"case\": " + (i + 1);
+            try {
+                List<?> args = (List<?>) ((Map<?, ?>) cases.get(i)).get("input");
+                Class<?>[] types = method.getParameterTypes();
+                if (args.size() != types.length) {
+                    throw new IllegalArgumentException("expected " + types.length + " arguments, got " + args.size());
+                }
+                Object[] values = new Object[types.length];
+                for (int j = 0; j < types.length; j++) {
+                    values[j] = convert(args.get(j), types[j]);
+                }
+                record += ", \"actual\": " + toJson(method.invoke(target, values));
+            } catch (InvocationTargetException e) {
+                record += ", \"error\": " + quote(String.valueOf(e.getCause()));
+            } catch (Exception e) {
+                record += ", \"error\": " + quote(String.valueOf(e));
+            }
+            emit(record + "}");
+        }
+    }
+
+    static void emit(String record) {
+        System.out.println(marker + " " + record);
+        System.out.flush();
+    }
+
+    static Object convert(Object value, Class<?> type) {
+        if (value == null) return null;
+        if (type == int.class || type == Integer.class) return ((Number) value).intValue();
+        if (type == long.class || type == Long.class) return ((Number) value).longValue();
+        if (type == double.class || type == Double.class) return ((Number) value).doubleValue();
+        if (type == float.class || type == Float.class) return ((Number) value).floatValue();
+        if (type == boolean.class || type == Boolean.class) return value;
+        if (type == char.class || type == Character.class) return value.toString().charAt(0);
+        if (type == String.class) return value.toString();
+        if (type.isArray()) {
+            List<?> items = (List<?>) value;
+            Object array = Array.newInstance(type.getComponentType(), items.size());
+            for (int i = 0; i < items.size(); i++) {
+                Array.set(array, i, convert(items.get(i), type.getComponentType()));
+            }
+            return array;
+        }
+        return value;  // List, Map, Object: passed as parsed (Long/Double/Boolean/String/List/Map)
+    }
+
+    static String toJson(Object value) {
+        if (value == null) return "null";
+        if (value instanceof String || value instanceof Character) return quote(value.toString());
+        if (value instanceof Number || value instanceof Boolean) return value.toString();
+        if (value.getClass().isArray()) {
+            StringBuilder out = new StringBuilder("[");
+            for (int i = 0; i < Array.getLength(value); i++) {
+                if (i > 0) out.append(",");
+                out.append(toJson(Array.get(value, i)));
+            }
+            return out.append("]").toString();
+        }
+        if (value instanceof Collection) {
+            StringBuilder out = new StringBuilder("[");
+            boolean first = true;
+            for (Object item : (Collection<?>) value) {
+                if (!first) out.append(",");
+                out.append(toJson(item));
+                first = false;
+            }
+            return out.append("]").toString();
+        }
+        if (value instanceof Map) {
+            StringBuilder out = new StringBuilder("{");
+            boolean first = true;
+            for (Map.Entry<?, ?> entry : ((Map<?, ?>) value).entrySet()) {
+                if (!first) out.append(",");
+                out.append(quote(String.valueOf(entry.getKey()))).append(":").append(toJson(entry.getValue()));
+                first = false;
+            }
+            return out.append("}").toString();
+        }
+        return quote(value.toString());
+    }
+
+    static String quote(String text) {
+        StringBuilder out = new StringBuilder("\"");
+        for (char c : text.toCharArray()) {
+            if (c == '"' || c == '\\') out.append('\\').append(c);
+            else if (c == '\n') out.append("\\n");
+            else if (c < 0x20) out.append(' ');
+            else out.append(c);
+        }
+        return out.append('"').toString();
+    }
+
+    static class Parser {
+        final String s;
+        int i = 0;
+
+        Parser(String s) {
+            this.s = s;
+        }
+
+        void skip() {
+            while (i < s.length() && Character.isWhitespace(s.charAt(i))) i++;
+        }
+
+        Object parse() {
+            skip();
+            char c = s.charAt(i);
+            if (c == '{') {
+                Map<String, Object> map = new LinkedHashMap<>();
+                i++;
+                skip();
+                if (s.charAt(i) == '}') { i++; return map; }
+                while (true) {
+                    skip();
+                    String key = (String) parse();
+                    skip();
+                    i++;  // ':'
+                    map.put(key, parse());
+                    skip();
+                    if (s.charAt(i++) == '}') return map;
+                }
+            }
+            if (c == '[') {
+                List<Object> list = new ArrayList<>();
+                i++;
+                skip();
+                if (s.charAt(i) == ']') { i++; return list; }
+                while (true) {
+                    list.add(parse());
+                    skip();
+                    if (s.charAt(i++) == ']') return list;
+                }
+            }
+            if (c == '"') {
+                StringBuilder out = new StringBuilder();
+                i++;
+                while (s.charAt(i) != '"') {
+                    char ch = s.charAt(i++);
+                    if (ch == '\\') {
+                        char esc = s.charAt(i++);
+                        switch (esc) {
+                            case 'n': ch = '\n'; break;
+                            case 't': ch = '\t'; break;
+                            case 'r': ch = '\r'; break;
+                            case 'b': ch = '\b'; break;
+                            case 'f': ch = '\f'; break;
+                            case 'u': ch = (char) Integer.parseInt(s.substring(i, i + 4), 16); i += 4; break;
+                            default: ch = esc;
+                        }
+                    }
+                    out.append(ch);
+                }
+                i++;
+                return out.toString();
+            }
+            if (s.startsWith("true", i)) { i += 4; return Boolean.TRUE; }
+            if (s.startsWith("false", i)) { i += 5; return Boolean.FALSE; }
+            if (s.startsWith("null", i)) { i += 4; return null; }
+            int start = i;
+            while (i < s.length() && "+-0123456789.eE".indexOf(s.charAt(i)) >= 0) i++;
+            String number = s.substring(start, i);
+            if (number.contains(".") || number.contains("e") || number.contains("E")) return Double.parseDouble(number);
+            return Long.parseLong(number);
+        }
+    }
+}
@@ -0,0 +1,209 @@
+
+// --- Test harness (appended to the submission) ---
+#include <cctype>
+#include <cstdlib>
+#include <iostream>
+#include <iterator>
+#include <sstream>
+#include <stdexcept>
+#include <string>
+#include <tuple>
+#include <type_traits>
+#include <utility>
+#include <vector>
+
+namespace harness {
+
+struct Json {
+    enum Kind { Null, Bool, Number, String, Array, Object } kind = Null;
+    bool boolean = false;
+    double number = 0;
+    std::string text;
+    std::vector<Json> items;
+    std::vector<std::pair<std::string, Json>> fields;
+
+    const Json& at(const std::string& key) const {
+        for (const auto& field : fields)
+            if (field.first == key) return field.second;
+        throw std::runtime_error("missing key: " + key);
+    }
+};
+
+class Parser {
+  public:
+    explicit Parser(const std::string& source) : s(source) {}
+
+    Json parse() {
+        skip();
+        Json value;
+        char c = peek();
+        if (c == '{') {
+            value.kind = Json::Object;
+            ++i;
+            skip();
+            if (peek() == '}') { ++i; return value; }
+            while (true) {
+                skip();
+                std::string key = parse().text;
+                skip();
+                expect(':');
+                value.fields.emplace_back(key, parse());
+                skip();
+                if (peek() == ',') { ++i; continue; }
+                expect('}');
+                return value;
+            }
+        }
+        if (c == '[') {
+            value.kind = Json::Array;
+            ++i;
+            skip();
+            if (peek() == ']') { ++i; return value; }
+            while (true) {
+                value.items.push_back(parse());
+                skip();
+                if (peek() == ',') { ++i; continue; }
+                expect(']');
+                return value;
+            }
+        }
+        if (c == '"') {
+            value.kind = Json::String;
+            ++i;
+            while (peek() != '"') {
+                char ch = s[i++];
+                if (ch == '\\') {
+                    char esc = s[i++];
+                    switch (esc) {
+                        case 'n': ch = '\n'; break;
+                        case 't': ch = '\t'; break;
+                        case 'r': ch = '\r'; break;
+                        case 'b': ch = '\b'; break;
+                        case 'f': ch = '\f'; break;
+                        case 'u': ch = static_cast<char>(std::strtol(s.substr(i, 4).c_str(), nullptr, 16)); i += 4; break;
+                        default: ch = esc;
+                    }
+                }
+                value.text += ch;
+            }
+            ++i;
+            return value;
+        }
+        if (s.compare(i, 4, "true") == 0) { i += 4; value.kind = Json::Bool; value.boolean = true; return value; }
+        if (s.compare(i, 5, "false") == 0) { i += 5; value.kind = Json::Bool; return value; }
+        if (s.compare(i, 4, "null") == 0) { i += 4; return value; }
+        char* end = nullptr;
+        value.kind = Json::Number;
+        value.number = std::strtod(s.c_str() + i, &end);
+        if (end == s.c_str() + i) throw std::runtime_error("invalid JSON");
+        i = end - s.c_str();
+        return value;
+    }
+
+  private:
+    const std::string& s;
+    size_t i = 0;
+
+    char peek() const {
+        if (i >= s.size()) throw std::runtime_error("unexpected end of JSON");
+        return s[i];
+    }
+    void skip() { while (i < s.size() && std::isspace(static_cast<unsigned char>(s[i]))) ++i; }
+    void expect(char c) {
+        if (peek() != c) throw std::runtime_error(std::string("expected '") + c + "'");
+        ++i;
+    }
+};
+
+// JSON -> C++ argument
+template <typename T> struct From {
+    static T get(const Json& j) {
+        if constexpr (std::is_same_v<T, bool>) return j.boolean;
+        else if constexpr (std::is_arithmetic_v<T>) return static_cast<T>(j.number);
+        else static_assert(std::is_arithmetic_v<T>, "unsupported parameter type");
+    }
+};
+template <> struct From<std::string> {
+    static std::string get(const Json& j) { return j.text; }
+};
+template <> struct From<char> {
+    static char get(const Json& j) { return j.kind == Json::String ? (j.text.empty() ? '\0' : j.text[0]) : static_cast<char>(j.number); }
+};
+template <typename T> struct From<std::vector<T>> {
+    static std::vector<T> get(const Json& j) {
+        std::vector<T> out;
+        for (const auto& item : j.items) out.push_back(From<T>::get(item));
+        return out;
+    }
+};
+
+// C++ result -> JSON text
+inline std::string quote(const std::string& text) {
+    std::string out = "\"";
+    for (char c : text) {
+        if (c == '"' || c == '\\') { out += '\\'; out += c; }
+        else if (c == '\n') out += "\\n";
+        else if (static_cast<unsigned char>(c) < 0x20) out += ' ';
+        else out += c;
+    }
+    return out + "\"";
+}
+inline std::string to_json(bool value) { return value ? "true" : "false"; }
+inline std::string to_json(char value) { return quote(std::string(1, value)); }
+inline std::string to_json(const std::string& value) { return quote(value); }
+inline std::string to_json(const char* value) { return quote(value); }
+template <typename T>
+std::enable_if_t<std::is_arithmetic_v<T>, std::string> to_json(T value) {
+    std::ostringstream out;
+    out.precision(17);
+    out << value;
+    return out.str();
+}
+template <typename T> std::string to_json(const std::vector<T>& values) {
+    std::string out = "[";
+    for (size_t i = 0; i < values.size(); ++i) {
+        if (i) out += ",";
+        out += to_json(static_cast<T>(values[i]));
+    }
+    return out + "]";
+}
+
+template <typename R, typename... A, size_t... I>
+std::string invoke(R (*fn)(A...), const std::vector<Json>& args, std::index_sequence<I...>) {
+    // Materialise the arguments first so non-const reference parameters can bind to them
+    std::tuple<std::decay_t<A>...> values{From<std::decay_t<A>>::get(args[I])...};
+    if constexpr (std::is_void_v<R>) {
+        fn(std::get<I>(values)...);
+        return "null";
+    } else {
+        return to_json(fn(std::get<I>(values)...));
+    }
+}
+
+template <typename R, typename... A>
+std::string call(R (*fn)(A...), const std::vector<Json>& args) {
+    if (args.size() != sizeof...(A))
+        throw std::runtime_error("expected " + std::to_string(sizeof...(A)) + " arguments, got " + std::to_string(args.size()));
+    return invoke(fn, args, std::index_sequence_for<A...>{});
+}
+
+}  // namespace harness
+
+int main() {
+    // First line: this run's result marker; then the test cases
+    std::string marker;
+    std::getline(std::cin, marker);
+    while (!marker.empty() && std::isspace(static_cast<unsigned char>(marker.back()))) marker.pop_back();
+    std::string input((std::istreambuf_iterator<char>(std::cin)), std::istreambuf_iterator<char>());
+    harness::Json cases = harness::Parser(input).parse();
+    for (size_t i = 0; i < cases.items.size(); ++i) {
+        std::string record = "{\"case\": " + std::to_string(i + 1);
+        try {
+            record += ", \"actual\": " + harness::call(&__FUNCTION_NAME__, cases.items[i].at("input").items);
+        } catch (const std::exception& e) {
+            record += ", \"error\": " + harness::quote(e.what());
+        }
+        std::cout << marker << " " << record << "}" << std::endl;
+    }
+    return 0;
+}
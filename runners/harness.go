@@ -0,0 +1,68 @@
+package main
+
+// Test harness, compiled next to the submission (package main).
+
+import (
+	"bufio"
+	"encoding/json"
+	"fmt"
+	"os"
+	"reflect"
+	"strings"
+)
+
+// This run's result marker, read from the first stdin line
+var harnessMarker string
+
+func harnessEmit(record map[string]interface{}) {
+	data, err := json.Marshal(record)
+	if err != nil {
+		data, _ = json.Marshal(map[string]interface{}{"case": record["case"], "error": err.Error()})
+	}
+	fmt.Println(harnessMarker + " " + string(data))
+}
+
+func harnessCall(fn reflect.Value, input []json.RawMessage) (result map[string]interface{}) {
+	defer func() {
+		if r := recover(); r != nil {
+			result = map[string]interface{}{"error": fmt.Sprint(r)}
+		}
+	}()
+	t := fn.Type()
+	if len(input) != t.NumIn() {
+		return map[string]interface{}{"error": fmt.Sprintf("expected %d arguments, got %d", t.NumIn(), len(input))}
+	}
+	args := make([]reflect.Value, len(input))
+	for i, raw := range input {
+		value := reflect.New(t.In(i))
+		if err := json.Unmarshal(raw, value.Interface()); err != nil {
+			return map[string]interface{}{"error": fmt.Sprintf("argument %d: %v", i+1, err)}
+		}
+		args[i] = value.Elem()
+	}
+	out := fn.Call(args)
+	var actual interface{}
+	if len(out) > 0 {
+		actual = out[0].Interface()
+	}
+	return map[string]interface{}{"actual": actual}
+}
+
+func main() {
+	var cases []struct {
+		Input []json.RawMessage `json:"input"`
+	}
+	reader := bufio.NewReader(os.Stdin)
+	marker, _ := reader.ReadString('\n')
+	harnessMarker = strings.TrimSpace(marker)
+	if err := json.NewDecoder(reader).Decode(&cases); err != nil {
+		harnessEmit(map[string]interface{}{"fatal": "invalid test cases: " + err.Error()})
+		return
+	}
+	fn := reflect.ValueOf(__FUNCTION_NAME__)
+	for i, c := range cases {
+		record := harnessCall(fn, c.Input)
+		record["case"] = i + 1
+		harnessEmit(record)
+	}
+}
@@ -0,0 +1,32 @@
+
+// --- Test harness (appended to the submission) ---
+;(function () {
+  // stdin: this run's result marker on the first line, then the test cases
+  let marker = globalThis.__RESULT_MARKER__;
+  let cases = globalThis.__TEST_CASES__;
+  if (cases === undefined) {
+    const input = require("fs").readFileSync(0, "utf8");
+    const newline = input.indexOf("\n");
+    marker = input.slice(0, newline).trim();
+    cases = JSON.parse(input.slice(newline + 1));
+  }
+  const emit = (record) => console.log(marker + " " + JSON.stringify(record));
+  let fn;
+  try {
+    fn = eval("__FUNCTION_NAME__");
+  } catch (e) {
+    fn = undefined;
+  }
+  if (typeof fn !== "function") {
+    emit({ fatal: "Function '__FUNCTION_NAME__' not found. Did you name it correctly?" });
+    return;
+  }
+  cases.forEach((testCase, i) => {
+    try {
+      const actual = fn(...testCase.input);
+      emit({ case: i + 1, actual: actual === undefined ? null : actual });
+    } catch (e) {
+      emit({ case: i + 1, error: String(e) });
+    }
+  });
+})();
@@ -0,0 +1,97 @@
+# --- Test harness (appended to the submission) ---
+if __name__ == "__main__":
+    import json as _json
+    import signal as _signal
+    import sys as _sys
+    import time as _time
+    import tracemalloc as _tracemalloc
+
+    try:
+        import resource as _resource
+    except ImportError:  # Windows: no rlimits or rusage
+        _resource = None
+
+    # First stdin line: this run's result marker, so the program's own prints cannot pose as results
+    _marker = _sys.stdin.readline().strip()
+
+    def _emit(record):
+        print(_marker + " " + _json.dumps(record, default=repr), flush=True)
+
+    class _TimeLimitExceeded(BaseException):
+        """BaseException, so the candidate's own `except Exception` does not swallow it."""
+
+    def _on_alarm(signum, frame):
+        raise _TimeLimitExceeded()
+
+    def _address_space():
+        """Bytes of address space in use, or None where it cannot be read (not Linux)."""
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[0]) * _resource.getpagesize()
+        except (OSError, AttributeError):
+            return None
+
+    def _max_rss_kb():
+        if _resource is None:
+            return None
+        rss = _resource.getrusage(_resource.RUSAGE_SELF).ru_maxrss
+        return rss // 1024 if _sys.platform == "darwin" else rss  # bytes on macOS, KB elsewhere
+
+    def _run_case(function, case):
+        """Runs one case under its time and memory limits. Returns the record to emit."""
+        time_limit = case.get("time_limit_ms")
+        memory_limit = case.get("memory_limit_kb")
+        # Address-space cap (current use + the limit), so a memory blow-up fails fast with
+        # MemoryError instead of swapping; tracemalloc's peak is checked as well below
+        rlimit = None
+        in_use = _address_space() if memory_limit and _resource is not None else None
+        if in_use is not None:
+            rlimit = _resource.getrlimit(_resource.RLIMIT_AS)
+            cap = in_use + memory_limit * 1024
+            if rlimit[1] == _resource.RLIM_INFINITY or cap < rlimit[1]:
+                _resource.setrlimit(_resource.RLIMIT_AS, (cap, rlimit[1]))
+            else:
+                rlimit = None
+        timed = bool(time_limit) and hasattr(_signal, "setitimer")
+        if timed:
+            _signal.signal(_signal.SIGALRM, _on_alarm)
+            _signal.setitimer(_signal.ITIMER_REAL, time_limit / 1000)
+
+        _tracemalloc.reset_peak()
+        traced_before = _tracemalloc.get_traced_memory()[0]
+        blocks_before = _sys.getallocatedblocks()
+        cpu_start, wall_start = _time.process_time(), _time.perf_counter()
+        try:
+            try:
+                record = {"actual": function(*case["input"])}
+            finally:
+                if timed:
+                    _signal.setitimer(_signal.ITIMER_REAL, 0)
+                if rlimit is not None:
+                    _resource.setrlimit(_resource.RLIMIT_AS, rlimit)
+        except _TimeLimitExceeded:
+            record = {"error": f"TimeLimitExceeded: took longer than {time_limit} ms", "limit": "time"}
+        except MemoryError:
+            if memory_limit:
+                record = {"error": f"MemoryLimitExceeded: used more than {memory_limit} KB", "limit": "memory"}
+            else:
+                record = {"error": "MemoryError: out of memory"}
+        except Exception as _error:
+            record = {"error": f"{type(_error).__name__}: {_error}"}
+        cpu_ms = (_time.process_time() - cpu_start) * 1000
+        wall_ms = (_time.perf_counter() - wall_start) * 1000
+        peak_kb = (_tracemalloc.get_traced_memory()[1] - traced_before) / 1024
+        record["profile"] = {"cpu_ms": round(cpu_ms, 3), "wall_ms": round(wall_ms, 3), "peak_kb": round(peak_kb, 1),
+                             "blocks": _sys.getallocatedblocks() - blocks_before, "max_rss_kb": _max_rss_kb()}
+        if memory_limit and peak_kb > memory_limit and "limit" not in record:
+            record = {"error": f"MemoryLimitExceeded: used {peak_kb:.0f} KB (limit {memory_limit} KB)",
+                      "limit": "memory", "profile": record["profile"]}
+        return record
+
+    _function = globals().get("__FUNCTION_NAME__")
+    if not callable(_function):
+        _emit({"fatal": "Function '__FUNCTION_NAME__' not found. Did you name it correctly?"})
+    else:
+        _tracemalloc.start()
+        for _index, _case in enumerate(_json.loads(_sys.stdin.read()), start=1):
+            _emit(dict(_run_case(_function, _case), case=_index))
@@ -0,0 +1,148 @@
+"""
+Low-overhead sampling profiler for whole interview sessions (`python main.py --profile`).
+
+A daemon thread snapshots every thread's Python stack with sys._current_frames()
+at a fixed interval. Each sample is tagged with the current interview phase
+(InterviewEngine.state) as a synthetic root frame, so flamegraphs split by phase.
+
+Output:
+  * <name>.folded            collapsed stacks ("thread;state:X;f1;f2 count"), for flamegraph.pl / speedscope
+  * <name>.speedscope.json   speedscope sampled profiles, one per thread, in time order
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+DEFAULT_INTERVAL = 0.01  # seconds between samples (100 Hz)
+MAX_DEPTH = 128          # deeper stacks are truncated at the leaf end
+
+
+def name_thread(name):
+    """
+    Names the calling thread. QThreads are not started through `threading`, so
+    without this they show up as "Dummy-N" in profiles and telemetry spans.
+    """
+    threading.current_thread().name = name
+
+
+class SamplingProfiler:
+    def __init__(self, interval=DEFAULT_INTERVAL, state_fn=None):
+        self.interval = interval
+        self.state_fn = state_fn
+        self.frames = []        # [(function, file, line)]
+        self._frame_index = {}  # code object -> index in self.frames
+        self.samples = {}       # thread name -> [(stack indices, weight seconds)]
+        self.started = None
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _frame_id(self, code):
+        index = self._frame_index.get(code)
+        if index is None:
+            index = self._frame_index[code] = len(self.frames)
+            self.frames.append((code.co_name, code.co_filename, code.co_firstlineno))
+        return index
+
+    def _state(self):
+        if self.state_fn is None:
+            return None
+        try:
+            return self.state_fn()
+        except Exception:
+            return None
+
+    def _state_frame(self, state):
+        # Interned like code objects so every phase is a single shared frame
+        key = ("state", state)
+        index = self._frame_index.get(key)
+        if index is None:
+            index = self._frame_index[key] = len(self.frames)
+            self.frames.append((f"state:{state}", "", 0))
+        return index
+
+    def sample(self, weight):
+        """Takes one sample of every thread (except the profiler's own)."""
+        names = {t.ident: t.name for t in threading.enumerate()}
+        own = threading.get_ident()
+        state = self._state()
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack = []
+            while frame is not None and len(stack) < MAX_DEPTH:
+                stack.append(self._frame_id(frame.f_code))
+                frame = frame.f_back
+            if state is not None:
+                stack.append(self._state_frame(state))
+            stack.reverse()
+            name = names.get(ident, f"thread-{ident}")
+            self.samples.setdefault(name, []).append((tuple(stack), weight))
+
+    def _run(self):
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            self.sample(now - last)
+            last = now
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="SamplingProfiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        if self.started is not None:
+            self.elapsed = time.perf_counter() - self.started
+
+    def collapsed(self):
+        """Stacks in the collapsed ("folded") format, root first, with sample counts."""
+        counts = Counter()
+        for thread, samples in self.samples.items():
+            for stack, _ in samples:
+                counts[(thread,) + stack] += 1
+        lines = []
+        for (thread, *stack), count in sorted(counts.items(), key=lambda item: -item[1]):
+            names = [thread] + [self.frames[i][0] for i in stack]
+            lines.append(f"{';'.join(n.replace(';', ':') for n in names)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, name="interview session"):
+        profiles = []
+        for thread, samples in sorted(self.samples.items()):
+            total = sum(weight for _, weight in samples)
+            profiles.append({
+                "type": "sampled",
+                "name": thread,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": total,
+                "samples": [list(stack) for stack, _ in samples],
+                "weights": [weight for _, weight in samples],
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "ai-interviewer sampling_profiler",
+            "shared": {"frames": [{"name": fn, "file": file, "line": line} for fn, file, line in self.frames]},
+            "profiles": profiles,
+        }
+
+    def write(self, base_path):
+        """Writes <base_path>.folded and <base_path>.speedscope.json. Returns both paths."""
+        directory = os.path.dirname(base_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        folded, speedscope = base_path + ".folded", base_path + ".speedscope.json"
+        with open(folded, "w") as f:
+            f.write(self.collapsed())
+        with open(speedscope, "w") as f:
+            json.dump(self.speedscope(os.path.basename(base_path)), f)
+        return folded, speedscope
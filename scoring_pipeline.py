@@ -0,0 +1,179 @@
+"""
+Concurrent scoring of a submitted answer.
+
+Every scorer that does not depend on another one runs at the same time under a
+single deadline:
+
+- theory answers: the LLM judge, the offline keyword Evaluator and sentiment
+- code answers: the AST/compile analysis and a sandbox run of the test cases
+
+A scorer that is still running at the deadline is left out (its request keeps
+running in the background and its result is dropped); the answer is scored from
+whatever finished. The judges' scores are combined by a merge policy from
+MERGE_POLICIES, chosen with SCORING_POLICY.
+
+    outcome = pipeline.run({"llm": judge, "heuristic": keywords, "sentiment": tone})
+    verdict = merge_theory(outcome.results)
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import telemetry
+
+# Budget for scoring one answer, shared by all scorers
+SCORING_DEADLINE = 25.0
+
+# Scorers of one answer run together; a few spare threads absorb abandoned late calls
+SCORING_WORKERS = 8
+
+# How LLM and keyword judges are combined (see MERGE_POLICIES)
+SCORING_POLICY = os.getenv("SCORING_POLICY", "prefer_llm")
+
+# Judge weights for the "blend" policy
+JUDGE_WEIGHTS = {"llm": 0.8, "heuristic": 0.2}
+
+
+class ScoringOutcome:
+    """Results of the scorers that finished in time, and the names of those that did not."""
+
+    def __init__(self, results, missed, failed, elapsed):
+        self.results = results  # name -> return value
+        self.missed = missed    # still running at the deadline
+        self.failed = failed    # raised an exception
+        self.elapsed = elapsed
+
+    def summary(self):
+        return {"completed": sorted(self.results), "missed": self.missed, "failed": self.failed,
+                "elapsed_ms": round(self.elapsed * 1000, 1)}
+
+
+class ScoringPipeline:
+    def __init__(self, workers=SCORING_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scoring")
+
+    def _run_one(self, name, scorer):
+        with telemetry.span(f"scoring.{name}"):
+            return scorer()
+
+    def run(self, scorers, deadline=None):
+        """Runs `scorers` ({name: callable}) concurrently and waits at most `deadline` seconds."""
+        deadline = SCORING_DEADLINE if deadline is None else deadline
+        start = time.perf_counter()
+        futures = {self._executor.submit(self._run_one, name, scorer): name for name, scorer in scorers.items()}
+        done, pending = wait(futures, timeout=deadline)
+        results, failed = {}, []
+        for future in done:
+            name = futures[future]
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                print(f"Scoring Error ({name}): {e}")
+                failed.append(name)
+        missed = []
+        for future in pending:
+            future.cancel()
+            missed.append(futures[future])
+        if missed:
+            print(f"Scoring: {', '.join(sorted(missed))} missed the {deadline:.0f}s deadline")
+        return ScoringOutcome(results, sorted(missed), sorted(failed), time.perf_counter() - start)
+
+
+def _judges(results):
+    """[(judge, score, feedback, rubric)] for every judge with a result, most trusted first."""
+    judges = []
+    llm = results.get("llm")
+    if llm:
+        judges.append(("llm", llm["score"], llm.get("feedback", ""), llm.get("rubric")))
+    heuristic = results.get("heuristic")
+    if heuristic:
+        score, feedback = heuristic
+        judges.append(("heuristic", score, feedback, None))
+    return judges
+
+
+def prefer_llm(judges):
+    """The LLM judge when it answered in time, otherwise the keyword evaluator."""
+    return judges[0]
+
+
+def blend(judges):
+    """Weighted mean of the available judges (JUDGE_WEIGHTS); feedback from the most trusted."""
+    total = sum(JUDGE_WEIGHTS[name] for name, *_ in judges)
+    score = round(sum(JUDGE_WEIGHTS[name] * score for name, score, *_ in judges) / total)
+    name, _, feedback, rubric = judges[0]
+    return name, score, feedback, rubric
+
+
+def lowest(judges):
+    """The strictest judge."""
+    return min(judges, key=lambda judge: judge[1])
+
+
+MERGE_POLICIES = {"prefer_llm": prefer_llm, "blend": blend, "lowest": lowest}
+
+
+def merge_theory(results, policy=None):
+    """
+    Combines judge results into {"score", "feedback", "rubric", "judge"}.
+    The score is 0 if no judge finished.
+    """
+    judges = _judges(results)
+    if not judges:
+        return {"score": 0, "feedback": "The answer could not be evaluated in time.", "rubric": None, "judge": None}
+    merge = MERGE_POLICIES.get(policy or SCORING_POLICY, prefer_llm)
+    judge, score, feedback, rubric = merge(judges)
+    return {"score": score, "feedback": feedback, "rubric": rubric, "judge": judge}
+
+
+def merge_code(results, test_count, unfinished=()):
+    """
+    Combines analysis, sandbox and hidden-test results into {"score", "feedback",
+    "analysis", "run", "graded"}. Invalid code scores 0; valid code scores the share of
+    test cases passed (the mean of the visible and hidden shares when both ran), or 100
+    when there was nothing to test. `unfinished` names the scorers that failed or missed
+    the deadline: if a test run is among them the answer is not graded and scores 0.
+    """
+    analysis = results.get("analysis")
+    run = results.get("sandbox")
+    if analysis is None:
+        # Compile errors show up in the sandbox run too
+        compiled = run is not None and bool(run.get("results"))
+        analysis = {"valid": compiled, "error": None if compiled else "Analysis did not finish in time.",
+                    "follow_ups": []}
+    if not analysis["valid"]:
+        return {"score": 0, "feedback": f"Error: {analysis.get('error')}", "analysis": analysis, "run": run,
+                "graded": True}
+    # With test cases the sandbox is always scheduled, so no run means it did not finish
+    if "hidden_tests" in unfinished or (test_count and ("sandbox" in unfinished or run is None)):
+        return {"score": 0, "feedback": "The test run did not finish, so this answer could not be graded.",
+                "analysis": analysis, "run": run, "graded": False}
+    shares, notes = [], []
+    if run is not None and test_count:
+        if "results" not in run:
+            # Failed before any test case ran (build error, timeout)
+            return {"score": 0, "feedback": f"Error: {run['errors']}", "analysis": analysis, "run": run,
+                    "graded": True}
+        passed = sum(1 for case in run["results"] if case["passed"])
+        shares.append(passed / test_count)
+        notes.append(f"Passed {passed}/{test_count} test cases.")
+        for limit in ("memory", "time"):
+            cases = [str(case["case"]) for case in run["results"] if case.get("limit") == limit]
+            if cases:
+                notes.append(f"Test case {', '.join(cases)} exceeded the {limit} limit.")
+    hidden = results.get("hidden_tests")
+    if hidden and "error" in hidden:
+        shares.append(0)
+        notes.append(f"Hidden tests did not run: {hidden['error']}")
+    elif hidden:
+        shares.append(hidden["passed"] / hidden["cases"])
+        notes.append(f"Passed {hidden['passed']}/{hidden['cases']} hidden tests.")
+        example = hidden["counterexample"]
+        if example:
+            outcome = f"raised {example['error']}" if example["error"] else f"got {example['actual']!r}"
+            notes.append(f"Fails for input {example['input']!r}: expected {example['expected']!r}, {outcome}.")
+    if not shares:
+        return {"score": 100, "feedback": "Code looks good!", "analysis": analysis, "run": run, "graded": True}
+    feedback = "Code looks good!" if min(shares) == 1 else "The code runs but fails some test cases."
+    return {"score": round(100 * sum(shares) / len(shares)), "feedback": " ".join([feedback] + notes),
+            "analysis": analysis, "run": run, "graded": True}
@@ -0,0 +1,137 @@
+"""
+Shared sentiment scoring for answers.
+
+TextBlob's pattern lexicon is loaded once, on a single background worker
+thread, and results are cached by text. The GUI prefetches the score of the
+partial transcript while the candidate is still speaking, so by the time the
+answer is submitted its polarity is usually already known.
+
+    from sentiment_service import sentiment
+    sentiment.prefetch(partial_text)      # non-blocking, newest text wins
+    sentiment.polarity(answer)            # -1 .. 1, cached
+    sentiment.score_batch(answers)        # many answers in one worker job
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+
+import lazy_loader
+
+CACHE_SIZE = 256
+
+
+class SentimentService:
+    def __init__(self, cache_size=CACHE_SIZE):
+        self.cache_size = cache_size
+        self._cache = OrderedDict()  # text -> polarity, most recent last
+        self._pending = {}           # text -> Future
+        self._prefetch = None        # latest queued prefetch, replaced by newer partials
+        self._analyzer = None
+        self._lock = threading.Lock()
+        # One worker: the lexicon is loaded and used on a single thread, off the UI thread
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sentiment")
+        self.stats = {"hits": 0, "misses": 0, "prefetches": 0, "superseded": 0}
+
+    def _load(self):
+        if self._analyzer is None:
+            module = lazy_loader.try_load("textblob.en.sentiments")
+            if module is None:
+                print("Sentiment Warning: textblob is not installed; answers are scored as neutral.")
+                self._analyzer = False
+            else:
+                analyzer = module.PatternAnalyzer()
+                analyzer.analyze("good")  # Forces the lexicon to load now
+                self._analyzer = analyzer
+        return self._analyzer
+
+    def _score(self, text):
+        analyzer = self._load()
+        return analyzer.analyze(text).polarity if analyzer else 0.0
+
+    def _remember(self, text, value):
+        self._cache[text] = value
+        self._cache.move_to_end(text)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _run(self, text):
+        try:
+            value = self._score(text)
+            with self._lock:
+                self._remember(text, value)
+            return value
+        finally:
+            with self._lock:
+                self._pending.pop(text, None)
+
+    def preload(self):
+        """Loads the lexicon on the worker thread ahead of the first answer."""
+        return self._executor.submit(self._load)
+
+    def submit(self, text):
+        """Returns a Future with the polarity of `text` (-1 to 1)."""
+        with self._lock:
+            if text in self._cache:
+                self.stats["hits"] += 1
+                self._cache.move_to_end(text)
+                future = Future()
+                future.set_result(self._cache[text])
+                return future
+            future = self._pending.get(text)
+            if future is None:
+                self.stats["misses"] += 1
+                future = self._pending[text] = self._executor.submit(self._run, text)
+            return future
+
+    def polarity(self, text, timeout=None):
+        """Blocking polarity lookup; served from the cache when the text was prefetched."""
+        while True:
+            try:
+                return self.submit(text).result(timeout)
+            except CancelledError:
+                # A superseded prefetch of the same text; score it for real
+                continue
+
+    def prefetch(self, text):
+        """
+        Scores a partial transcript in the background. A queued prefetch that has
+        not started yet is dropped in favour of the newer, longer transcript.
+        """
+        with self._lock:
+            stale = self._prefetch
+            if text in self._cache:
+                return
+        if stale is not None and stale.cancel():
+            with self._lock:
+                self.stats["superseded"] += 1
+                for key, future in list(self._pending.items()):
+                    if future is stale:
+                        del self._pending[key]
+        with self._lock:
+            self.stats["prefetches"] += 1
+        self._prefetch = self.submit(text)
+
+    def clear(self):
+        """Drops cached scores (the lexicon stays loaded)."""
+        with self._lock:
+            self._cache.clear()
+
+    def score_batch(self, texts):
+        """Scores many texts in one worker job. Returns polarities in input order."""
+        texts = list(texts)
+
+        def _run_batch():
+            with self._lock:
+                scores = {t: self._cache[t] for t in texts if t in self._cache}
+            missing = {t: self._score(t) for t in dict.fromkeys(texts) if t not in scores}
+            with self._lock:
+                for t, value in missing.items():
+                    self._remember(t, value)
+            scores.update(missing)
+            return [scores[t] for t in texts]
+
+        return self._executor.submit(_run_batch).result()
+
+
+# One service per process, shared by the engine and the GUI
+sentiment = SentimentService()
@@ -0,0 +1,161 @@
+import json
+import os
+import threading
+import time
+
+# fsync batching: an fsync is issued after this many records or this many seconds,
+# whichever comes first, and always for records marked durable (session start/end).
+FSYNC_EVERY = 8
+FSYNC_INTERVAL = 1.0
+
+# Once the journal holds this many records it is folded into a snapshot
+COMPACT_AFTER = 200
+
+
+class SessionJournal:
+    """
+    Append-only, write-ahead journal of interview events (JSON lines).
+
+    Every record is written and flushed before the engine acts on it, and fsynced in
+    batches. For long sessions the journal is compacted: the current engine state is
+    written to `<path>.snapshot` and the journal restarts empty. Recovery loads the
+    snapshot and replays the records written after it.
+    """
+
+    def __init__(self, path, fsync_every=FSYNC_EVERY, fsync_interval=FSYNC_INTERVAL):
+        self.path = path
+        self.snapshot_path = path + ".snapshot"
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._file = None
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self.records_since_snapshot = 0
+        self.seq = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._drop_torn_tail()
+        snapshot, records = self.read()
+        if snapshot:
+            self.seq = snapshot["seq"]
+        if records:
+            self.seq = records[-1]["seq"]
+            self.records_since_snapshot = len(records)
+
+    def _drop_torn_tail(self):
+        """
+        Truncates a half-written last line (crash mid-write), so the next record is not
+        appended onto it. The journal is compacted regularly, so reading it whole is cheap.
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb+") as f:
+            data = f.read()
+            end = data.rfind(b"\n") + 1
+            if end != len(data):
+                f.truncate(end)
+
+    def _open(self):
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        return self._file
+
+    def append(self, event_type, durable=False, **data):
+        """Writes one event record and returns it."""
+        with self._lock:
+            self.seq += 1
+            record = {"seq": self.seq, "t": round(time.time(), 3), "type": event_type}
+            record.update(data)
+            f = self._open()
+            f.write(json.dumps(record, separators=(",", ":"), default=str) + "\n")
+            f.flush()
+            self._pending += 1
+            self.records_since_snapshot += 1
+            if (durable or self._pending >= self.fsync_every
+                    or time.monotonic() - self._last_sync >= self.fsync_interval):
+                self._sync()
+            return record
+
+    def _sync(self):
+        if self._file is not None and self._pending:
+            os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def sync(self):
+        with self._lock:
+            self._sync()
+
+    def needs_compaction(self):
+        return self.records_since_snapshot >= COMPACT_AFTER
+
+    def compact(self, state):
+        """
+        Writes `state` as a snapshot covering every record so far and empties the journal.
+        The snapshot is written atomically (temp file + rename), so a crash at any point
+        leaves either the old snapshot + full journal or the new snapshot.
+        """
+        with self._lock:
+            self._sync()
+            tmp = self.snapshot_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"seq": self.seq, "t": round(time.time(), 3), "state": state}, f, default=str)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.snapshot_path)
+
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            # Records up to self.seq are covered by the snapshot; replay skips them anyway
+            open(self.path, "w").close()
+            self.records_since_snapshot = 0
+
+    def read(self):
+        """
+        Returns (snapshot or None, [records after the snapshot]).
+        Lines that are not valid JSON (a torn write) are skipped.
+        """
+        snapshot = None
+        if os.path.exists(self.snapshot_path):
+            try:
+                with open(self.snapshot_path, encoding="utf-8") as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Journal snapshot unreadable, replaying journal only: {e}")
+
+        records = []
+        if os.path.exists(self.path):
+            after = snapshot["seq"] if snapshot else 0
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if record.get("seq", 0) > after:
+                        records.append(record)
+        return snapshot, records
+
+    def reset(self):
+        """Discards the journal and snapshot (a new session is starting)."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            for path in (self.path, self.snapshot_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._pending = 0
+            self.records_since_snapshot = 0
+            self.seq = 0
+
+    def close(self):
+        with self._lock:
+            self._sync()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,143 @@
+"""
+Speculative evaluation of spoken answers.
+
+Candidates usually stop talking a few seconds before they press Submit. Once the
+transcript has been stable for a short while the GUI calls speculate(), which
+starts the LLM evaluation in the background; on Submit, take() returns that
+result when the final answer is the same (or differs only trivially) and
+discards it otherwise, so the caller evaluates the final text as before.
+
+    speculator = SpeculativeEvaluator(llm.evaluate_answer)
+    speculator.speculate(question, partial_text)   # non-blocking, newest text wins
+    result = speculator.take(question, answer)     # evaluation, or None on a miss
+"""
+import re
+import threading
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+import telemetry
+
+# Quiet time after the last transcript change before an answer is evaluated speculatively
+SPECULATION_STABLE_MS = 1500
+
+# A speculative result is reused for a final answer that differs by at most this many
+# words, and by no more than SPECULATION_MAX_CHANGED_RATIO of its words
+SPECULATION_MAX_CHANGED_WORDS = 2
+SPECULATION_MAX_CHANGED_RATIO = 0.1
+
+# A running request cannot be aborted, so a newer speculation may overlap one stale call
+SPECULATION_WORKERS = 2
+
+# Words, keeping identifiers like os.path and C++ whole but not sentence punctuation
+_WORD = re.compile(r"[\w'+#]+(?:[.-][\w'+#]+)*")
+
+# Adding, dropping or changing one of these flips the meaning however long the answer is
+_NEGATIONS = frozenset({"not", "no", "never", "none", "nor", "neither", "nothing", "cannot", "without"})
+
+
+def _words(text):
+    return _WORD.findall(text.lower())
+
+
+def _is_negation(word):
+    return word in _NEGATIONS or word.endswith("n't")
+
+
+def is_equivalent(speculated, final):
+    """
+    True if an evaluation of `speculated` can stand for `final`: the same words
+    ignoring case, spacing and punctuation, or only a couple of words added,
+    removed or changed (a trailing "so yeah", a corrected typo), none of them a
+    negation.
+    """
+    if speculated == final:
+        return True
+    a, b = _words(speculated), _words(final)
+    if a == b:
+        return True
+    if not a or not b:
+        return False
+    # Common prefix and suffix cover the usual edits (appended or fixed words) cheaply
+    prefix = 0
+    while prefix < min(len(a), len(b)) and a[prefix] == b[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < min(len(a), len(b)) - prefix and a[-1 - suffix] == b[-1 - suffix]:
+        suffix += 1
+    changed = max(len(a), len(b)) - prefix - suffix
+    if (changed > SPECULATION_MAX_CHANGED_WORDS
+            or changed > SPECULATION_MAX_CHANGED_RATIO * len(b)):
+        return False
+    edited = a[prefix:len(a) - suffix] + b[prefix:len(b) - suffix]
+    return not any(_is_negation(word) for word in edited)
+
+
+class SpeculativeEvaluator:
+    """Runs at most one live speculative evaluation, for the latest stable transcript."""
+
+    def __init__(self, evaluate, workers=SPECULATION_WORKERS):
+        self.evaluate = evaluate  # (question, answer) -> evaluation dict or None
+        self._lock = threading.Lock()
+        self._current = None      # (question, text, Future)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="speculate")
+        self.stats = {"started": 0, "hits": 0, "near_hits": 0, "misses": 0, "discarded": 0}
+
+    def _run(self, question, text):
+        with telemetry.span("speculate.evaluate", chars=len(text)):
+            return self.evaluate(question, text)
+
+    def speculate(self, question, text):
+        """Starts evaluating `text` in the background unless it is already being evaluated."""
+        text = text.strip()
+        if not text:
+            return
+        with self._lock:
+            current = self._current
+            if current and current[0] == question and current[1] == text:
+                return
+            self._current = None
+        self._discard(current)
+        future = self._executor.submit(self._run, question, text)
+        with self._lock:
+            self._current = (question, text, future)
+            self.stats["started"] += 1
+
+    def take(self, question, answer, timeout=None):
+        """
+        The speculative evaluation for the final `answer`, waiting for it if it is
+        still running, or None if there is none or it was for a different text.
+        """
+        with self._lock:
+            current, self._current = self._current, None
+        if current is None:
+            return None
+        spec_question, text, future = current
+        answer = answer.strip()
+        if spec_question != question or not is_equivalent(text, answer):
+            with self._lock:
+                self.stats["misses"] += 1
+            self._discard(current)
+            return None
+        with self._lock:
+            self.stats["hits" if text == answer else "near_hits"] += 1
+        try:
+            return future.result(timeout)
+        except CancelledError:
+            return None
+        except Exception as e:
+            print(f"Speculative Evaluation Error: {e}")
+            return None
+
+    def cancel(self):
+        """Drops any pending speculation (e.g. when the question changes)."""
+        with self._lock:
+            current, self._current = self._current, None
+        self._discard(current)
+
+    def _discard(self, current):
+        if current is None:
+            return
+        # A queued call is cancelled; a running one finishes and its result is ignored
+        current[2].cancel()
+        with self._lock:
+            self.stats["discarded"] += 1
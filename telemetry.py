@@ -0,0 +1,242 @@
+"""
+Built-in tracing and metrics.
+
+    with telemetry.span("llm.generate_question", domain=domain):
+        ...
+
+    @telemetry.traced("executor.run_code")
+    def run_code(...): ...
+
+    telemetry.set_gauge("camera.fps", fps)
+
+Spans feed rolling latency histograms (p50/p95) and an in-memory span buffer.
+Export:
+  * Prometheus text format on http://127.0.0.1:<METRICS_PORT>/metrics
+  * OpenTelemetry-compatible JSON (OTLP/JSON layout) written to TRACE_FILE on exit
+"""
+import atexit
+import functools
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SERVICE_NAME = "ai-interviewer"
+HISTOGRAM_WINDOW = 500  # latest samples kept per span name for percentiles
+SPAN_BUFFER = 5000      # finished spans kept for the trace export
+
+_lock = threading.Lock()
+_local = threading.local()
+_histograms = {}   # name -> deque of seconds
+_counts = {}       # name -> (count, total seconds, errors)
+_gauges = {}       # name -> value
+_spans = deque(maxlen=SPAN_BUFFER)
+_server = None
+
+
+def _percentile(ordered, pct):
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+def observe(name, seconds, error=False):
+    """Records one duration sample for `name`."""
+    with _lock:
+        window = _histograms.get(name)
+        if window is None:
+            window = _histograms[name] = deque(maxlen=HISTOGRAM_WINDOW)
+        window.append(seconds)
+        count, total, errors = _counts.get(name, (0, 0.0, 0))
+        _counts[name] = (count + 1, total + seconds, errors + (1 if error else 0))
+
+
+def set_gauge(name, value):
+    with _lock:
+        _gauges[name] = value
+
+
+class span:
+    """Context manager timing a block as a trace span; nests per thread."""
+
+    def __init__(self, name, **attributes):
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        parent = stack[-1] if stack else None
+        self.trace_id = parent.trace_id if parent else f"{random.getrandbits(128):032x}"
+        self.parent_id = parent.span_id if parent else None
+        self.span_id = f"{random.getrandbits(64):016x}"
+        stack.append(self)
+        self.start_ns = time.time_ns()
+        self._start = time.perf_counter()
+        return self
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self._start
+        _local.stack.pop()
+        observe(self.name, duration, error=exc_type is not None)
+        record = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.start_ns + int(duration * 1e9)),
+            "attributes": [_attribute(k, v) for k, v in self.attributes.items()]
+                          + [_attribute("thread.name", threading.current_thread().name)],
+            "status": {"code": 2, "message": str(exc)} if exc_type else {"code": 1},
+        }
+        if self.parent_id:
+            record["parentSpanId"] = self.parent_id
+        with _lock:
+            _spans.append(record)
+        return False
+
+
+def traced(name):
+    """Decorator form of span()."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _attribute(key, value):
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def snapshot():
+    """{"spans": {name: {count, errors, p50_ms, p95_ms}}, "gauges": {...}}"""
+    with _lock:
+        histograms = {name: sorted(window) for name, window in _histograms.items()}
+        counts = dict(_counts)
+        gauges = dict(_gauges)
+    spans = {}
+    for name, ordered in histograms.items():
+        count, total, errors = counts[name]
+        spans[name] = {
+            "count": count,
+            "errors": errors,
+            "p50_ms": _percentile(ordered, 50) * 1000.0,
+            "p95_ms": _percentile(ordered, 95) * 1000.0,
+            "total_s": total,
+        }
+    return {"spans": spans, "gauges": gauges}
+
+
+def _metric_name(name):
+    return "ai_interviewer_" + "".join(c if c.isalnum() else "_" for c in name)
+
+
+def prometheus_text():
+    """Renders current metrics in the Prometheus text exposition format."""
+    data = snapshot()
+    lines = []
+    if data["spans"]:
+        lines.append("# HELP ai_interviewer_span_seconds Duration of instrumented operations.")
+        lines.append("# TYPE ai_interviewer_span_seconds summary")
+        for name, stats in sorted(data["spans"].items()):
+            label = f'span="{name}"'
+            lines.append(f'ai_interviewer_span_seconds{{{label},quantile="0.5"}} {stats["p50_ms"] / 1000.0:.6f}')
+            lines.append(f'ai_interviewer_span_seconds{{{label},quantile="0.95"}} {stats["p95_ms"] / 1000.0:.6f}')
+            lines.append(f'ai_interviewer_span_seconds_sum{{{label}}} {stats["total_s"]:.6f}')
+            lines.append(f'ai_interviewer_span_seconds_count{{{label}}} {stats["count"]}')
+        lines.append("# TYPE ai_interviewer_span_errors_total counter")
+        for name, stats in sorted(data["spans"].items()):
+            lines.append(f'ai_interviewer_span_errors_total{{span="{name}"}} {stats["errors"]}')
+    for name, value in sorted(data["gauges"].items()):
+        metric = _metric_name(name)
+        lines.append(f"# TYPE {metric} gauge")
+        lines.append(f"{metric} {float(value):.6f}")
+    return "\n".join(lines) + "\n"
+
+
+def otel_json():
+    """Finished spans in the OTLP/JSON layout (resourceSpans -> scopeSpans -> spans)."""
+    with _lock:
+        spans = list(_spans)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [_attribute("service.name", SERVICE_NAME)]},
+            "scopeSpans": [{"scope": {"name": SERVICE_NAME}, "spans": spans}],
+        }]
+    }
+
+
+def export_otel_json(path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(otel_json(), f)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = prometheus_text().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_metrics_server(port, host="127.0.0.1"):
+    """Serves /metrics for Prometheus on a daemon thread. Returns the server."""
+    global _server
+    if _server is None:
+        _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        _server.daemon_threads = True
+        threading.Thread(target=_server.serve_forever, name="MetricsServer", daemon=True).start()
+    return _server
+
+
+def configure_from_env():
+    """
+    METRICS_PORT=9464        serve Prometheus metrics on localhost
+    TRACE_FILE=traces.json   write OpenTelemetry JSON spans on exit
+    """
+    port = os.getenv("METRICS_PORT")
+    if port:
+        try:
+            start_metrics_server(int(port))
+            print(f"Metrics available at http://127.0.0.1:{port}/metrics")
+        except (OSError, ValueError) as e:
+            print(f"Metrics server not started: {e}")
+    trace_file = os.getenv("TRACE_FILE")
+    if trace_file:
+        atexit.register(export_otel_json, trace_file)
+
+
+def reset():
+    """Clears all collected data (used by tests and benchmarks)."""
+    with _lock:
+        _histograms.clear()
+        _counts.clear()
+        _gauges.clear()
+        _spans.clear()
@@ -0,0 +1,100 @@
+import tempfile
+import unittest
+from unittest import mock
+
+import answer_index
+from answer_index import AnswerIndex, MinHasher, shingles
+from interview_engine import InterviewEngine
+
+CHATBOT = ("A list in Python is a mutable, ordered sequence, which means you can add, remove or change "
+           "its elements after creation. A tuple is an immutable ordered sequence: once created it cannot "
+           "be modified, which makes it hashable and usable as a dictionary key. Tuples are also slightly "
+           "faster and use less memory than lists.")
+
+# The same answer with a couple of words changed
+EDITED = CHATBOT.replace("slightly faster", "a bit faster").replace("Python", "python,")
+
+OWN_WORDS = ("Lists can change, tuples can't. I use tuples for fixed records like coordinates and lists "
+             "when I need to append things in a loop.")
+
+
+class TestMinHash(unittest.TestCase):
+    def test_signature_estimates_jaccard(self):
+        hasher = MinHasher()
+        a, b = shingles(CHATBOT), shingles(EDITED)
+        exact = len(set(a.tolist()) & set(b.tolist())) / len(set(a.tolist()) | set(b.tolist()))
+        estimate = (hasher.signature(a) == hasher.signature(b)).mean()
+        self.assertAlmostEqual(estimate, exact, delta=0.15)
+        self.assertTrue((hasher.signature(shingles(CHATBOT.upper())) == hasher.signature(a)).all())
+        self.assertEqual(len(shingles("")), 0)
+        self.assertEqual(len(shingles("Mutable")), 1)
+
+
+class TestAnswerIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.index = AnswerIndex(self.tmp.name)
+
+    def test_near_duplicates_of_the_same_question_match(self):
+        first = self.index.add("py_e_1", CHATBOT, session_id="s1")
+        self.index.add("py_e_1", OWN_WORDS, session_id="s2")
+        self.index.add("py_e_2", EDITED, session_id="s3")
+        match = self.index.match("py_e_1", EDITED)
+        self.assertEqual(match["answer"], first)
+        self.assertGreaterEqual(match["jaccard"], answer_index.NEAR_DUPLICATE_JACCARD)
+        self.assertIsNone(self.index.match("py_e_1", "Tuples are immutable and hashable, lists are mutable."))
+        self.assertIsNone(self.index.match("py_e_3", CHATBOT))
+        self.assertIsNone(self.index.match("py_e_1", CHATBOT, exclude_session="s1"))
+
+    def test_short_answers_are_not_matched(self):
+        short = "Tuples are immutable, lists are not."
+        self.index.add("py_e_1", short, session_id="s1")
+        self.assertIsNone(self.index.match("py_e_1", short))
+        with mock.patch.object(answer_index, "MIN_SHINGLES", 1):
+            self.assertEqual(self.index.match("py_e_1", short)["jaccard"], 1.0)
+
+    def test_band_table_is_persisted_and_memory_mapped(self):
+        with mock.patch.object(answer_index, "COMPACT_AFTER", 3):
+            rows = [self.index.add("py_e_1", OWN_WORDS) for _ in range(3)]
+            pending = self.index.add("py_e_1", CHATBOT)
+        self.assertEqual(self.index.base_count, 3)
+        reopened = AnswerIndex(self.tmp.name)
+        self.assertEqual((reopened.count, reopened.base_count), (4, 3))
+        self.assertEqual(reopened.match("py_e_1", EDITED)["answer"], pending)
+        self.assertEqual(reopened.match("py_e_1", OWN_WORDS)["answer"], rows[-1])  # newest wins ties
+        reopened.close()
+        self.assertEqual(AnswerIndex(self.tmp.name).base_count, 4)
+
+    def test_torn_append_is_dropped_on_open(self):
+        self.index.add("py_e_1", CHATBOT)
+        # Crash after the signature was written but before its owner row
+        with open(f"{self.tmp.name}/signatures.u32", "ab") as f:
+            f.write(self.index.hasher.signature(shingles(OWN_WORDS)).tobytes())
+        reopened = AnswerIndex(self.tmp.name)
+        self.assertEqual(reopened.count, 1)
+        row = reopened.add("py_e_1", OWN_WORDS)
+        self.assertEqual(row, 1)
+        again = AnswerIndex(self.tmp.name)
+        self.assertEqual(again.match("py_e_1", OWN_WORDS)["answer"], row)
+        self.assertEqual(again.match("py_e_1", CHATBOT)["answer"], 0)
+
+
+class TestEngineDuplicates(unittest.TestCase):
+    def test_reused_answer_is_flagged_but_not_penalised(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        results = []
+        for answer in (CHATBOT, EDITED):
+            engine = InterviewEngine(answer_index_path=tmp.name)
+            engine.use_llm = False
+            engine.start_interview("Python")
+            engine.current_question = {"id": "py_e_1", "text": "Lists vs tuples?", "keywords": ["mutable"]}
+            results.append(engine.submit_answer(answer))
+        self.assertNotIn("near_duplicate", results[0])
+        self.assertGreaterEqual(results[1]["near_duplicate"]["jaccard"], answer_index.NEAR_DUPLICATE_JACCARD)
+        self.assertEqual(results[1]["score"], results[0]["score"])
+
+
+if __name__ == '__main__':
+    unittest.main()
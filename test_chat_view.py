@@ -0,0 +1,62 @@
+import os
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+
+import chat_view
+from chat_view import ChatModel, ChatView, message_html
+
+app = QApplication.instance() or QApplication([])
+
+
+class TestChatModel(unittest.TestCase):
+    def test_bounded(self):
+        model = ChatModel(max_messages=3)
+        for i in range(5):
+            model.append("ai", f"question {i}")
+        self.assertEqual(model.rowCount(), 3)
+        self.assertEqual(model.dropped, 2)
+        self.assertEqual(model.index(0).data(), "question 2")
+        with self.assertRaises(ValueError):
+            model.append("system", "x")
+
+    def test_load_history(self):
+        model = ChatModel()
+        model.load_history([{"role": "ai", "content": "Q1"},
+                            {"role": "user", "content": "A1", "score": 80, "feedback": "Good."},
+                            {"role": "ai", "content": "Q2"}])
+        self.assertEqual([m["kind"] for m in model.messages], ["ai", "user", "feedback", "ai"])
+        self.assertEqual(model.messages[2]["text"], "Score: 80. Good.")
+
+    def test_message_html(self):
+        self.assertEqual(message_html({"kind": "user", "text": "a < b"}), "<b>You:</b> a &lt; b")
+        code = "def f():\n" + "    x = 1\n" * (chat_view.CHAT_CODE_PREVIEW_LINES + 5)
+        rendered = message_html({"kind": "user", "text": code})
+        self.assertIn("<pre", rendered)
+        self.assertIn("6 more lines", rendered)
+
+
+class TestChatView(unittest.TestCase):
+    def test_layouts_are_cached(self):
+        view = ChatView()
+        view.resize(300, 200)
+        view.show()
+        for i in range(200):
+            view.append_message("user" if i % 2 else "ai", f"message {i}")
+        # Rows are measured in batches, one batch per event loop pass
+        app.processEvents()
+        self.assertLess(view.delegate.stats["layouts"], 200)
+        for _ in range(200 // chat_view.CHAT_LAYOUT_BATCH_SIZE + 1):
+            app.processEvents()
+        layouts = view.delegate.stats["layouts"]
+        view.viewport().repaint()
+        app.processEvents()
+        self.assertEqual(view.delegate.stats["layouts"], layouts)
+        self.assertLessEqual(len(view.delegate._documents), chat_view.CHAT_LAYOUT_CACHE_SIZE)
+        view.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+import unittest
+from unittest import mock
+
+import code_analyzer
+from code_analyzer import IncrementalAnalyzer, canonical_form, canonical_hash
+
+CODE = """import os
+
+def solve(values):
+    total = 0
+    for v in values:
+        for w in values:
+            total += v * w
+    return total + helper(values)
+
+def helper(values):
+    return len(values)
+
+class Cache:
+    size = 3
+
+    def get(self, key):
+        return [k for k in range(size)] + [key]
+"""
+
+
+def messages(result):
+    return [(d["line"], d["message"]) for d in result["diagnostics"]]
+
+
+class TestIncrementalAnalyzer(unittest.TestCase):
+    def setUp(self):
+        self.analyzer = IncrementalAnalyzer()
+
+    def test_full_analysis(self):
+        result = self.analyzer.update(CODE)
+        self.assertTrue(result["valid"])
+        self.assertEqual(result["reparsed"], "full")
+        self.assertIn((6, "Nested loops (depth 2) in 'solve': roughly O(n^2)."), messages(result))
+        # Class attributes are not visible inside methods
+        self.assertIn((17, "Undefined name 'size'."), messages(result))
+        self.assertFalse([m for line, m in messages(result) if "helper" in m or "'os'" in m])
+
+    def test_edit_inside_function_reparses_only_that_block(self):
+        self.analyzer.update(CODE)
+        edited = CODE.replace("    total = 0\n", "    total = 0\n    count = missing\n")
+        with mock.patch.object(code_analyzer, "_Block", wraps=code_analyzer._Block) as block:
+            result = self.analyzer.update(edited)
+        self.assertEqual(result["reparsed"], "block")
+        self.assertEqual(block.call_count, 1)
+        # Later blocks are shifted by the inserted line
+        self.assertIn((5, "Undefined name 'missing'."), messages(result))
+        self.assertIn((18, "Undefined name 'size'."), messages(result))
+        self.assertEqual(messages(result), messages(IncrementalAnalyzer().update(edited)))
+
+    def test_syntax_error_inside_function_keeps_other_results(self):
+        self.analyzer.update(CODE)
+        broken = CODE.replace("return len(values)", "return len(values")
+        result = self.analyzer.update(broken)
+        self.assertFalse(result["valid"])
+        self.assertEqual(result["reparsed"], "block")
+        self.assertIn(11, [line for line, m in messages(result) if m.startswith("SyntaxError")])
+        # 'helper' is still known, and the rest of the module is still analysed
+        self.assertNotIn("helper", str(messages(result)))
+        self.assertIn((17, "Undefined name 'size'."), messages(result))
+
+        # Fixing it goes back to a block re-parse against the last good state
+        self.assertEqual(self.analyzer.update(CODE)["reparsed"], "block")
+
+    def test_block_error_the_module_does_not_have_is_not_reported(self):
+        self.analyzer.update(CODE)
+        # Without its header the class body is indented under 'helper', which is valid
+        edited = CODE.replace("class Cache:\n", "")
+        result = self.analyzer.update(edited)
+        self.assertTrue(result["valid"])
+        self.assertEqual(result["reparsed"], "full")
+        self.assertEqual(messages(result), messages(IncrementalAnalyzer().update(edited)))
+
+    def test_new_top_level_statement_triggers_full_parse(self):
+        self.analyzer.update(CODE)
+        result = self.analyzer.update(CODE.replace("def helper", "x = 1\n\ndef helper"))
+        self.assertEqual(result["reparsed"], "full")
+        self.assertEqual(self.analyzer.update(CODE + "print(undefined)\n")["reparsed"], "full")
+
+    def test_unchanged_code_is_not_reanalysed(self):
+        self.analyzer.update(CODE)
+        self.assertEqual(self.analyzer.update(CODE)["reparsed"], "none")
+
+    def test_complexity_warning(self):
+        branches = "".join(f"    if x == {i}:\n        return {i}\n" for i in range(12))
+        result = self.analyzer.update(f"def pick(x):\n{branches}")
+        self.assertIn((1, "'pick' has cyclomatic complexity 13; consider splitting it."), messages(result))
+
+
+class TestCanonicalForm(unittest.TestCase):
+    def test_equivalent_solutions_share_a_hash(self):
+        original = "def find_missing(arr, n):\n    return n * (n + 1) // 2 - sum(arr)\n"
+        variants = [
+            # renamed, annotated, documented and commented
+            'def find_missing(nums: list, m: int) -> int:\n    """Gauss."""\n    return m * (m + 1) // 2 - sum(nums)  # sum\n',
+            # constant arithmetic and commutative operand order
+            "def find_missing(a, k):\n    return k * (1 + k) // (4 - 2) - sum(a)\n",
+        ]
+        for variant in variants:
+            self.assertEqual(canonical_hash(variant), canonical_hash(original), variant)
+
+    def test_comparisons_and_helper_order(self):
+        first = ("def twice(x):\n    return x * 2\n\n"
+                 "def is_small(v):\n    if 10 > v:\n        return True\n    return twice(v) == 0\n")
+        second = ("def is_small(value):\n    if value < 10:\n        return True\n    return 0 == twice(value)\n\n"
+                  "def twice(y):\n    return 2 * y\n")
+        self.assertEqual(canonical_form(first), canonical_form(second))
+
+    def test_behaviour_changes_are_kept(self):
+        base = "def f(s):\n    return s + 'a'\n"
+        self.assertNotEqual(canonical_hash(base), canonical_hash("def f(s):\n    return 'a' + s\n"))
+        self.assertNotEqual(canonical_hash(base), canonical_hash("def g(s):\n    return s + 'a'\n"))
+        self.assertNotEqual(canonical_hash(base), canonical_hash("def f(s):\n    return s + 'b'\n"))
+        # Class attributes and nested-scope names keep their meaning
+        cls = "class C:\n    size = 1\n    def get(self):\n        return self.size\n"
+        self.assertIn("'size'", canonical_form(cls))
+
+    def test_unsafe_code_has_no_form(self):
+        self.assertIsNone(canonical_hash("def f(x):\n    return eval('x')\n"))
+        self.assertIsNone(canonical_hash("def f(:\n"))
+
+    def test_keyword_calls_to_own_functions_have_no_form(self):
+        # Renaming `arr` would make this equal to a version whose helper takes `xs` and fails
+        working = "def helper(arr):\n    return sum(arr)\n\ndef f(nums):\n    return helper(arr=nums)\n"
+        broken = "def helper(xs):\n    return sum(xs)\n\ndef f(nums):\n    return helper(arr=nums)\n"
+        self.assertIsNone(canonical_form(working))
+        self.assertIsNone(canonical_form(broken))
+        self.assertIsNone(canonical_form("def f(**options):\n    return g(**options)\n\ndef g(x=1):\n    return x\n"))
+        self.assertIsNone(canonical_form("import functools\n\ndef g(x):\n    return x\n\nf = functools.partial(g, x=1)\n"))
+        # Keywords to library functions are fine
+        self.assertIsNotNone(canonical_form("def f(values):\n    return sorted(values, reverse=True)\n"))
+
+
+if __name__ == '__main__':
+    unittest.main()
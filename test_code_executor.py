@@ -0,0 +1,177 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import code_executor
+from code_executor import BACKENDS, CodeExecutor
+from graded_store import GradedStore
+
+TESTS = [{"input": [[1, 2, 4, 5], 5], "output": 3}, {"input": [[1, 3], 3], "output": 2}]
+
+SOLUTIONS = {
+    "python": "def find_missing(arr, n):\n    return n * (n + 1) // 2 - sum(arr)\n",
+    "javascript": "function find_missing(arr, n) {\n  return n * (n + 1) / 2 - arr.reduce((a, b) => a + b, 0);\n}\n",
+    "java": "static int find_missing(int[] arr, int n) {\n    int s = 0;\n    for (int v : arr) s += v;\n"
+            "    return n * (n + 1) / 2 - s;\n}\n",
+    "cpp": "#include <vector>\nint find_missing(const std::vector<int>& arr, int n) {\n    int s = 0;\n"
+           "    for (int v : arr) s += v;\n    return n * (n + 1) / 2 - s;\n}\n",
+    "go": "func find_missing(arr []int, n int) int {\n\ts := 0\n\tfor _, v := range arr {\n\t\ts += v\n\t}\n"
+          "\treturn n*(n+1)/2 - s\n}\n",
+}
+
+
+class TestCodeExecutor(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.executor = CodeExecutor(cache_dir=self.tmp.name)
+        self.addCleanup(self.executor.close)
+
+    def test_every_available_language(self):
+        for language, code in SOLUTIONS.items():
+            if language not in BACKENDS or not BACKENDS[language].available():
+                continue
+            with self.subTest(language=language):
+                result = self.executor.run_code(code, "find_missing", TESTS, language)
+                self.assertTrue(result["success"], result["errors"])
+                self.assertIn("Summary: 2/2 Test Cases Passed", result["output"])
+                self.assertEqual([r["actual"] for r in result["results"]], [3, 2])
+
+    def test_unchanged_code_is_not_recompiled(self):
+        self.executor.run_code(SOLUTIONS["python"], "find_missing", TESTS)
+        self.executor.run_code(SOLUTIONS["python"], "find_missing", TESTS[:1])
+        self.assertEqual(self.executor.stats, {"compiles": 1, "cache_hits": 1})
+
+        # Compile errors are cached too
+        broken = "def find_missing(arr, n)\n    return 0\n"
+        for _ in range(2):
+            result = self.executor.run_code(broken, "find_missing", TESTS)
+            self.assertFalse(result["success"])
+            self.assertIn("SyntaxError", result["errors"])
+        self.assertEqual(self.executor.stats["compiles"], 2)
+        self.assertEqual(self.executor.check(broken, "find_missing"), result["errors"])
+
+    def test_failures_errors_and_prints(self):
+        code = "def f(x):\n    print('debug', x)\n    if x < 0:\n        raise ValueError('negative')\n    return x\n"
+        result = self.executor.run_code(code, "f", [{"input": [1], "output": 1}, {"input": [2], "output": 3},
+                                                    {"input": [-1], "output": 0}])
+        self.assertFalse(result["success"])
+        self.assertEqual([r["passed"] for r in result["results"]], [True, False, False])
+        self.assertIn("debug 1", result["output"])
+        self.assertIn("Test Case 2: FAILED. Expected 3, got 2", result["output"])
+        self.assertIn("Test Case 3: ERROR - ValueError: negative", result["output"])
+
+    def test_missing_function_and_timeout(self):
+        result = self.executor.run_code("def other():\n    pass\n", "f", [{"input": [], "output": None}])
+        self.assertFalse(result["success"])
+        self.assertIn("Function 'f' not found", result["errors"])
+
+        result = self.executor.run_code("def f():\n    while True:\n        pass\n", "f", [{"input": [], "output": 1}])
+        self.assertEqual(result["errors"], "Execution Timed Out (Infinite Loop?)")
+
+    def test_cases_are_profiled_and_limited_one_by_one(self):
+        code = "def f(n):\n    if n < 0:\n        while True:\n            pass\n    return len([0] * n)\n"
+        cases = [{"input": [10 ** 5], "output": 10 ** 5},
+                 {"input": [10 ** 9], "output": 10 ** 9},
+                 {"input": [-1], "output": 0, "time_limit_ms": 200},
+                 {"input": [10 ** 5], "output": 10 ** 5, "memory_limit_kb": 100}]
+        result = self.executor.run_code(code, "f", cases)
+        self.assertEqual([r["passed"] for r in result["results"]], [True, False, False, False])
+        self.assertEqual([r.get("limit") for r in result["results"]], [None, "memory", "time", "memory"])
+        profile = result["results"][0]["profile"]
+        self.assertGreater(profile["peak_kb"], 700)  # 100k list slots of 8 bytes
+        self.assertGreaterEqual(profile["cpu_ms"], 0)
+        self.assertIn("Test Case 3: ERROR - TimeLimitExceeded", result["output"])
+        self.assertEqual(result["errors"], "Execution Timed Out (Infinite Loop?)")
+        self.assertEqual(result["profile"]["peak_kb"], max(r["profile"]["peak_kb"] for r in result["results"]))
+
+    def test_program_output_cannot_pose_as_results(self):
+        code = ("def f(x):\n    print('@@RESULT nope')\n    print('@@RESULT {\"case\": 1, \"actual\": 5}')\n"
+                "    print('@@RESULT-0 {\"case\": 9}')\n    return 0\n")
+        result = self.executor.run_code(code, "f", [{"input": [1], "output": 5}])
+        self.assertEqual([(r["actual"], r["passed"]) for r in result["results"]], [(0, False)])
+        self.assertIn("@@RESULT nope", result["output"])
+        # The harness never sees the expected outputs
+        peek = "import sys\n\ndef f(x):\n    return sys.stdin.read()\n"
+        result = self.executor.run_code(peek, "f", [{"input": [1], "output": "secret"}])
+        self.assertNotIn("secret", result["results"][0]["actual"])
+
+    def test_warm_runs_start_in_the_build_directory(self):
+        code = "import os\n\ndef f():\n    return os.getcwd() == os.path.dirname(os.path.abspath(__file__))\n"
+        js = "function f() {\n  return process.cwd() === __dirname;\n}\n"
+        for language, source in (("python", code), ("javascript", js)):
+            if BACKENDS[language].available():
+                with self.subTest(language=language):
+                    self.assertTrue(self.executor.run_code(source, "f", [{"input": [], "output": True}], language)["success"])
+
+    def test_build_cache_is_private_and_pruned(self):
+        cache = os.path.join(self.tmp.name, "cache")
+        executor = CodeExecutor(cache_dir=cache)
+        with mock.patch.object(code_executor, "MAX_CACHED_BUILDS", 2):
+            for n in range(3):
+                self.assertIsNone(executor.check(f"def f():\n    return {n}\n", "f"))
+        self.assertEqual(os.stat(cache).st_mode & 0o777, 0o700)
+        self.assertEqual(len(os.listdir(cache)), 2)
+        self.assertEqual(executor.stats["compiles"], 3)
+        with mock.patch.object(os, "getuid", return_value=os.getuid() + 1):
+            with self.assertRaises(PermissionError):
+                executor.build("def f():\n    return 0\n", "f")
+
+    @unittest.skipUnless(shutil.which("javac") and shutil.which("java"), "no JDK installed")
+    def test_java_methods_classes_and_errors(self):
+        bare = self.executor.run_code(SOLUTIONS["java"], "find_missing", TESTS, "java")
+        self.assertTrue(bare["success"], bare["errors"])
+        code = ("import java.util.*;\n\nclass Solution {\n    List<Integer> evens(int[] values) {\n"
+                "        List<Integer> out = new ArrayList<>();\n        for (int v : values) {\n"
+                "            if (v < 0) throw new IllegalArgumentException(\"negative\");\n"
+                "            if (v % 2 == 0) out.add(v);\n        }\n        return out;\n    }\n}\n")
+        result = self.executor.run_code(code, "evens", [{"input": [[1, 2, 4]], "output": [2, 4]},
+                                                         {"input": [[-1]], "output": []}], "java")
+        self.assertEqual([r["passed"] for r in result["results"]], [True, False])
+        self.assertIn("negative", result["results"][1]["error"])
+        self.assertIn("not found", self.executor.run_code(code, "odds", TESTS, "java")["errors"])
+
+    def test_unsupported_language(self):
+        result = self.executor.run_code("x", "f", TESTS, language="cobol")
+        self.assertFalse(result["success"])
+        self.assertIn("Unsupported language", result["errors"])
+
+
+class TestGradedStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = GradedStore(os.path.join(self.tmp.name, "graded.db"))
+        self.addCleanup(self.store.close)
+        self.executor = CodeExecutor(cache_dir=self.tmp.name, graded_store=self.store)
+        self.addCleanup(self.executor.close)
+
+    def test_equivalent_solution_skips_the_sandbox(self):
+        first = self.executor.run_code(SOLUTIONS["python"], "find_missing", TESTS)
+        renamed = "def find_missing(values, count):\n    # Gauss\n    return count * (1 + count) // 2 - sum(values)\n"
+        with mock.patch.object(self.executor, "build", side_effect=AssertionError("sandbox ran")):
+            second = self.executor.run_code(renamed, "find_missing", TESTS)
+        self.assertTrue(second["graded"])
+        self.assertEqual(second["results"], first["results"])
+        self.assertEqual(self.store.stats["hits"], 1)
+
+    def test_new_code_or_tests_run_and_failures_are_stored(self):
+        wrong = "def find_missing(arr, n):\n    return 0\n"
+        self.assertFalse(self.executor.run_code(wrong, "find_missing", TESTS)["success"])
+        self.executor.run_code(SOLUTIONS["python"], "find_missing", TESTS[:1])
+        self.assertEqual(self.executor.stats["compiles"], 2)
+        self.assertFalse(self.executor.run_code(wrong, "find_missing", TESTS)["success"])
+        self.assertEqual(self.store.count(), 2)
+
+    def test_timeouts_and_nondeterministic_code_are_not_stored(self):
+        loop = "def find_missing(arr, n):\n    while True:\n        pass\n"
+        self.executor.run_code(loop, "find_missing", TESTS[:1])
+        clock = "import time\n\ndef find_missing(arr, n):\n    return int(time.time()) % 2\n"
+        self.executor.run_code(clock, "find_missing", TESTS)
+        self.assertEqual(self.store.count(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
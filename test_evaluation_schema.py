@@ -0,0 +1,86 @@
+import os
+import unittest
+from unittest import mock
+
+import llm_interface
+from evaluation_schema import (SchemaError, compile_schema, loads_lenient, provider_schema,
+                               rubric_score, validate_evaluation, EVALUATION_SCHEMA)
+from fake_provider import FakeProvider
+from llm_interface import LLMInterface
+from llm_scheduler import RequestScheduler
+
+VALID = '{"correctness": 80, "depth": 60, "trade_offs": 40, "confidence": 90, "feedback": "Missed locking."}'
+
+
+class TestEvaluationSchema(unittest.TestCase):
+    def test_valid_document(self):
+        evaluation = loads_lenient(VALID)
+        validate_evaluation(evaluation)
+        self.assertEqual(rubric_score(evaluation), 66)
+
+    def test_repairs_fences_and_trailing_commas(self):
+        text = 'Here you go:\n```json\n{"correctness": 80, "depth": 60, "trade_offs": 40, ' \
+               '"confidence": 90, "feedback": "ok",}\n```'
+        validate_evaluation(loads_lenient(text))
+
+    def test_rejects_out_of_range_and_missing(self):
+        with self.assertRaises(SchemaError):
+            validate_evaluation({"correctness": 120, "depth": 1, "trade_offs": 1, "confidence": 1, "feedback": ""})
+        with self.assertRaises(SchemaError):
+            validate_evaluation({"correctness": 50})
+        with self.assertRaises(ValueError):
+            loads_lenient("Score: 50")
+
+    def test_compile_array_and_boolean(self):
+        validate = compile_schema({"type": "array", "items": {"type": "boolean"}})
+        validate([True, False])
+        with self.assertRaises(SchemaError):
+            validate([1])
+
+    def test_provider_schema(self):
+        gemini = provider_schema(EVALUATION_SCHEMA, "gemini")
+        self.assertNotIn("additionalProperties", gemini)
+        self.assertNotIn("minimum", gemini["properties"]["depth"])
+        self.assertFalse(provider_schema(EVALUATION_SCHEMA, "openai")["additionalProperties"])
+
+
+class TestStructuredEvaluation(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeProvider().start()
+        self.addCleanup(self.server.stop)
+        patches = [
+            mock.patch.dict(os.environ, {"LLM_PROVIDER": "openai", "OPENAI_API_KEY": "test-key",
+                                         "OPENAI_BASE_URL": self.server.url, "GEMINI_API_KEY": ""}),
+            mock.patch.object(llm_interface, "scheduler", RequestScheduler(rate=50, burst=50)),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.llm = LLMInterface()
+
+    def test_requests_json_schema_and_returns_rubric(self):
+        self.server.responses = [VALID]
+        result = self.llm.evaluate_answer("Explain the GIL.", "It is a lock.")
+        self.assertEqual(result["score"], 66)
+        self.assertEqual(result["rubric"], {"correctness": 80, "depth": 60, "trade_offs": 40})
+        body = self.server.requests[0]
+        self.assertEqual(body["response_format"]["type"], "json_schema")
+        self.assertEqual(body["temperature"], 0)
+
+    def test_retries_invalid_output_then_gives_up(self):
+        self.server.responses = ["Score: 50", VALID]
+        self.assertEqual(self.llm.evaluate_answer("Q", "A")["score"], 66)
+        self.assertEqual(len(self.server.requests), 2)
+
+        self.server.responses = ["not json"]
+        self.assertIsNone(self.llm.evaluate_answer("Q", "A"))
+        self.assertEqual(len(self.server.requests), 2 + llm_interface.MAX_EVALUATION_ATTEMPTS)
+
+    def test_batch(self):
+        self.server.responses = [VALID]
+        results = self.llm.evaluate_answers([("Q1", "A1"), ("Q2", "A2")])
+        self.assertEqual([r["score"] for r in results], [66, 66])
+
+
+if __name__ == '__main__':
+    unittest.main()
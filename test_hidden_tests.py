@@ -0,0 +1,127 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import hidden_tests
+from code_executor import CodeExecutor
+from hidden_tests import SPECS, HiddenTestRunner
+from interview_engine import InterviewEngine
+from question_generator import QuestionGenerator
+
+QUESTIONS = {q["id"]: q for domain in QuestionGenerator().questions.values()
+             for questions in domain.values() for q in questions}
+
+LRU = """from collections import OrderedDict
+
+class LRUCache:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.items = OrderedDict()
+
+    def get(self, key):
+        if key not in self.items:
+            return -1
+        self.items.move_to_end(key)
+        return self.items[key]
+
+    def put(self, key, value):
+        self.items[key] = value
+        self.items.move_to_end(key)
+        if len(self.items) > self.capacity:
+            self.items.popitem(last=False)
+"""
+
+# Evicts in insertion order: reads do not refresh a key
+FIFO = """class LRUCache:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.items = {}
+
+    def get(self, key):
+        return self.items.get(key, -1)
+
+    def put(self, key, value):
+        self.items[key] = value
+        if len(self.items) > self.capacity:
+            del self.items[next(iter(self.items))]
+"""
+
+REVERSE = """def reverse_list(head):
+    previous = None
+    while head:
+        head.next, previous, head = previous, head, head.next
+    return previous
+"""
+
+# Correct, though it does not copy the wrapped function's name (the question does not ask for it)
+TIME_LOGGER = """import time
+
+def time_logger(func):
+    def wrapper(*args, **kwargs):
+        start = time.time()
+        result = func(*args, **kwargs)
+        print(f"took {time.time() - start:.6f}s")
+        return result
+    return wrapper
+"""
+
+# Off by one: the loop skips n
+FACTORIAL = "def factorial(n):\n    result = 1\n    for i in range(2, n):\n        result *= i\n    return result\n"
+
+
+class TestHiddenTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.executor = CodeExecutor(cache_dir=os.path.join(self.tmp.name, "build"))
+        self.addCleanup(self.executor.close)
+        self.runner = HiddenTestRunner(self.executor, os.path.join(self.tmp.name, "corpora"))
+        self.addCleanup(self.runner.close)
+
+    def test_correct_solutions_pass_every_generated_case(self):
+        for question_id, code in (("dsa_h_1", LRU), ("dsa_m_1", REVERSE), ("py_h_4", TIME_LOGGER)):
+            with self.subTest(question=question_id):
+                outcome = self.runner.check(QUESTIONS[question_id], code)
+                self.assertEqual(outcome["passed"], outcome["cases"])
+                self.assertEqual(outcome["cases"], hidden_tests.FUZZ_CASES)
+                self.assertIsNone(outcome["counterexample"])
+
+    def test_counterexample_is_shrunk(self):
+        outcome = self.runner.check(QUESTIONS["py_h_3"], FACTORIAL)
+        self.assertEqual(outcome["counterexample"], {"input": [2], "expected": 2, "actual": 1, "error": None})
+
+        outcome = self.runner.check(QUESTIONS["dsa_h_1"], FIFO)
+        self.assertLess(outcome["passed"], outcome["cases"])
+        capacity, operations = outcome["counterexample"]["input"]
+        self.assertLessEqual(len(operations), 6)
+        self.assertEqual(hidden_tests._lru_reference(capacity, operations), outcome["counterexample"]["expected"])
+
+    def test_corpus_is_cached_per_question(self):
+        corpus = self.runner.corpus("dsa_m_2")
+        self.assertTrue(all(SPECS["dsa_m_2"].valid(case["input"]) for case in corpus))
+        fresh = HiddenTestRunner(self.executor, os.path.join(self.tmp.name, "corpora"))
+        self.addCleanup(fresh.close)
+        with mock.patch.object(fresh, "_generate", side_effect=AssertionError("regenerated")):
+            self.assertEqual(fresh.corpus("dsa_m_2"), corpus)
+
+    def test_questions_without_spec_or_language_are_skipped(self):
+        self.assertIsNone(self.runner.check(QUESTIONS["oop_h_1"], "class ParkingLot: pass"))
+        self.assertIsNone(self.runner.spec_for(QUESTIONS["dsa_h_1"], "javascript"))
+        self.assertIsNotNone(self.runner.spec_for(QUESTIONS["dsa_m_2"], "javascript"))
+
+
+class TestEngineHiddenTests(unittest.TestCase):
+    def test_question_without_test_cases_is_scored_by_hidden_tests(self):
+        engine = InterviewEngine()
+        engine.start_interview("DSA")
+        engine.state = "ask_coding_question"
+        engine.current_question = QUESTIONS["dsa_h_1"]
+        result = engine.submit_answer(FIFO)
+        self.assertLess(result["score"], 100)
+        self.assertIn("hidden tests", result["feedback"])
+        self.assertIsNotNone(result["hidden_tests"]["counterexample"])
+
+
+if __name__ == '__main__':
+    unittest.main()
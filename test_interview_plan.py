@@ -0,0 +1,77 @@
+import json
+import os
+import unittest
+from unittest import mock
+
+import llm_interface
+from fake_provider import FakeProvider
+from interview_engine import InterviewEngine
+from irt_model import AbilityEstimator
+from llm_scheduler import RequestScheduler
+
+PLAN = {"questions": [
+    {"topic": f"topic {i}", "question": f"Primary {i}?", "easier": f"Easier {i}?", "harder": f"Harder {i}?"}
+    for i in range(4)
+]}
+EVALUATION = '{"correctness": 95, "depth": 95, "trade_offs": 95, "confidence": 90, "feedback": "Great."}'
+
+
+def respond(messages):
+    if "strict" in messages[0]["content"]:
+        return EVALUATION
+    if "whole interview up front" in messages[-1]["content"]:
+        return json.dumps(PLAN)
+    return "Generated on the fly?"
+
+
+class TestInterviewPlan(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeProvider(responses=respond).start()
+        self.addCleanup(self.server.stop)
+        env = {"LLM_PROVIDER": "openai", "OPENAI_API_KEY": "test-key", "OPENAI_BASE_URL": self.server.url,
+               "GEMINI_API_KEY": "", "LLM_LOCAL_BASE_URL": ""}
+        patches = [
+            mock.patch.dict(os.environ, env),
+            mock.patch.object(llm_interface, "scheduler", RequestScheduler(rate=100, burst=100, max_attempts=1)),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.engine = InterviewEngine()
+
+    def question_calls(self):
+        return [r for r in self.server.requests if "Generate the next interview question" in r["messages"][-1]["content"]]
+
+    def test_plan_is_walked_without_question_calls(self):
+        question = self.engine.start_interview("Python")
+        self.assertEqual(question["text"], "Primary 0?")
+        self.assertEqual(len(self.engine.plan), 4)
+
+        texts = [question["text"]]
+        while question and len(texts) < 5:
+            self.engine.submit_answer("A thorough answer about internals and trade-offs.", wpm=120)
+            question = self.engine.get_next_question()
+            if question:
+                texts.append(question["text"])
+        self.assertEqual(self.question_calls(), [])
+        # Strong answers move to the harder variants of later slots
+        self.assertIn("Harder 1?", texts)
+
+    def test_llm_is_asked_when_candidate_leaves_the_plan(self):
+        self.engine.start_interview("Python")
+        self.engine.ability = AbilityEstimator.from_responses([[1.0, 2.5, 1.0]] * 8)
+        self.engine.submit_answer("Answer", wpm=120)
+        question = self.engine.get_next_question()
+        self.assertEqual(question["text"], "Generated on the fly?")
+        self.assertEqual(len(self.question_calls()), 1)
+        self.assertEqual(self.engine.plan_position, 2)
+
+    def test_invalid_plan_falls_back_to_per_question_calls(self):
+        self.server.responses = lambda messages: "not json" if "up front" in messages[-1]["content"] else respond(messages)
+        question = self.engine.start_interview("Python")
+        self.assertEqual(self.engine.plan, [])
+        self.assertEqual(question["text"], "Generated on the fly?")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import irt_model
+from irt_model import AbilityEstimator, ItemParameters, fit_2pl, most_informative
+from interview_engine import InterviewEngine
+
+
+class TestFit(unittest.TestCase):
+    def test_recovers_item_parameters(self):
+        rng = np.random.default_rng(0)
+        a = rng.uniform(0.6, 2.0, 15)
+        b = rng.uniform(-1.5, 1.5, 15)
+        theta = rng.normal(size=1500)
+        scores = (rng.random((1500, 15)) < irt_model.probability(theta[:, None], a, b)).astype(float)
+        scores[rng.random(scores.shape) < 0.6] = np.nan  # each candidate sees a few items
+        a_hat, b_hat = fit_2pl(scores)
+        self.assertGreater(np.corrcoef(b, b_hat)[0, 1], 0.95)
+        self.assertGreater(np.corrcoef(a, a_hat)[0, 1], 0.7)
+
+    def test_fit_from_log(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            log = os.path.join(tmp, "responses.jsonl")
+            for session in range(40):
+                irt_model.log_response(log, session, {"id": "easy_q", "difficulty": "easy"}, 90)
+                irt_model.log_response(log, session, {"id": "hard_q", "difficulty": "hard"},
+                                       50 if session % 2 else 10)
+                irt_model.log_response(log, session, {"text": "LLM question"}, 70)  # not logged
+            params = irt_model.fit_from_log(log)
+            self.assertEqual(sorted(params.items), ["easy_q", "hard_q"])
+            self.assertEqual(params.items["hard_q"]["n"], 40)
+            self.assertLess(params.items["easy_q"]["b"], params.items["hard_q"]["b"])
+
+            path = os.path.join(tmp, "params.json")
+            params.save(path)
+            loaded = ItemParameters.load(path)
+            self.assertEqual(loaded.get({"id": "easy_q"}), (params.items["easy_q"]["a"], params.items["easy_q"]["b"]))
+            self.assertEqual(loaded.get({"id": "new", "difficulty": "hard"}), (1.0, 1.0))
+
+
+class TestAbility(unittest.TestCase):
+    def test_online_update(self):
+        strong, weak = AbilityEstimator(), AbilityEstimator()
+        for _ in range(3):
+            strong.update(1.0, 1.0, 0.95)
+            weak.update(1.0, -1.0, 0.15)
+        self.assertGreater(strong.theta, irt_model.PASS_THETA)
+        self.assertTrue(strong.is_confident())
+        self.assertLess(weak.theta, 0)
+        self.assertTrue(weak.is_confident())
+        self.assertLess(strong.se, AbilityEstimator().se)
+        self.assertEqual(AbilityEstimator.from_responses([[1.0, 1.0, 0.95]] * 3).theta, strong.theta)
+
+    def test_verdict_estimate_is_not_shrunk_by_the_prior(self):
+        for score, answers in ((0.72, 5), (0.75, 3)):
+            estimator = AbilityEstimator.from_responses([[1.0, 0.0, score]] * answers)
+            self.assertLess(estimator.theta, irt_model.PASS_THETA)
+            self.assertGreater(estimator.mle, irt_model.PASS_THETA)
+        self.assertLess(AbilityEstimator.from_responses([[1.0, 0.0, 0.65]] * 5).mle, irt_model.PASS_THETA)
+        self.assertEqual(AbilityEstimator.from_responses([[1.0, 1.0, 1.0]] * 3).mle, irt_model.THETA_RANGE[1])
+        self.assertEqual(AbilityEstimator().mle, 0.0)
+
+    def test_most_informative(self):
+        questions = [{"id": q, "difficulty": q} for q in ("easy", "medium", "hard")]
+        params = ItemParameters()
+        self.assertEqual(most_informative(questions, params, 1.2, top_k=1)["id"], "hard")
+        self.assertEqual(most_informative(questions, params, -2.0, top_k=1)["id"], "easy")
+
+
+class TestAdaptiveEngine(unittest.TestCase):
+    def setUp(self):
+        self.engine = InterviewEngine()
+        self.engine.use_llm = False
+        self.engine.llm._setup_client = lambda: None
+        self.engine.llm.is_configured = lambda: False
+
+    def run_interview(self, score):
+        with mock.patch.object(self.engine.evaluator, "evaluate_answer", return_value=(score, "")), \
+                mock.patch.object(self.engine, "analyze_sentiment", return_value=0.0), \
+                mock.patch.object(irt_model, "random", random.Random(0)):
+            question = self.engine.start_interview("OS")
+            asked = []
+            while question:
+                asked.append(question["id"])
+                self.engine.submit_answer("answer")
+                question = self.engine.get_next_question()
+        return asked
+
+    def test_strong_candidate_stops_early(self):
+        asked = self.run_interview(100)
+        self.assertLess(len(asked), self.engine.max_questions)
+        self.assertEqual(len(set(asked)), len(asked))
+        self.assertEqual(self.engine.difficulty, "hard")
+        self.assertEqual(self.engine.get_summary()["verdict"], "Passed")
+
+    def test_constant_score_above_the_bar_passes(self):
+        self.run_interview(72)
+        self.assertEqual(self.engine.get_summary()["verdict"], "Passed")
+
+    def test_weak_candidate_gets_easier_questions(self):
+        asked = self.run_interview(5)
+        self.assertEqual(self.engine.difficulty, "easy")
+        self.assertTrue(asked[1].startswith("os_e"))
+        self.assertLess(len(asked), self.engine.max_questions)
+        self.assertEqual(self.engine.get_summary()["verdict"], "Needs Improvement")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import time
+import unittest
+from unittest import mock
+
+import llm_interface
+import llm_router
+from fake_provider import FakeProvider
+from llm_interface import LLMInterface
+from llm_router import Backend, LLMRouter, backends_from_env
+from llm_scheduler import RequestScheduler
+
+
+class TestLLMRouter(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeProvider(responses=['{"correctness": 70, "depth": 60, "trade_offs": 50, '
+                                              '"confidence": 90, "feedback": "Fine."}']).start()
+        self.addCleanup(self.server.stop)
+        env = {"LLM_PROVIDER": "openai", "OPENAI_API_KEY": "test-key", "OPENAI_BASE_URL": self.server.url,
+               "LLM_MODEL": "strong-model", "LLM_FAST_MODEL": "fast-model", "GEMINI_API_KEY": ""}
+        patches = [
+            mock.patch.dict(os.environ, env),
+            mock.patch.object(llm_interface, "scheduler", RequestScheduler(rate=50, burst=50, max_attempts=1)),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.llm = LLMInterface()
+
+    def test_backends_from_env(self):
+        names = [b.name for b in backends_from_env()]
+        self.assertEqual(names, ["openai-strong", "openai-fast"])
+        with mock.patch.dict(os.environ, {"LLM_LOCAL_BASE_URL": "http://localhost:11434/v1"}):
+            self.assertEqual(backends_from_env()[-1].provider, "local")
+
+    def test_policy_routes_by_call_type(self):
+        self.llm.generate_question("", "Python", "medium")
+        self.llm.evaluate_answer("What is a list?", "A mutable sequence.")
+        self.assertEqual([r["model"] for r in self.server.requests], ["fast-model", "strong-model"])
+        decisions = self.llm.routing_metrics()["decisions"]
+        self.assertEqual(decisions["generate_question/openai-fast"], 1)
+        self.assertEqual(decisions["evaluate_answer/openai-strong"], 1)
+
+    def test_failover_and_degraded_backend_is_skipped(self):
+        for _ in range(3):
+            self.server.inject_errors(503)
+            self.assertIsNotNone(self.llm.generate_question("", "Python", "medium"))
+        metrics = self.llm.routing_metrics()
+        self.assertEqual(metrics["failovers"]["generate_question"], 3)
+        self.assertFalse(metrics["backends"]["openai-fast"]["healthy"])
+
+        # The fast backend is in cooldown now, so questions go straight to the strong model
+        before = len(self.server.requests)
+        self.llm.generate_question("", "Python", "medium")
+        self.assertEqual([r["model"] for r in self.server.requests[before:]], ["strong-model"])
+
+    def test_latency_breaks_ties_within_a_tier(self):
+        slow = Backend("slow", "openai", "a", "k", "fast")
+        quick = Backend("quick", "openai", "b", "k", "fast")
+        slow.record(2.0, True)
+        quick.record(0.1, True)
+        router = LLMRouter([slow, quick], scheduler=None)
+        self.assertEqual(router.route("generate_question")[0].name, "quick")
+
+    def test_unmeasured_and_failing_backends_rank_last(self):
+        fast = Backend("openai-fast", "openai", "a", "k", "fast")
+        local = Backend("local", "local", "b", "k", "fast")
+        router = LLMRouter([fast, local], scheduler=None)
+        self.assertEqual([b.name for b in router.route("generate_question")], ["openai-fast", "local"])
+        fast.record(0.5, True)
+        self.assertEqual([b.name for b in router.route("generate_question")], ["openai-fast", "local"])
+        router.backends = [local, fast]
+        self.assertEqual([b.name for b in router.route("generate_question")], ["openai-fast", "local"])
+        # A failure demotes a backend even though it is still healthy and was faster
+        local.record(0.1, True)
+        local.record(5.0, False)
+        self.assertTrue(local.is_healthy())
+        self.assertEqual([b.name for b in router.route("generate_question")], ["openai-fast", "local"])
+
+    def test_backend_returns_to_service_after_cooldown(self):
+        backend = Backend("flaky", "openai", "a", "k", "fast")
+        for _ in range(llm_router.FAILURE_THRESHOLD):
+            backend.record(1.0, False)
+        self.assertFalse(backend.is_healthy())
+        later = time.monotonic() + llm_router.COOLDOWN_SECONDS + 1
+        with mock.patch.object(llm_router.time, "monotonic", return_value=later):
+            self.assertTrue(backend.is_healthy())
+            # One failed probe is enough to go back into cooldown
+            backend.record(1.0, False)
+            self.assertFalse(backend.is_healthy())
+        with mock.patch.object(llm_router.time, "monotonic", return_value=later + llm_router.COOLDOWN_SECONDS + 1):
+            self.assertTrue(backend.is_healthy())
+            backend.record(0.1, True)
+            backend.record(1.0, False)
+            self.assertTrue(backend.is_healthy())
+        self.assertEqual(backend.error_rate(), 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
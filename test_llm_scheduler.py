@@ -0,0 +1,105 @@
+import os
+import time
+import unittest
+from unittest import mock
+
+import llm_interface
+from fake_provider import FakeProvider
+from llm_interface import LLMInterface
+from llm_scheduler import RequestScheduler, TokenBucket, DeadlineExceeded, classify_error
+
+
+class TestScheduler(unittest.TestCase):
+    def test_token_bucket_limits_rate(self):
+        bucket = TokenBucket(rate=20, capacity=1)
+        start = time.monotonic()
+        for _ in range(5):
+            self.assertTrue(bucket.acquire(timeout=1))
+        # 1 token up front, then 4 more at 20/s
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+
+        slow = TokenBucket(rate=0.1, capacity=1)
+        self.assertTrue(slow.acquire(timeout=0))
+        self.assertFalse(slow.acquire(timeout=0.05))
+
+    def test_throttling_halves_rate(self):
+        bucket = TokenBucket(rate=4)
+        bucket.on_throttled()
+        self.assertEqual(bucket.rate, 2)
+        bucket.on_success()
+        self.assertGreater(bucket.rate, 2)
+
+    def test_non_retryable_error_is_raised_immediately(self):
+        scheduler = RequestScheduler(base_backoff=0.01)
+        calls = []
+
+        def fn(timeout):
+            calls.append(timeout)
+            raise ValueError("bad request")
+
+        with self.assertRaises(ValueError):
+            scheduler.call("test", fn, deadline=2)
+        self.assertEqual(len(calls), 1)
+
+    def test_deadline(self):
+        scheduler = RequestScheduler()
+        start = time.monotonic()
+        with self.assertRaises(DeadlineExceeded):
+            scheduler.call("test", lambda timeout: time.sleep(1), deadline=0.2)
+        self.assertLess(time.monotonic() - start, 0.6)
+
+    def test_classify_timeout(self):
+        self.assertEqual(classify_error(TimeoutError()), (True, None))
+        self.assertEqual(classify_error(KeyError()), (False, None))
+
+
+class TestLLMInterfaceWithFakeProvider(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeProvider(responses=["What is a closure?"]).start()
+        self.scheduler = RequestScheduler(rate=50, burst=50, base_backoff=0.01, min_hedge_samples=3)
+        patches = [
+            mock.patch.dict(os.environ, {"LLM_PROVIDER": "openai", "OPENAI_API_KEY": "test-key",
+                                         "OPENAI_BASE_URL": self.server.url, "LLM_MODEL": "fake-model"}),
+            mock.patch.object(llm_interface, "scheduler", self.scheduler),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.addCleanup(self.server.stop)
+        self.llm = LLMInterface()
+
+    def test_retries_429_honouring_retry_after(self):
+        self.server.inject_errors(429, 503, retry_after=0.05)
+        question = self.llm.generate_question("", "Python", "medium")
+        self.assertEqual(question, "What is a closure?")
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(self.scheduler.stats["retries"], 2)
+
+    def test_bad_request_is_not_retried(self):
+        # No retry on the same backend; the router fails over to the other model once
+        self.server.inject_errors(400, 400)
+        self.assertIsNone(self.llm.generate_question("", "Python", "medium"))
+        models = [r["model"] for r in self.server.requests]
+        self.assertEqual(sorted(models), sorted(set(models)))
+        self.assertEqual(len(models), 2)
+
+    def test_hedged_request_beats_slow_primary(self):
+        # Prime the latency window with fast calls, then make the next one slow
+        self.server.latency = [0.01, 0.01, 0.01, 2.0, 0.01]
+        for _ in range(3):
+            self.llm.generate_question("", "Python", "medium")
+        start = time.monotonic()
+        self.assertEqual(self.llm.generate_question("", "Python", "medium"), "What is a closure?")
+        self.assertLess(time.monotonic() - start, 1.5)
+        self.assertEqual(self.scheduler.stats["hedge_wins"], 1)
+
+    def test_deadline_returns_none(self):
+        self.server.latency = 2.0
+        with mock.patch.object(llm_interface, "QUESTION_DEADLINE", 0.3):
+            start = time.monotonic()
+            self.assertIsNone(self.llm.generate_question("", "Python", "medium"))
+            self.assertLess(time.monotonic() - start, 1.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import plagiarism_index
+from interview_engine import InterviewEngine
+from plagiarism_index import PlagiarismIndex, fingerprints, tokens_for
+
+PALINDROME = """def is_palindrome(s):
+    if len(s) < 2:
+        return True
+    return s[0] == s[-1] and is_palindrome(s[1:-1])
+"""
+
+# Same solution: renamed, a constant changed, a comment and a helper added
+RENAMED = """import sys
+
+# checks the word
+def check(text):
+    if len(text) < 3:
+        return True
+    return text[0] == text[-1] and check(text[1:-1])
+"""
+
+DIFFERENT = """def is_palindrome(s):
+    cleaned = [ch.lower() for ch in s if ch.isalnum()]
+    return cleaned == cleaned[::-1]
+"""
+
+# Textbook loop: too short to tell copying from writing it the usual way
+FACTORIAL = """def factorial(n):
+    result = 1
+    for i in range(2, n + 1):
+        result *= i
+    return result
+"""
+
+FIND_MISSING_JS = """function findMissing(arr, n) {
+    // Gauss
+    let expected = n * (n + 1) / 2;
+    return expected - arr.reduce((a, b) => a + b, 0);
+}
+"""
+
+
+class TestFingerprints(unittest.TestCase):
+    def test_identifiers_and_literals_are_abstracted(self):
+        self.assertEqual([t for t, _ in tokens_for(PALINDROME)], [t for t, _ in tokens_for(RENAMED)][2:])
+        renamed_js = FIND_MISSING_JS.replace("arr", "values").replace("expected", "total").replace("0)", "1)")
+        self.assertEqual([t for t, _ in tokens_for(FIND_MISSING_JS, "javascript")],
+                         [t for t, _ in tokens_for(renamed_js, "javascript")])
+
+    def test_winnowing_keeps_a_fingerprint_per_window(self):
+        tokens = tokens_for(PALINDROME)
+        prints = fingerprints(tokens)
+        grams = len(tokens) - plagiarism_index.KGRAM_SIZE + 1
+        self.assertGreaterEqual(len(prints), grams // plagiarism_index.WINNOW_WINDOW)
+        self.assertLess(len(prints), grams)
+        self.assertEqual(fingerprints(tokens_for("x = 1")), [])
+        self.assertEqual(tokens_for("def broken(:"), [])
+
+
+class TestPlagiarismIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "submissions.db")
+        self.index = PlagiarismIndex(self.path)
+        self.addCleanup(self.index.close)
+
+    def test_copied_solution_matches_with_regions(self):
+        first = self.index.add(PALINDROME, question_id="py_palindrome", session_id="s1")
+        self.index.add(DIFFERENT, question_id="py_palindrome", session_id="s2")
+        matches = self.index.match(RENAMED)
+        self.assertEqual([m["submission"] for m in matches], [first])
+        self.assertEqual(matches[0]["similarity"], 1.0)
+        self.assertEqual(matches[0]["question"], "py_palindrome")
+        self.assertEqual(matches[0]["regions"], [{"lines": [4, 7], "matched_lines": [1, 4]}])
+
+    def test_unrelated_and_own_session_submissions_do_not_match(self):
+        self.index.add(PALINDROME, session_id="s1")
+        self.assertEqual(self.index.match(DIFFERENT), [])
+        self.assertEqual(self.index.match(PALINDROME, exclude_session="s1"), [])
+        self.assertEqual(len(self.index.match(PALINDROME, exclude_session="s2")), 1)
+
+    def test_short_solutions_are_not_matched(self):
+        self.index.add(FACTORIAL, session_id="s1")
+        self.assertLess(len(fingerprints(tokens_for(FACTORIAL, "python"))), plagiarism_index.MIN_FINGERPRINTS)
+        self.assertEqual(self.index.match(FACTORIAL), [])
+        with mock.patch.object(plagiarism_index, "MIN_FINGERPRINTS", 1):
+            self.assertEqual(len(self.index.match(FACTORIAL)), 1)
+
+    def test_index_persists(self):
+        self.index.add(PALINDROME)
+        self.index.close()
+        self.index = PlagiarismIndex(self.path)
+        self.assertEqual(self.index.count(), 1)
+        self.assertEqual(len(self.index.match(PALINDROME)), 1)
+
+    def test_popular_solution_matches_its_newest_copies(self):
+        ids = [self.index.add(PALINDROME) for _ in range(5)]
+        with mock.patch.object(plagiarism_index, "MAX_POSTINGS", 2):
+            matches = self.index.match(RENAMED)
+        self.assertEqual([m["submission"] for m in matches], ids[:2:-1])
+
+
+class TestEnginePlagiarism(unittest.TestCase):
+    def test_copied_code_is_flagged_but_not_penalised(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, "submissions.db")
+        results = []
+        for _ in range(2):
+            engine = InterviewEngine(plagiarism_index_path=path)
+            engine.start_interview("Python")
+            engine.state = "ask_coding_question"
+            engine.current_question = {"id": "py_palindrome", "text": "Palindrome?", "function_name": "is_palindrome",
+                                       "test_cases": []}
+            results.append(engine.submit_answer(PALINDROME))
+            engine.plagiarism.close()
+        self.assertNotIn("similar_submissions", results[0])
+        self.assertEqual(results[1]["similar_submissions"][0]["similarity"], 1.0)
+        self.assertEqual(results[1]["score"], results[0]["score"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import unittest
+from unittest import mock
+
+import llm_interface
+import prompt_cache
+from fake_provider import FakeProvider
+from llm_interface import LLMInterface
+from llm_router import Backend
+from llm_scheduler import RequestScheduler
+from prompt_cache import PromptPrefix
+
+RESUME = "Built a distributed job queue in Go. " * 50
+
+
+class TestPromptPrefix(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeProvider(responses=["How does the queue survive a broker restart?"]).start()
+        self.addCleanup(self.server.stop)
+        env = {"LLM_PROVIDER": "openai", "OPENAI_API_KEY": "test-key", "OPENAI_BASE_URL": self.server.url,
+               "GEMINI_API_KEY": "", "LLM_LOCAL_BASE_URL": ""}
+        patches = [
+            mock.patch.dict(os.environ, env),
+            mock.patch.object(llm_interface, "scheduler", RequestScheduler(rate=50, burst=50, max_attempts=1)),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.llm = LLMInterface()
+
+    def test_stable_prefix_is_sent_first_and_cached(self):
+        self.llm.start_session("Python", RESUME)
+        self.llm.generate_question("AI: Q1\nUSER: A1", "Python", "medium", RESUME)
+        self.llm.generate_question("AI: Q1\nUSER: A1\nAI: Q2\nUSER: A2", "Python", "hard", RESUME)
+
+        first, second = (r["messages"] for r in self.server.requests)
+        self.assertEqual(first[:2], second[:2])
+        self.assertIn("Distributed job queue".lower(), first[1]["content"].lower())
+        self.assertNotIn("Difficulty", first[1]["content"])
+        self.assertIn("hard", second[2]["content"])
+
+        stats = self.llm.cache_stats()["generate_question"]
+        self.assertEqual(stats["calls"], 2)
+        self.assertGreater(stats["cached_tokens"], 0)
+        self.assertGreater(stats["hit_ratio"], 0.4)  # the first call only fills the cache
+        backend = self.llm.routing_metrics()["backends"]["openai-fast"]
+        self.assertEqual(backend["cached_input_tokens"], stats["cached_tokens"])
+
+    def test_new_domain_gets_a_new_prefix(self):
+        first = self.llm.start_session("Python")
+        self.llm.generate_question("", "Python", "medium")
+        self.assertIs(self.llm.session_prefix, first)
+        self.llm.generate_question("", "OS", "medium")
+        self.assertNotEqual(self.llm.session_prefix.key, first.key)
+
+
+class TestGeminiCache(unittest.TestCase):
+    def test_cache_created_once_per_backend_and_deleted(self):
+        backend = Backend("gemini-fast", "gemini", "gemini-2.0-flash-lite", "k", "fast")
+        cache, model = mock.Mock(), mock.Mock()
+        prefix = PromptPrefix("system", "x" * 4 * prompt_cache.GEMINI_CACHE_MIN_TOKENS)
+        with mock.patch.object(prompt_cache, "_create_gemini_cache", return_value=(cache, model)) as create:
+            self.assertIs(prefix.handle(backend), model)
+            self.assertIs(prefix.handle(backend), model)
+        self.assertEqual(create.call_count, 1)
+        prefix.close()
+        cache.delete.assert_called_once()
+
+    def test_small_or_failed_prefix_is_sent_inline(self):
+        backend = Backend("gemini-fast", "gemini", "gemini-2.0-flash-lite", "k", "fast")
+        with mock.patch.object(prompt_cache, "_create_gemini_cache", side_effect=RuntimeError("400")) as create:
+            self.assertIsNone(PromptPrefix("system", "short").handle(backend))
+            self.assertEqual(create.call_count, 0)
+            self.assertIsNone(PromptPrefix("system", "x" * 20000).handle(backend))
+            self.assertEqual(create.call_count, 1)
+        self.assertIsNone(PromptPrefix("s", "t").handle(Backend("o", "openai", "m", "k", "fast")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from sampling_profiler import SamplingProfiler, name_thread
+
+
+def busy_loop(stop):
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+
+class TestSamplingProfiler(unittest.TestCase):
+    def profile_worker(self, seconds=0.3):
+        stop = threading.Event()
+        worker = threading.Thread(target=lambda: (name_thread("Worker"), busy_loop(stop)))
+        state = {"value": "ask_theory_question"}
+        profiler = SamplingProfiler(interval=0.002, state_fn=lambda: state["value"]).start()
+        worker.start()
+        time.sleep(seconds / 2)
+        state["value"] = "ask_coding_question"
+        time.sleep(seconds / 2)
+        profiler.stop()
+        stop.set()
+        worker.join()
+        return profiler
+
+    def test_collapsed_stacks_are_tagged_with_state(self):
+        profiler = self.profile_worker()
+        lines = profiler.collapsed().splitlines()
+        worker_lines = [line for line in lines if line.startswith("Worker;")]
+        self.assertTrue(worker_lines)
+        self.assertTrue(any("busy_loop" in line for line in worker_lines))
+        states = {line.split(";")[1] for line in worker_lines}
+        self.assertEqual(states, {"state:ask_theory_question", "state:ask_coding_question"})
+        self.assertFalse(any(line.startswith("SamplingProfiler;") for line in lines))
+        for line in lines:
+            self.assertGreater(int(line.rsplit(" ", 1)[1]), 0)
+
+    def test_speedscope_export(self):
+        profiler = self.profile_worker()
+        with tempfile.TemporaryDirectory() as tmp:
+            folded, speedscope = profiler.write(os.path.join(tmp, "out", "session"))
+            self.assertTrue(os.path.getsize(folded) > 0)
+            with open(speedscope) as f:
+                data = json.load(f)
+
+        frames = data["shared"]["frames"]
+        worker = next(p for p in data["profiles"] if p["name"] == "Worker")
+        self.assertEqual(worker["type"], "sampled")
+        self.assertEqual(len(worker["samples"]), len(worker["weights"]))
+        for stack in worker["samples"]:
+            self.assertTrue(all(0 <= i < len(frames) for i in stack))
+        self.assertAlmostEqual(worker["endValue"], sum(worker["weights"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+import scoring_pipeline
+from interview_engine import InterviewEngine
+from scoring_pipeline import ScoringPipeline, merge_code, merge_theory
+from sentiment_service import sentiment
+
+LLM = {"score": 80, "feedback": "Covers the internals.", "rubric": {"correctness": 80}}
+HEURISTIC = (40, "Fair attempt, but key concepts are missing.")
+
+
+class TestScoringPipeline(unittest.TestCase):
+    def setUp(self):
+        self.pipeline = ScoringPipeline()
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+
+    def test_scorers_run_concurrently(self):
+        start = time.perf_counter()
+        outcome = self.pipeline.run({name: (lambda name=name: time.sleep(0.2) or name) for name in ("a", "b", "c")})
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(outcome.results, {"a": "a", "b": "b", "c": "c"})
+
+    def test_late_and_failing_scorers_are_left_out(self):
+        outcome = self.pipeline.run({
+            "llm": lambda: self.release.wait(5) and LLM,
+            "heuristic": lambda: HEURISTIC,
+            "sentiment": lambda: 1 / 0,
+        }, deadline=0.2)
+        self.assertEqual(outcome.results, {"heuristic": HEURISTIC})
+        self.assertEqual(outcome.summary()["missed"], ["llm"])
+        self.assertEqual(outcome.summary()["failed"], ["sentiment"])
+
+
+class TestMergePolicies(unittest.TestCase):
+    def test_policies(self):
+        both = {"llm": LLM, "heuristic": HEURISTIC}
+        self.assertEqual(merge_theory(both, "prefer_llm")["score"], 80)
+        self.assertEqual(merge_theory(both, "blend")["score"], 72)
+        lowest = merge_theory(both, "lowest")
+        self.assertEqual((lowest["score"], lowest["judge"]), (40, "heuristic"))
+        self.assertEqual(merge_theory(both, "blend")["rubric"], LLM["rubric"])
+
+    def test_missing_judges(self):
+        self.assertEqual(merge_theory({"heuristic": HEURISTIC, "llm": None}, "prefer_llm")["judge"], "heuristic")
+        self.assertEqual(merge_theory({}, "blend")["score"], 0)
+
+    def test_code_score_follows_test_cases(self):
+        valid = {"valid": True, "follow_ups": ["Why recursion?"]}
+        run = {"success": False, "output": "", "errors": "1 failed",
+               "results": [{"passed": True}, {"passed": True}, {"passed": False}, {"passed": True}]}
+        self.assertEqual(merge_code({"analysis": valid, "sandbox": run}, 4)["score"], 75)
+        self.assertEqual(merge_code({"analysis": valid}, 0)["score"], 100)  # nothing to test
+        for unfinished in (["sandbox"], []):  # failed, or missed the deadline
+            missed = merge_code({"analysis": valid}, 4, unfinished)
+            self.assertEqual((missed["score"], missed["graded"]), (0, False))
+        missed = merge_code({"analysis": valid, "sandbox": run}, 4, ["hidden_tests"])
+        self.assertEqual((missed["score"], missed["graded"]), (0, False))
+        self.assertEqual(merge_code({"analysis": {"valid": False, "error": "SyntaxError"}, "sandbox": run}, 4)["score"], 0)
+        limited = dict(run, results=run["results"][:3] + [{"case": 4, "passed": False, "limit": "memory"}])
+        self.assertIn("Test case 4 exceeded the memory limit.", merge_code({"analysis": valid, "sandbox": limited}, 4)["feedback"])
+        hidden = {"cases": 10, "passed": 5, "counterexample": {"input": [2], "expected": 2, "actual": 1, "error": None}}
+        self.assertEqual(merge_code({"analysis": valid, "hidden_tests": hidden}, 0)["score"], 50)
+        self.assertEqual(merge_code({"analysis": valid, "sandbox": run, "hidden_tests": hidden}, 4)["score"], 62)
+        self.assertIn("Fails for input [2]: expected 2, got 1.", merge_code({"analysis": valid, "hidden_tests": hidden}, 0)["feedback"])
+        timeout = {"success": False, "output": "", "errors": "Execution Timed Out (Infinite Loop?)"}
+        self.assertEqual(merge_code({"analysis": valid, "sandbox": timeout}, 4)["score"], 0)
+
+
+class TestEngineScoring(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        sentiment.preload().result()  # the app warms it up at startup
+
+    def setUp(self):
+        self.engine = InterviewEngine()
+        self.engine.start_interview("Python")
+
+    def test_slow_llm_falls_back_to_partial_results(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        self.engine.use_llm = True
+        with mock.patch.object(self.engine.llm, "evaluate_answer", side_effect=lambda q, a: release.wait(5) and LLM), \
+                mock.patch.object(scoring_pipeline, "SCORING_DEADLINE", 0.3):
+            result = self.engine.submit_answer("Lists are mutable, tuples are immutable.")
+        self.assertEqual(result["scoring"]["missed"], ["llm"])
+        self.assertNotIn("rubric", result)
+        self.assertEqual(self.engine.history[-1]["score"], result["score"])
+
+    def test_code_answer_is_run_against_test_cases(self):
+        self.engine.state = "ask_coding_question"
+        self.engine.current_question = {"text": "Write factorial", "function_name": "factorial",
+                                        "test_cases": [{"input": [0], "output": 1}, {"input": [5], "output": 120}]}
+        result = self.engine.submit_answer("def factorial(n):\n    return 1\n")
+        self.assertEqual(result["score"], 50)
+        self.assertEqual(sorted(result["scoring"]["completed"]), ["analysis", "sandbox"])
+        self.assertFalse(result["run"]["success"])
+
+    def test_failed_sandbox_is_not_graded(self):
+        self.engine.state = "ask_coding_question"
+        self.engine.current_question = {"text": "Write factorial", "function_name": "factorial",
+                                        "test_cases": [{"input": [5], "output": 120}]}
+        with mock.patch.object(self.engine.executor, "run_code", side_effect=RuntimeError("sandbox crashed")):
+            result = self.engine.submit_answer("def factorial(n):\n    return 0\n")
+        self.assertEqual(result["scoring"]["failed"], ["sandbox"])
+        self.assertEqual(result["score"], 0)
+        self.assertTrue(result["ungraded"])
+
+
+if __name__ == '__main__':
+    unittest.main()
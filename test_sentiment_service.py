@@ -0,0 +1,58 @@
+import threading
+import unittest
+from unittest import mock
+
+from sentiment_service import SentimentService
+
+ANSWERS = [
+    "I am confident this is a great and robust design.",
+    "This is a terrible, slow and buggy approach.",
+    "Lists are mutable and tuples are immutable.",
+]
+
+
+class TestSentimentService(unittest.TestCase):
+    def setUp(self):
+        self.service = SentimentService(cache_size=8)
+
+    def test_matches_textblob(self):
+        from textblob import TextBlob
+        for answer in ANSWERS:
+            self.assertAlmostEqual(self.service.polarity(answer), TextBlob(answer).sentiment.polarity)
+
+    def test_batch_scores_in_order_and_caches(self):
+        singles = [self.service.polarity(a) for a in ANSWERS]
+        self.service.clear()
+        self.assertEqual(self.service.score_batch(ANSWERS + ANSWERS[:1]), singles + singles[:1])
+        with mock.patch.object(self.service, "_score", side_effect=AssertionError("not cached")):
+            self.assertEqual(self.service.polarity(ANSWERS[1]), singles[1])
+
+    def test_batch_larger_than_cache(self):
+        answers = [f"answer number {i} is good" for i in range(20)]
+        self.assertEqual(len(self.service.score_batch(answers)), 20)
+
+    def test_prefetch_serves_submit(self):
+        self.service.prefetch(ANSWERS[0])
+        self.service.polarity(ANSWERS[0])
+        self.assertEqual(self.service.stats["misses"], 1)
+        self.assertEqual(self.service.polarity(ANSWERS[0]), self.service.polarity(ANSWERS[0]))
+
+    def test_newer_partial_supersedes_queued_prefetch(self):
+        # Hold the worker so the prefetches stay queued
+        release = threading.Event()
+        self.service._executor.submit(release.wait)
+        self.service.prefetch("I think")
+        self.service.prefetch("I think it is good")
+        release.set()
+        self.assertGreater(self.service.polarity("I think it is good"), 0)
+        self.assertEqual(self.service.stats["superseded"], 1)
+        # The dropped partial is still scored on demand
+        self.assertEqual(self.service.polarity("I think"), 0.0)
+
+    def test_missing_textblob_scores_neutral(self):
+        with mock.patch("lazy_loader.try_load", return_value=None):
+            self.assertEqual(SentimentService().polarity("great answer"), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
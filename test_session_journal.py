@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import session_journal
+from interview_engine import InterviewEngine, STATE_FIELDS
+from session_journal import SessionJournal
+
+
+class TestSessionJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "session.jsonl")
+
+    def run_session(self, engine, answers=2):
+        engine.start_interview("Python")
+        for _ in range(answers):
+            engine.submit_answer("Lists are mutable, tuples are immutable.", wpm=120, fillers=1)
+            engine.get_next_question()
+        engine.record_behavior({"looking_away": True})
+
+    def assert_same_state(self, original, recovered):
+        for field in STATE_FIELDS:
+            self.assertEqual(getattr(recovered, field), getattr(original, field), field)
+
+    def test_recover_after_crash(self):
+        engine = InterviewEngine(journal_path=self.path)
+        self.run_session(engine)
+
+        recovered = InterviewEngine(journal_path=self.path)
+        self.assertTrue(recovered.has_recoverable_session())
+        self.assertTrue(recovered.recover_session())
+        self.assert_same_state(engine, recovered)
+
+    def test_compaction_snapshot(self):
+        with mock.patch.object(session_journal, "COMPACT_AFTER", 4):
+            engine = InterviewEngine(journal_path=self.path)
+            self.run_session(engine, answers=3)
+        self.assertTrue(os.path.exists(self.path + ".snapshot"))
+
+        recovered = InterviewEngine(journal_path=self.path)
+        self.assertTrue(recovered.recover_session())
+        self.assert_same_state(engine, recovered)
+
+    def test_ended_session_is_not_recovered(self):
+        engine = InterviewEngine(journal_path=self.path)
+        self.run_session(engine, answers=1)
+        engine.end_session()
+        self.assertFalse(InterviewEngine(journal_path=self.path).has_recoverable_session())
+
+    def test_torn_last_line_is_ignored(self):
+        journal = SessionJournal(self.path)
+        journal.append("start", domain="OS")
+        journal.close()
+        with open(self.path, "a") as f:
+            f.write('{"seq": 2, "type": "que')
+        snapshot, records = SessionJournal(self.path).read()
+        self.assertIsNone(snapshot)
+        self.assertEqual([r["type"] for r in records], ["start"])
+
+    def test_append_after_torn_tail(self):
+        journal = SessionJournal(self.path)
+        journal.append("start", domain="OS")
+        journal.close()
+        with open(self.path, "a") as f:
+            f.write('{"seq": 2, "type": "que')
+        journal = SessionJournal(self.path)
+        journal.append("question", question={"text": "Paging?"})
+        journal.close()
+        snapshot, records = SessionJournal(self.path).read()
+        self.assertEqual([(r["seq"], r["type"]) for r in records], [(1, "start"), (2, "question")])
+
+        # A bad line in the middle does not hide the records after it
+        with open(self.path, "a") as f:
+            f.write('garbage\n{"seq": 3, "type": "answer"}\n')
+        self.assertEqual([r["type"] for r in SessionJournal(self.path).read()[1]], ["start", "question", "answer"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import os
+import threading
+import unittest
+from unittest import mock
+
+import interview_engine
+import llm_interface
+from fake_provider import FakeProvider
+from interview_engine import InterviewEngine
+from llm_scheduler import RequestScheduler
+from speculative_eval import SpeculativeEvaluator, is_equivalent
+
+ANSWER = "A list is mutable and a tuple is immutable, so tuples can be dict keys and are cheaper to create."
+EVALUATION = '{"correctness": 80, "depth": 60, "trade_offs": 50, "confidence": 90, "feedback": "Good."}'
+
+
+class TestEquivalence(unittest.TestCase):
+    def test_trivial_differences_are_equivalent(self):
+        self.assertTrue(is_equivalent(ANSWER, ANSWER))
+        self.assertTrue(is_equivalent(ANSWER, ANSWER.upper().replace(",", "") + "  "))
+        self.assertTrue(is_equivalent(ANSWER, ANSWER + " So yeah."))
+        self.assertTrue(is_equivalent(ANSWER, ANSWER.replace("cheaper", "cheapper")))
+
+    def test_real_edits_are_not(self):
+        self.assertFalse(is_equivalent(ANSWER, ANSWER + " Also, named tuples add field access by name."))
+        self.assertFalse(is_equivalent("Tuples are immutable.", "Tuples are mutable."))
+        self.assertFalse(is_equivalent("", ANSWER))
+
+    def test_negations_are_never_trivial(self):
+        long_answer = ("A list is mutable and a tuple is immutable, so a tuple can be used as a "
+                       "dict key and it is cheaper to create than a list of the same size.")
+        self.assertFalse(is_equivalent(long_answer, long_answer.replace("can be", "can not be")))
+        self.assertFalse(is_equivalent(long_answer, long_answer.replace("can be", "cannot be")))
+        self.assertFalse(is_equivalent(long_answer.replace("is cheaper", "isn't cheaper"), long_answer))
+        self.assertFalse(is_equivalent(long_answer, long_answer + " Or not."))
+
+
+class TestSpeculativeEvaluator(unittest.TestCase):
+    def setUp(self):
+        self.evaluate = mock.Mock(side_effect=lambda question, answer: {"score": 70, "answer": answer})
+        self.speculator = SpeculativeEvaluator(self.evaluate)
+
+    def test_matching_answer_reuses_the_result(self):
+        self.speculator.speculate("Q", ANSWER)
+        self.speculator.speculate("Q", ANSWER)  # already running
+        self.assertEqual(self.speculator.take("Q", ANSWER + " So yeah.")["answer"], ANSWER)
+        self.assertEqual(self.evaluate.call_count, 1)
+        self.assertEqual(self.speculator.stats["near_hits"], 1)
+        self.assertIsNone(self.speculator.take("Q", ANSWER))  # consumed
+
+    def test_changed_answer_or_question_is_a_miss(self):
+        self.speculator.speculate("Q", "Tuples are immutable.")
+        self.assertIsNone(self.speculator.take("Q", ANSWER))
+        self.speculator.speculate("Q", ANSWER)
+        self.assertIsNone(self.speculator.take("Other question", ANSWER))
+        self.assertEqual(self.speculator.stats["misses"], 2)
+
+    def test_newer_transcript_supersedes_a_queued_one(self):
+        gate = threading.Event()
+        self.evaluate.side_effect = lambda question, answer: gate.wait(5) and {"answer": answer}
+        speculator = SpeculativeEvaluator(self.evaluate, workers=1)
+        speculator.speculate("Q", "first partial")   # running, blocks the worker
+        speculator.speculate("Q", "second partial")  # queued
+        speculator.speculate("Q", ANSWER)            # replaces the queued one
+        gate.set()
+        self.assertEqual(speculator.take("Q", ANSWER)["answer"], ANSWER)
+        answers = [call.args[1] for call in self.evaluate.call_args_list]
+        self.assertNotIn("second partial", answers)
+        self.assertEqual(speculator.stats["discarded"], 2)
+
+
+class TestEngineSpeculation(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeProvider(responses=lambda messages: EVALUATION if "strict" in messages[0]["content"]
+                                   else "Why are tuples hashable?").start()
+        self.addCleanup(self.server.stop)
+        env = {"LLM_PROVIDER": "openai", "OPENAI_API_KEY": "test-key", "OPENAI_BASE_URL": self.server.url,
+               "GEMINI_API_KEY": "", "LLM_LOCAL_BASE_URL": ""}
+        patches = [
+            mock.patch.dict(os.environ, env),
+            mock.patch.object(llm_interface, "scheduler", RequestScheduler(rate=100, burst=100, max_attempts=1)),
+            mock.patch.object(interview_engine, "PLAN_MODE", False),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.engine = InterviewEngine()
+        self.engine.start_interview("Python")
+
+    def evaluation_calls(self):
+        return [r for r in self.server.requests if "strict" in r["messages"][0]["content"]]
+
+    def test_submit_reuses_the_speculative_evaluation(self):
+        self.engine.speculate_answer(ANSWER)
+        result = self.engine.submit_answer(ANSWER, wpm=120)
+        self.assertEqual(result["rubric"]["correctness"], 80)
+        self.assertEqual(len(self.evaluation_calls()), 1)
+        self.assertEqual(self.engine.speculator.stats["hits"], 1)
+
+    def test_edited_answer_is_evaluated_again(self):
+        self.engine.speculate_answer("Tuples are immutable.")
+        self.engine.submit_answer(ANSWER, wpm=120)
+        self.assertEqual(self.engine.speculator.stats["misses"], 1)
+        # The discarded speculative call may still be in flight; the final text was evaluated
+        self.assertTrue(any(ANSWER in r["messages"][-1]["content"] for r in self.evaluation_calls()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import json
+import os
+import tempfile
+import unittest
+import urllib.request
+
+import telemetry
+
+
+class TestTelemetry(unittest.TestCase):
+    def setUp(self):
+        telemetry.reset()
+        self.addCleanup(telemetry.reset)
+
+    def test_spans_nest_and_feed_histograms(self):
+        with telemetry.span("outer", domain="Python"):
+            with telemetry.span("inner"):
+                pass
+        with self.assertRaises(ValueError):
+            with telemetry.span("inner"):
+                raise ValueError("boom")
+
+        stats = telemetry.snapshot()["spans"]
+        self.assertEqual(stats["inner"]["count"], 2)
+        self.assertEqual(stats["inner"]["errors"], 1)
+        self.assertLessEqual(stats["inner"]["p50_ms"], stats["inner"]["p95_ms"])
+
+        spans = telemetry.otel_json()["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        inner, outer = spans[0], spans[1]
+        self.assertEqual(inner["parentSpanId"], outer["spanId"])
+        self.assertEqual(inner["traceId"], outer["traceId"])
+        self.assertNotIn("parentSpanId", spans[2])
+        self.assertEqual(spans[2]["status"]["code"], 2)
+        self.assertIn({"key": "domain", "value": {"stringValue": "Python"}}, outer["attributes"])
+
+    def test_traced_decorator(self):
+        @telemetry.traced("work")
+        def work(x):
+            return x * 2
+
+        self.assertEqual(work(21), 42)
+        self.assertEqual(telemetry.snapshot()["spans"]["work"]["count"], 1)
+
+    def test_prometheus_endpoint(self):
+        with telemetry.span("engine.submit_answer"):
+            pass
+        telemetry.set_gauge("camera.fps", 29.5)
+
+        server = telemetry.start_metrics_server(0)
+        port = server.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+            body = response.read().decode()
+        self.assertIn('ai_interviewer_span_seconds_count{span="engine.submit_answer"} 1', body)
+        self.assertIn('quantile="0.95"', body)
+        self.assertIn("ai_interviewer_camera_fps 29.500000", body)
+
+    def test_otel_json_export(self):
+        with telemetry.span("resume.extract_text", pages=3):
+            pass
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "traces", "out.json")
+            telemetry.export_otel_json(path)
+            with open(path) as f:
+                data = json.load(f)
+        span = data["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+        self.assertEqual(span["name"], "resume.extract_text")
+        self.assertLessEqual(int(span["startTimeUnixNano"]), int(span["endTimeUnixNano"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
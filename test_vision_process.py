@@ -0,0 +1,84 @@
+import os
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import vision_process
+from vision_process import FrameRing, VisionProcess
+
+
+class FakeCamera:
+    """Solid-colour frames; exits the process after `crash_after` frames if set."""
+
+    def __init__(self, crash_after=None):
+        self.frames = 0
+        self.crash_after = crash_after
+
+    def read(self):
+        self.frames += 1
+        if self.crash_after and self.frames > self.crash_after:
+            os._exit(3)
+        return True, np.full((480, 640, 3), 200, dtype=np.uint8)
+
+    def release(self):
+        pass
+
+
+def crashing_camera():
+    return FakeCamera(crash_after=5)
+
+
+def collect(vision, count, deadline=20.0):
+    events = []
+    end = time.monotonic() + deadline
+    while len(events) < count and time.monotonic() < end:
+        event = vision.poll(timeout=0.1)
+        if event:
+            events.append(event)
+    return events
+
+
+class TestFrameRing(unittest.TestCase):
+    def test_overwritten_frames_are_rejected(self):
+        ring = FrameRing(slots=2, size=(4, 3))
+        self.addCleanup(ring.close)
+        reader = FrameRing(ring.name, slots=2, size=(4, 3))
+        self.addCleanup(reader.close)
+
+        first = ring.write(np.full((3, 4, 3), 1, dtype=np.uint8))
+        self.assertEqual(reader.read(*first)[0, 0, 0], 1)
+        ring.write(np.full((3, 4, 3), 2, dtype=np.uint8))
+        ring.write(np.full((3, 4, 3), 3, dtype=np.uint8))  # reuses the first slot
+        self.assertIsNone(reader.read(*first))
+
+
+class TestVisionProcess(unittest.TestCase):
+    def test_events_and_previews(self):
+        vision = VisionProcess(source=FakeCamera)
+        vision.start()
+        self.addCleanup(vision.stop)
+        events = collect(vision, 5)
+        self.assertEqual(len(events), 5)
+        self.assertFalse(events[-1]["looking_away"])
+        self.assertEqual(sorted(events[0]), ["fps", "inference_ms", "looking_away", "seq", "slot"])
+        preview = vision.read_preview(events[-1])
+        self.assertEqual(preview.shape, (180, 240, 3))
+        self.assertEqual(int(preview[0, 0, 0]), 200)
+
+    def test_child_is_restarted_after_a_crash(self):
+        with mock.patch.object(vision_process, "RESTART_DELAY", 0.05):
+            vision = VisionProcess(source=crashing_camera)
+            vision.start()
+            self.addCleanup(vision.stop)
+            events = collect(vision, 12)
+        self.assertEqual(len(events), 12)
+        self.assertGreaterEqual(vision.stats["restarts"], 1)
+        # Sequence numbers keep increasing across restarts
+        seqs = [e["seq"] for e in events]
+        self.assertEqual(seqs, sorted(seqs))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import lazy_loader
+
+# Size frames are normalised to before analysis and display
+FRAME_SIZE = (640, 480)
+
+# Nose-tip x position, as a fraction of frame width, outside of which the candidate counts as looking away
+LOOK_AWAY_MARGIN = 0.3
+
+
+def create_face_mesh():
+    """Returns a MediaPipe FaceMesh, or None if MediaPipe is not installed."""
+    mp = lazy_loader.try_load("mediapipe")
+    if not mp:
+        return None
+    mp_face_mesh = mp.solutions.face_mesh
+    return mp_face_mesh.FaceMesh(min_detection_confidence=0.5, min_tracking_confidence=0.5)
+
+
+def process_frame(frame, face_mesh=None):
+    """
+    Resizes a BGR camera frame, converts it to RGB and runs head-pose tracking.
+    Returns (rgb_frame, looking_away).
+    """
+    cv2 = lazy_loader.load("cv2")
+    frame = cv2.resize(frame, FRAME_SIZE)
+    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    
+    looking_away = False
+    h, w, _ = frame.shape
+
+    if face_mesh is not None:
+        results = face_mesh.process(rgb_frame)
+        
+        if results.multi_face_landmarks:
+            for face_landmarks in results.multi_face_landmarks:
+                # Simple Head Pose Estimation (Nose tip vs ears/eyes)
+                # This is a simplified heuristic. Real pose estimation requires PnP.
+                nose_tip = face_landmarks.landmark[1]
+                nose_x = nose_tip.x * w
+                
+                # Check if nose is too far left or right (looking away)
+                if nose_x < w * LOOK_AWAY_MARGIN or nose_x > w * (1 - LOOK_AWAY_MARGIN):
+                    looking_away = True
+
+    if looking_away:
+        # Drawn on the RGB frame, which is the one that is displayed
+        cv2.putText(rgb_frame, "LOOKING AWAY", (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2)
+
+    return rgb_frame, looking_away
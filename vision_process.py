@@ -0,0 +1,222 @@
+"""
+Camera capture and head-pose inference in a child process.
+
+The child owns the camera and runs vision.process_frame, so OpenCV and MediaPipe
+never hold the GUI process's GIL. Each processed frame is downscaled to a preview
+and written into a multiprocessing.shared_memory ring buffer; only a small event
+({"seq", "slot", "looking_away", "inference_ms", "fps"}) goes through a queue.
+The parent restarts the child if it dies or stops reporting.
+"""
+import multiprocessing
+import queue
+import time
+from multiprocessing import shared_memory
+
+import lazy_loader
+import vision
+
+# Preview frames sent back to the GUI (matches the camera label), and ring slots
+PREVIEW_SIZE = (240, 180)
+RING_SLOTS = 4
+
+# Pause between frames in the child (~30 fps), and queued events before new ones are dropped
+FRAME_INTERVAL = 0.03
+EVENT_QUEUE_SIZE = 8
+
+# Restart the child if it exits or sends nothing for this long (camera start-up included);
+# restarts back off exponentially up to RESTART_MAX_DELAY
+WATCHDOG_TIMEOUT = 10.0
+RESTART_DELAY = 0.5
+RESTART_MAX_DELAY = 10.0
+
+# Spawn rather than fork: forking a process that runs Qt and other threads is unsafe
+_mp = multiprocessing.get_context("spawn")
+
+
+class FrameRing:
+    """
+    Fixed-size ring of RGB frames in shared memory.
+
+    Layout: one int64 sequence number per slot, then the frames. The writer marks a slot
+    -1 while copying into it; a reader accepts a frame only if the slot holds the
+    expected sequence number before and after its copy.
+    """
+
+    def __init__(self, name=None, slots=RING_SLOTS, size=PREVIEW_SIZE):
+        np = lazy_loader.load("numpy")
+        width, height = size
+        self.slots = slots
+        self.frame_shape = (height, width, 3)
+        header = slots * 8
+        nbytes = header + slots * height * width * 3
+        self.shm = shared_memory.SharedMemory(name=name, create=name is None, size=nbytes)
+        self.owner = name is None
+        self.seqs = np.ndarray((slots,), dtype=np.int64, buffer=self.shm.buf)
+        self.frames = np.ndarray((slots,) + self.frame_shape, dtype=np.uint8, buffer=self.shm.buf, offset=header)
+        if self.owner:
+            self.seqs[:] = -1
+        self.next_seq = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def write(self, frame):
+        """Stores a frame of frame_shape in the next slot. Returns (seq, slot)."""
+        seq = self.next_seq
+        slot = seq % self.slots
+        self.seqs[slot] = -1
+        self.frames[slot] = frame
+        self.seqs[slot] = seq
+        self.next_seq += 1
+        return seq, slot
+
+    def read(self, seq, slot):
+        """A copy of frame `seq`, or None if it has already been overwritten."""
+        if self.seqs[slot] != seq:
+            return None
+        frame = self.frames[slot].copy()
+        if self.seqs[slot] != seq:
+            return None
+        return frame
+
+    def close(self):
+        # Drop the numpy views first; SharedMemory.close() fails while they exist
+        self.seqs = self.frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _open_source(source):
+    if callable(source):
+        return source()
+    cv2 = lazy_loader.load("cv2")
+    return cv2.VideoCapture(source)
+
+
+def _worker(ring_name, slots, preview_size, events, stop, source):
+    """Child process main loop: capture, analyse, publish previews and events."""
+    cv2 = lazy_loader.load("cv2")
+    ring = FrameRing(ring_name, slots, preview_size)
+    ring.next_seq = int(max(ring.seqs.max(), -1)) + 1  # continue after a restart
+    cap = _open_source(source)
+    if hasattr(cap, "isOpened") and not cap.isOpened():
+        ring.close()
+        raise SystemExit("Camera not available")  # retried after the restart back-off
+    face_mesh = vision.create_face_mesh()
+    fps = 0.0
+    last_frame = time.perf_counter()
+    try:
+        while not stop.is_set():
+            ret, frame = cap.read()
+            if not ret:
+                time.sleep(FRAME_INTERVAL)
+                continue
+            start = time.perf_counter()
+            rgb_frame, looking_away = vision.process_frame(frame, face_mesh)
+            preview = cv2.resize(rgb_frame, preview_size, interpolation=cv2.INTER_AREA)
+            now = time.perf_counter()
+            seq, slot = ring.write(preview)
+
+            fps = 0.9 * fps + 0.1 / max(now - last_frame, 1e-6)
+            last_frame = now
+            try:
+                events.put_nowait({"seq": seq, "slot": slot, "looking_away": looking_away,
+                                   "inference_ms": (now - start) * 1000, "fps": fps})
+            except queue.Full:
+                pass  # the GUI is behind; the next event supersedes this one
+            time.sleep(FRAME_INTERVAL)
+    finally:
+        cap.release()
+        ring.close()
+
+
+class VisionProcess:
+    """
+    Parent-side handle on the vision child process.
+
+    `source` is a camera index, or a picklable callable returning an object with
+    read()/release() like cv2.VideoCapture.
+    """
+
+    def __init__(self, source=0, slots=RING_SLOTS, preview_size=PREVIEW_SIZE):
+        self.source = source
+        self.slots = slots
+        self.preview_size = preview_size
+        self.ring = None
+        self.process = None
+        self.events = None
+        self.stop_event = None
+        self.last_event = 0.0
+        self.restart_delay = RESTART_DELAY
+        self.restart_at = None
+        self.stats = {"frames": 0, "restarts": 0, "stale": 0}
+
+    def start(self):
+        self.ring = FrameRing(slots=self.slots, size=self.preview_size)
+        self.stop_event = _mp.Event()
+        self._spawn()
+
+    def _spawn(self):
+        # A fresh queue each time: a killed child may leave the old one's lock held
+        self.events = _mp.Queue(EVENT_QUEUE_SIZE)
+        self.process = _mp.Process(target=_worker, name="VisionProcess", daemon=True,
+                                   args=(self.ring.name, self.slots, self.preview_size,
+                                         self.events, self.stop_event, self.source))
+        self.process.start()
+        self.last_event = time.monotonic()
+        self.restart_at = None
+
+    def _check_health(self):
+        now = time.monotonic()
+        if self.restart_at is not None:
+            if now >= self.restart_at:
+                self.stats["restarts"] += 1
+                self._spawn()
+            return
+        hung = now - self.last_event > WATCHDOG_TIMEOUT
+        if self.process.is_alive() and not hung:
+            return
+        if hung:
+            self.process.terminate()
+        self.process.join(1)
+        print(f"Vision process stopped (exit code {self.process.exitcode}); "
+              f"restarting in {self.restart_delay:.1f}s")
+        self.restart_at = now + self.restart_delay
+        self.restart_delay = min(self.restart_delay * 2, RESTART_MAX_DELAY)
+
+    def poll(self, timeout=0.1):
+        """Waits up to `timeout` for the next frame event; restarts the child if needed."""
+        self._check_health()
+        if self.restart_at is not None:
+            time.sleep(timeout)
+            return None
+        try:
+            event = self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        self.last_event = time.monotonic()
+        self.restart_delay = RESTART_DELAY
+        self.stats["frames"] += 1
+        return event
+
+    def read_preview(self, event):
+        """The preview frame (RGB, PREVIEW_SIZE) for an event, or None if overwritten."""
+        frame = self.ring.read(event["seq"], event["slot"])
+        if frame is None:
+            self.stats["stale"] += 1
+        return frame
+
+    def stop(self, timeout=2.0):
+        if self.process is None:
+            return
+        self.stop_event.set()
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout)
+        self.events.cancel_join_thread()
+        self.events.close()
+        self.ring.close()
+        self.process = None